@@ -0,0 +1,227 @@
+"""Check the memory the search retains and holds per node against fixed budgets
+
+Every position of the search_check set is searched to a fixed depth under
+tracemalloc, once per engine configuration, after an untraced warm-up pass
+(lazy imports, first-use tables). Per configuration the check reports:
+
+    bytes/node    net traced memory retained after the searches, per node
+    blocks/node   net memory blocks retained after the searches, per node
+    peak KB       largest rise in traced memory during a single search
+    gc/knode      generation 0 collections per 1000 nodes
+    transient/node  largest rise in traced memory within a node, its
+                  children's share left out, averaged over the nodes
+
+and fails (exit status 1) when any of them exceeds its budget. Node
+counts and retained memory are deterministic, so the budgets hold on any
+machine with the same Python version. They are set for the default depth,
+a shallower search spreads its fixed costs over fewer nodes:
+
+    python alloc_check.py --configs default,selective,tt --depth 4
+
+None of the figures counts allocations: tracemalloc sees the blocks that
+are live, not every malloc call, so objects made and freed within a node
+leave nothing behind for the first two. transient/node catches them: a
+second pass wraps the engine's _search and takes the traced peak of every
+node between its child searches, so what a node holds at once counts
+however briefly it lives (an object made and dropped again and again
+only counts once). It is measured in a separate pass because the wrapper
+costs time and memory of its own, which are part of the figure; its
+budget is about a third over what the search needs now. --self-test runs
+the check on an engine making GARBAGE_OBJECTS throwaway objects per node
+and fails unless the check does:
+
+    python alloc_check.py --self-test
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+from batch_analysis import position_from_json
+from search_check import POSITIONS
+from macanan import MacananAI
+from strength import CONFIGS, make_engine
+
+BUDGETS = {
+    "bytes_per_node": 64,
+    "blocks_per_node": 1.0,
+    "peak_kb": 1024,
+    "gc_per_knode": 1.0,
+    "transient_per_node": 640,
+}
+# Throwaway objects made per node by the --self-test engine
+GARBAGE_OBJECTS = 120
+
+
+class CollectionCounter:
+    """Counts generation 0 collections while installed in gc.callbacks"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, phase, info):
+        if phase == "start" and info["generation"] == 0:
+            self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self)
+
+
+class TransientPeak:
+    """Sums the traced peak of every search node while installed on an engine
+
+    A node's peak is taken over the stretches between its child searches,
+    from the traced memory at the start of each stretch, so what its
+    children allocate and what they leave behind is not counted again.
+    tracemalloc must be running.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.total = 0
+        self.nodes = 0
+        # Largest rise so far of every open node, innermost last
+        self.rises = []
+        self.start = 0
+
+    def _close(self):
+        current, peak = tracemalloc.get_traced_memory()
+        if self.rises:
+            self.rises[-1] = max(self.rises[-1], peak - self.start)
+
+    def _open(self):
+        tracemalloc.reset_peak()
+        self.start = tracemalloc.get_traced_memory()[0]
+
+    def search(self, *args):
+        self._close()
+        self.rises.append(0)
+        self._open()
+        try:
+            return self.original(*args)
+        finally:
+            self._close()
+            self.total += self.rises.pop()
+            self.nodes += 1
+            self._open()
+
+    def __enter__(self):
+        self.original = self.engine._search
+        self.engine._search = self.search
+        return self
+
+    def __exit__(self, *exc):
+        del self.engine._search
+
+
+class GarbageAI(MacananAI):
+    """MacananAI making GARBAGE_OBJECTS throwaway objects in every node"""
+
+    def _search(self, *args):
+        garbage = [object() for _ in range(GARBAGE_OBJECTS)]
+        del garbage
+        return super()._search(*args)
+
+
+def measure(engine, positions, depth):
+    """Search every position and return the memory figures as a dict"""
+    for state in positions:
+        engine.analyse(state.copy(), depth)
+    if engine.tt is not None:
+        # Or the measured searches would be answered from the table
+        engine.tt.clear()
+
+    states = [state.copy() for state in positions]
+    gc.collect()
+    nodes = retained = blocks = peak = 0
+    start = time.perf_counter()
+    tracemalloc.start()
+    with CollectionCounter() as collections:
+        for state in states:
+            blocks_before = sys.getallocatedblocks()
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            engine.analyse(state, depth)
+            after, search_peak = tracemalloc.get_traced_memory()
+            blocks += sys.getallocatedblocks() - blocks_before
+            retained += after - before
+            peak = max(peak, search_peak - before)
+            nodes += engine.nodes
+    elapsed = time.perf_counter() - start
+
+    if engine.tt is not None:
+        engine.tt.clear()
+    with TransientPeak(engine) as transient:
+        for state in positions:
+            engine.analyse(state.copy(), depth)
+    tracemalloc.stop()
+    nodes = max(nodes, 1)
+    return {"nodes": nodes, "seconds": elapsed, "bytes_per_node": retained / nodes,
+            "blocks_per_node": blocks / nodes, "peak_kb": peak / 1024,
+            "gc_per_knode": 1000 * collections.count / nodes,
+            "transient_per_node": transient.total / max(transient.nodes, 1)}
+
+
+def check(positions, configs, depth=4, budgets=BUDGETS, out=sys.stdout,
+          engine_class=MacananAI):
+    """Measure every configuration against the budgets, return True when all pass"""
+    passed = True
+    for name in configs:
+        figures = measure(make_engine(CONFIGS[name], engine_class), positions, depth)
+        over = [key for key, budget in budgets.items() if figures[key] > budget]
+        print(f"{name}: {figures['nodes']} nodes in {figures['seconds']:.2f}s, "
+              f"{figures['bytes_per_node']:.1f} bytes/node, "
+              f"{figures['blocks_per_node']:.3f} blocks/node, "
+              f"peak {figures['peak_kb']:.0f} KB, "
+              f"{figures['gc_per_knode']:.2f} gc/knode, "
+              f"{figures['transient_per_node']:.0f} transient bytes/node"
+              f" - {'FAIL' if over else 'ok'}", file=out)
+        for key in over:
+            print(f"  {key} {figures[key]:.3f} over budget {budgets[key]}", file=out)
+        passed = passed and not over
+    return passed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the memory the search retains per node")
+    parser.add_argument("--configs", default="default,selective,tt",
+                        help="comma separated names from: " + ", ".join(CONFIGS))
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--max-bytes-per-node", type=float, default=BUDGETS["bytes_per_node"])
+    parser.add_argument("--max-blocks-per-node", type=float, default=BUDGETS["blocks_per_node"])
+    parser.add_argument("--max-peak-kb", type=float, default=BUDGETS["peak_kb"])
+    parser.add_argument("--max-gc-per-knode", type=float, default=BUDGETS["gc_per_knode"])
+    parser.add_argument("--max-transient-per-node", type=float,
+                        default=BUDGETS["transient_per_node"])
+    parser.add_argument("--self-test", action="store_true",
+                        help="check that per-node garbage makes the check fail")
+    args = parser.parse_args(argv)
+
+    configs = args.configs.split(",")
+    for name in configs:
+        if name not in CONFIGS:
+            parser.error(f"unknown config {name}")
+    budgets = {"bytes_per_node": args.max_bytes_per_node,
+               "blocks_per_node": args.max_blocks_per_node,
+               "peak_kb": args.max_peak_kb,
+               "gc_per_knode": args.max_gc_per_knode,
+               "transient_per_node": args.max_transient_per_node}
+    positions = [position_from_json(obj) for obj in POSITIONS]
+    if args.self_test:
+        print(f"self-test: {GARBAGE_OBJECTS} throwaway objects per node")
+        if check(positions, configs, args.depth, budgets, engine_class=GarbageAI):
+            print("self-test FAILED: the check passed an engine making garbage per node")
+            sys.exit(1)
+        print("self-test ok: the check failed as it should")
+    elif not check(positions, configs, args.depth, budgets):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Batch position analysis over a process pool
+
+Positions are read as JSON lines or as fixed-size binary records, analysed by
+a pool of worker processes (each keeping its own MacananAI instance for the
+whole run) and written back as JSON lines in input order.
+
+JSON input, one position per line:
+    {"id": "g1-12", "board": "M.U../.U.../..M../...../.....", "turn": "uwong",
+     "eaten": 0, "macans": [[0, 0], [2, 2]]}
+
+"board" is 25 cells row-major ("M" macan, "U" uwong, "." empty, "/"
+separators optional) or a 5x5 list using the GUI values ("macan", "uwong",
+null). "macans" keeps the GUI's macan order and defaults to scan order;
+"eaten" defaults to 0, "macan_count" and "uwong_count" (pieces placed so far)
+are inferred from the board when missing.
+
+Binary input is a stream of RECORD_SIZE-byte records: 25 squares (0 empty,
+1 macan, 2 uwong), side to move (0 macan, 1 uwong), eaten uwong, uwong placed.
+"""
+import argparse
+import json
+import multiprocessing
+import struct
+import sys
+from collections import deque
+
+from macanan import (MACAN, MOVE_PLACE, UWONG, GameState, MacananAI, TranspositionTable,
+                     move_dst, move_src)
+# The writing side of the JSON positions, kept importable from here
+from macanan.server import board_to_string, state_to_json  # noqa: F401
+
+BOARD_SIZE = 5
+RECORD = struct.Struct("25sBBB")
+RECORD_SIZE = RECORD.size
+
+CELL_CHARS = {"M": "macan", "U": "uwong", ".": None}
+
+
+def parse_board(value):
+    """Convert a board string or nested list into the GUI board layout"""
+    if isinstance(value, str):
+        cells = [CELL_CHARS[ch] for ch in value if ch != "/"]
+        if len(cells) != BOARD_SIZE * BOARD_SIZE:
+            raise ValueError(f"board must have {BOARD_SIZE * BOARD_SIZE} cells")
+        return [cells[i:i + BOARD_SIZE] for i in range(0, len(cells), BOARD_SIZE)]
+    if isinstance(value[0], str):
+        return parse_board("".join(value))
+    return [list(row) for row in value]
+
+
+def position_from_json(obj):
+    """Build a GameState from one decoded JSON line"""
+    return GameState.from_board(parse_board(obj["board"]), obj.get("macans"),
+                                obj.get("turn", "macan"), obj.get("macan_count"),
+                                obj.get("uwong_count"), obj.get("eaten", 0))
+
+
+def encode_position(state):
+    """Encode a position as one binary record"""
+    return RECORD.pack(bytes(state.squares), 0 if state.turn == MACAN else 1,
+                       state.eaten_uwong, state.uwong_count)
+
+
+def decode_position(record):
+    """Decode one binary record into a GameState"""
+    squares, side, eaten, uwong_count = RECORD.unpack(record)
+    state = GameState(BOARD_SIZE)
+    state.set_squares(squares)
+    state.macan_count = len(state.macans)
+    state.uwong_count = uwong_count
+    state.eaten_uwong = eaten
+    state.turn = MACAN if side == 0 else UWONG
+    state.rehash()
+    return state
+
+
+def read_jsonl(stream):
+    """Yield (id, state) pairs from a text stream of JSON lines"""
+    for line in stream:
+        line = line.strip()
+        if line:
+            obj = json.loads(line)
+            yield obj.get("id"), position_from_json(obj)
+
+
+def read_binary(stream):
+    """Yield (None, state) pairs from a binary stream of fixed-size records"""
+    while True:
+        record = stream.read(RECORD_SIZE)
+        if not record:
+            return
+        if len(record) != RECORD_SIZE:
+            raise ValueError("truncated position record")
+        yield None, decode_position(record)
+
+
+def _json_score(score):
+    # Positions without legal moves keep the search's infinite score
+    return None if score in (float("inf"), float("-inf")) else score
+
+
+def move_to_json(move, size=BOARD_SIZE):
+    """[row, col] for a placement, [[row, col], [row, col]] for a move"""
+    if move is None:
+        return None
+    dst = list(divmod(move_dst(move), size))
+    if move & MOVE_PLACE:
+        return dst
+    return [list(divmod(move_src(move), size)), dst]
+
+
+def analyse_position(engine, state, depth=3, position_id=None, multipv=1):
+    """Analyse one position and return its JSON-ready result
+
+    With multipv > 1 the top moves are added under "lines", each with its
+    own score and principal variation.
+    """
+    score, best_move, pv = engine.analyse(state, depth)
+    result = {"best_move": move_to_json(best_move, state.size), "score": _json_score(score),
+              "pv": [move_to_json(move, state.size) for move in pv]}
+    if multipv > 1:
+        result["lines"] = [{"move": move_to_json(move, state.size),
+                            "score": _json_score(line_score),
+                            "pv": [move_to_json(m, state.size) for m in line]}
+                           for line_score, move, line in engine.analyse_multipv(state, multipv, depth)]
+    if position_id is not None:
+        result["id"] = position_id
+    return result
+
+
+# Per-process engine, created once by the pool initializer so that anything
+# the engine caches stays warm across all positions a worker analyses.
+_engine = None
+_depth = 3
+_multipv = 1
+
+
+def _init_worker(depth, multipv=1, tt=None):
+    global _engine, _depth, _multipv
+    _engine = MacananAI(tt=tt)
+    _depth = depth
+    _multipv = multipv
+
+
+def _analyse_chunk(chunk):
+    return [analyse_position(_engine, state, _depth, position_id, _multipv)
+            for position_id, state in chunk]
+
+
+def _chunks(positions, chunksize):
+    chunk = []
+    for position in positions:
+        chunk.append(position)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyse_stream(positions, depth=3, workers=None, chunksize=16, max_pending=None,
+                   multipv=1, hash_mb=0):
+    """Analyse (id, state) pairs on a worker pool, yielding results in order
+
+    At most max_pending chunks are in flight at once, so memory stays bounded
+    no matter how long the input stream is. With hash_mb, the workers share
+    one transposition table of that many megabytes.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    max_pending = max_pending or workers * 2
+    tt = TranspositionTable.shared(hash_mb) if hash_mb else None
+    try:
+        yield from _analyse_pool(positions, depth, workers, chunksize, max_pending,
+                                 multipv, tt)
+    finally:
+        if tt is not None:
+            tt.close()
+            tt.unlink()
+
+
+def _analyse_pool(positions, depth, workers, chunksize, max_pending, multipv, tt):
+    index = 0
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(depth, multipv, tt)) as pool:
+        pending = deque()
+        for chunk in _chunks(positions, chunksize):
+            pending.append(pool.apply_async(_analyse_chunk, (chunk,)))
+            if len(pending) >= max_pending:
+                for result in pending.popleft().get():
+                    result["index"] = index
+                    index += 1
+                    yield result
+        while pending:
+            for result in pending.popleft().get():
+                result["index"] = index
+                index += 1
+                yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse Macanan positions in batch")
+    parser.add_argument("input", help="positions file, or - for stdin")
+    parser.add_argument("-o", "--output", help="results file (default: stdout)")
+    parser.add_argument("--binary", action="store_true",
+                        help="input uses the binary record encoding")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=16)
+    parser.add_argument("--multipv", type=int, default=1, help="also report the top N moves")
+    parser.add_argument("--hash", type=int, default=0, metavar="MB",
+                        help="transposition table shared by the workers (default: none)")
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        stream = sys.stdin.buffer if args.binary else sys.stdin
+    else:
+        stream = open(args.input, "rb" if args.binary else "r")
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        positions = read_binary(stream) if args.binary else read_jsonl(stream)
+        for result in analyse_stream(positions, args.depth, args.workers, args.chunksize,
+                                     multipv=args.multipv, hash_mb=args.hash):
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if stream not in (sys.stdin, sys.stdin.buffer):
+            stream.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
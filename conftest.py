@@ -0,0 +1,3 @@
+"""pytest setup: the repository root is on sys.path, so the tests import
+the macanan package and the scripts next to it (selfplay, batch_analysis...)
+"""
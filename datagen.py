@@ -0,0 +1,220 @@
+"""Self-play training data as chunked NumPy arrays
+
+Worker processes play engine games from random openings and every position
+an engine searched becomes one row: the squares (int8, EMPTY/MACAN/UWONG),
+side to move, phase (0 placement, 1 movement), Uwong eaten, the search
+score of the engine to move, its move (packed int) and the final result
+(MACAN, UWONG, or 0 for a draw). Positions already in the dataset, by
+GameState.hash, are skipped.
+
+Each column is stored in .npy files of CHUNK_ROWS rows, preallocated and
+written through np.lib.format.open_memmap, next to an index.json giving
+the column types and the rows filled per chunk. The index is rewritten
+after every game, so a dataset stays readable while it grows and a later
+run appends to it:
+
+    python datagen.py data/ --games 200 --depth 3
+    chunks = open_dataset("data/")    # [{column: array}, ...], memory-mapped
+
+Requires NumPy.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+
+import numpy as np
+
+from macanan import MACAN, UWONG, MacananAI
+from selfplay import play_game
+from tuning import random_opening
+
+INDEX = "index.json"
+VERSION = 1
+CHUNK_ROWS = 65536
+# (dtype, shape per row) of every column
+COLUMNS = {
+    "board": ("int8", (25,)),
+    "turn": ("int8", ()),
+    "phase": ("int8", ()),
+    "eaten": ("int8", ()),
+    "score": ("float32", ()),
+    "move": ("int32", ()),
+    "result": ("int8", ()),
+    "hash": ("uint64", ()),
+}
+RESULTS = {"macan": MACAN, "uwong": UWONG, "draw": 0}
+
+
+def chunk_path(directory, chunk, column):
+    return os.path.join(directory, f"chunk{chunk:05d}.{column}.npy")
+
+
+def play_rows(task):
+    """Play one game and return its rows as a dict of column arrays"""
+    seed, depth, max_plies = task
+    rng = random.Random(seed)
+    engine = MacananAI(depth=depth)
+    rows = {column: [] for column in COLUMNS}
+
+    def observe(state, move, score):
+        if score is None:  # opening move, not searched
+            return
+        rows["board"].append(bytes(state.squares))
+        rows["turn"].append(state.turn)
+        rows["phase"].append(0 if state.is_placing() else 1)
+        rows["eaten"].append(state.eaten_uwong)
+        rows["score"].append(score)
+        rows["move"].append(move)
+        rows["hash"].append(state.hash)
+
+    result = play_game(engine, engine, random_opening(rng), max_plies=max_plies,
+                       observe=observe)["result"]
+    count = len(rows["hash"])
+    rows["result"] = [RESULTS[result]] * count
+    arrays = {}
+    for column, (dtype, shape) in COLUMNS.items():
+        if column == "board":
+            arrays[column] = np.frombuffer(b"".join(rows[column]), dtype).reshape(count, *shape)
+        else:
+            arrays[column] = np.array(rows[column], dtype)
+    return arrays
+
+
+class DataWriter:
+    """Appends rows to the chunked dataset in directory, skipping known positions"""
+
+    def __init__(self, directory, chunk_rows=CHUNK_ROWS):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, INDEX)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.index = json.load(f)
+            if self.index["version"] != VERSION:
+                raise ValueError(f"{path} is version {self.index['version']}, not {VERSION}")
+        else:
+            self.index = {"version": VERSION, "chunk_rows": chunk_rows, "games": 0, "rows": 0,
+                          "columns": {column: [dtype, list(shape)]
+                                      for column, (dtype, shape) in COLUMNS.items()},
+                          "chunks": []}
+        self.chunk_rows = self.index["chunk_rows"]
+        self.seen = set()
+        for chunk in open_dataset(directory):
+            self.seen.update(chunk["hash"].tolist())
+        self.arrays = None
+        self.duplicates = 0
+
+    def _open_chunk(self, chunk):
+        """Memory-map every column file of chunk, creating them when new"""
+        self.arrays = {}
+        for column, (dtype, shape) in COLUMNS.items():
+            path = chunk_path(self.directory, chunk, column)
+            if os.path.exists(path):
+                self.arrays[column] = np.load(path, mmap_mode="r+")
+            else:
+                self.arrays[column] = np.lib.format.open_memmap(
+                    path, mode="w+", dtype=dtype, shape=(self.chunk_rows, *shape))
+
+    def append(self, arrays):
+        """Write the new positions of one batch of rows, returns how many were new"""
+        keep = []
+        for i, key in enumerate(arrays["hash"].tolist()):
+            if key in self.seen:
+                self.duplicates += 1
+            else:
+                self.seen.add(key)
+                keep.append(i)
+        written = 0
+        while written < len(keep):
+            chunks = self.index["chunks"]
+            if not chunks or chunks[-1] == self.chunk_rows:
+                chunks.append(0)
+                self._open_chunk(len(chunks) - 1)
+            elif self.arrays is None:
+                self._open_chunk(len(chunks) - 1)
+            start = chunks[-1]
+            count = min(self.chunk_rows - start, len(keep) - written)
+            rows = keep[written:written + count]
+            for column, array in self.arrays.items():
+                array[start:start + count] = arrays[column][rows]
+            chunks[-1] += count
+            written += count
+        self.index["rows"] += written
+        self.flush()
+        return written
+
+    def flush(self):
+        """Write the arrays to disk, then the index that makes them visible"""
+        if self.arrays is not None:
+            for array in self.arrays.values():
+                array.flush()
+        path = os.path.join(self.directory, INDEX)
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        self.flush()
+        self.arrays = None
+
+
+def open_dataset(directory):
+    """Filled part of every chunk as [{column: read-only memmap}, ...]"""
+    path = os.path.join(directory, INDEX)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        index = json.load(f)
+    return [{column: np.load(chunk_path(directory, chunk, column), mmap_mode="r")[:rows]
+             for column in index["columns"]}
+            for chunk, rows in enumerate(index["chunks"]) if rows]
+
+
+def generate(directory, games, depth=3, workers=None, seed=0, max_plies=200,
+             chunk_rows=CHUNK_ROWS, callback=None):
+    """Play games and append their positions to directory, returns the writer
+
+    chunk_rows only applies to a new dataset. callback(done, total, written)
+    is called as games finish.
+    """
+    writer = DataWriter(directory, chunk_rows)
+    # Seeds continue after the games already generated, so an appending run
+    # plays new openings
+    first = seed + writer.index["games"]
+    tasks = [(first + game, depth, max_plies) for game in range(games)]
+    with multiprocessing.Pool(workers) as pool:
+        for done, arrays in enumerate(pool.imap_unordered(play_rows, tasks), 1):
+            writer.index["games"] += 1
+            written = writer.append(arrays)
+            if callback:
+                callback(done, len(tasks), written)
+    writer.close()
+    return writer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate self-play training data")
+    parser.add_argument("directory", help="dataset directory, appended to if it exists")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-plies", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help="rows per chunk file of a new dataset")
+    args = parser.parse_args(argv)
+
+    def report(done, total, written):
+        print(f"\r{done}/{total} games, {written} new positions", end="", flush=True)
+
+    writer = generate(args.directory, args.games, args.depth, args.workers, args.seed,
+                      args.max_plies, args.chunk_rows, callback=report)
+    print()
+    print(f"{writer.index['rows']} positions in {len(writer.index['chunks'])} chunks, "
+          f"{writer.duplicates} duplicates skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""Load test: many concurrent game sessions asking the engine for moves
+
+Every session replays a game, asking for the engine's move in each of its
+positions and then playing the game's own move, so the load does not
+depend on what the engine answers. Games are random legal games (one per
+session, from --seed) or recorded ones, a JSON line per game:
+
+    {"moves": ["c3", "b2", ..., "c3c4", ...]}
+
+in the notation of macanan.server, from the start position. The test runs
+once per session count and reports, per count, the moves per second over
+all sessions, the p50/p95/p99 time per move and the memory per session,
+the growth of the resident memory (RSS) serving the sessions took:
+
+    python loadtest.py --sessions 1,2,4,8 --moves 20 --depth 3
+    python loadtest.py --mode pool --workers 4 --sessions 1,4,16,64
+    python loadtest.py --mode server --connect 127.0.0.1:7474 --server-pid 1234
+    python loadtest.py --slo-p99 250 --min-capacity 8      # exit 1 below 8 sessions
+
+Modes:
+    inprocess   a thread and a MacananAI per session in one process, as the
+                GUI and batch tools run engines; each count runs in a fresh
+                process and memory is its RSS growth per session
+    pool        session threads sending every search to a process pool with
+                an engine per worker; memory is the workers' RSS growth
+                since their warm-up at start, per session
+    server      a connection per session to a running macanan.server;
+                memory is the RSS growth of --server-pid during the run per
+                session, when given
+
+With --think-ms each session waits that long between its moves, as a
+player would; without it every session asks again at once, which gives
+the most load. The first move of every session is a warm-up and is not
+timed. With --slo-p99 (and --slo-p95) the report ends with the
+capacity, the largest session count whose latency stays within them.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+
+from macanan import GameState, MacananAI
+from macanan.server import move_to_text, parse_move
+from strength import CONFIGS, make_engine, percentile
+
+MODES = ("inprocess", "pool", "server")
+DEFAULT_SESSIONS = "1,2,4,8"
+# Plies of a random game, at most
+MAX_PLIES = 120
+
+
+def rss_bytes(pid="self"):
+    """Resident memory of a process from /proc, None where there is none"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def random_game(rng, engine, max_plies=MAX_PLIES):
+    """Moves of a game of random legal moves, ending when the game does"""
+    state = GameState(board=engine.board)
+    moves = []
+    for _ in range(max_plies):
+        legal = engine.generate_moves(state)
+        if not legal:
+            break
+        move = rng.choice(legal)
+        state.make_move(move)
+        moves.append(move)
+        if state.phase == "movement" and state.eaten_uwong >= state.board.capture_win:
+            break
+    return moves
+
+
+def read_games(path, engine):
+    """Move lists of the recorded games in a JSON lines file"""
+    games = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            state = GameState(board=engine.board)
+            moves = []
+            for text in json.loads(line)["moves"]:
+                move = parse_move(engine, state, text)
+                state.make_move(move)
+                moves.append(move)
+            games.append(moves)
+    return games
+
+
+def session_games(games_path, sessions, seed=0):
+    """The game replayed by each session, cycling through the recorded games"""
+    engine = MacananAI()
+    if games_path:
+        games = read_games(games_path, engine)
+        if not games:
+            raise ValueError(f"no games in {games_path}")
+        return [games[i % len(games)] for i in range(sessions)]
+    return [random_game(random.Random(seed + i), engine) for i in range(sessions)]
+
+
+class InProcessClient:
+    """A session's own engine searching in the calling thread"""
+
+    def __init__(self, options):
+        self.engine = make_engine(options)
+
+    def best_move(self, state, moves):
+        return self.engine.analyse(state)[1]
+
+    def close(self):
+        pass
+
+
+# Worker process engine of the pool mode and the worker's resident memory
+# once it is warmed up, set by the pool initializer
+_engine = None
+_start_rss = None
+
+
+def _init_worker(options):
+    global _engine, _start_rss
+    _engine = make_engine(options)
+    _engine.analyse(GameState(board=_engine.board))
+    _start_rss = rss_bytes()
+
+
+def _pool_search(state):
+    """Best move in a pool worker, with the worker's pid and memory growth since its start"""
+    move = _engine.analyse(state)[1]
+    rss = rss_bytes()
+    growth = rss - _start_rss if rss is not None and _start_rss is not None else None
+    return move, os.getpid(), growth
+
+
+class PoolClient:
+    """Sends a session's searches to a shared process pool"""
+
+    def __init__(self, pool, worker_memory):
+        self.pool = pool
+        # Last memory growth per worker pid, shared by the sessions
+        self.worker_memory = worker_memory
+
+    def best_move(self, state, moves):
+        move, pid, growth = self.pool.apply(_pool_search, (state,))
+        self.worker_memory[pid] = growth
+        return move
+
+    def close(self):
+        pass
+
+
+class ServerClient:
+    """A session connected to macanan.server over TCP"""
+
+    def __init__(self, address, options):
+        host, port = address.rsplit(":", 1)
+        self.sock = socket.create_connection((host, int(port)))
+        self.file = self.sock.makefile("rw", encoding="ascii", newline="\n")
+        self.send(f"setoption name Depth value {options.get('depth', 3)}")
+        self.send(f"setoption name LMR value {str(options.get('lmr', False)).lower()}")
+        self.send(f"setoption name NullMove value {str(options.get('null_move', False)).lower()}")
+        self.send("isready")
+        self.read_until("readyok")
+
+    def send(self, line):
+        self.file.write(line + "\n")
+        self.file.flush()
+
+    def read_until(self, prefix):
+        while True:
+            line = self.file.readline()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            if line.startswith(prefix):
+                return line.split()
+
+    def best_move(self, state, moves):
+        size = state.size
+        played = " ".join(move_to_text(move, size) for move in moves)
+        self.send("position startpos" + (f" moves {played}" if played else ""))
+        self.send("go")
+        return self.read_until("bestmove")[1]
+
+    def close(self):
+        try:
+            self.send("quit")
+        finally:
+            self.file.close()
+            self.sock.close()
+
+
+def run_sessions(clients, games, moves, think=0.0):
+    """Drive every client through moves positions of its game at once
+
+    Returns (latencies in seconds, errors, wall time in seconds).
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(clients) + 1)
+
+    def session(client, game):
+        times = []
+        state = GameState()
+        ply = 0
+        try:
+            try:
+                # Untimed, so first-use costs (tables, caches, connections) are not counted
+                client.best_move(GameState(), [])
+            finally:
+                barrier.wait()
+            for _ in range(moves):
+                if ply == len(game):
+                    state, ply = GameState(), 0
+                start = time.perf_counter()
+                client.best_move(state, game[:ply])
+                times.append(time.perf_counter() - start)
+                state.make_move(game[ply])
+                ply += 1
+                if think:
+                    time.sleep(think)
+        except Exception as exc:
+            with lock:
+                errors.append(repr(exc))
+        with lock:
+            latencies.extend(times)
+
+    threads = [threading.Thread(target=session, args=(client, game), daemon=True)
+               for client, game in zip(clients, games)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def summarize(sessions, latencies, errors, wall, memory):
+    """One report row from a run's measurements"""
+    row = {"sessions": sessions, "moves": len(latencies), "errors": len(errors),
+           "moves_per_s": len(latencies) / wall if wall else 0.0,
+           "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None,
+           "mb_per_session": memory / sessions / 2 ** 20 if memory is not None else None}
+    if latencies:
+        row.update({"p50_ms": 1000 * percentile(latencies, 0.50),
+                    "p95_ms": 1000 * percentile(latencies, 0.95),
+                    "p99_ms": 1000 * percentile(latencies, 0.99),
+                    "max_ms": 1000 * max(latencies)})
+    if errors:
+        row["first_error"] = errors[0]
+    return row
+
+
+def run_inprocess(task):
+    """Run one session count with engines in this process, returns a report row"""
+    sessions, games, moves, think, options = task
+    before = rss_bytes()
+    clients = [InProcessClient(options) for _ in range(sessions)]
+    latencies, errors, wall = run_sessions(clients, games, moves, think)
+    after = rss_bytes()
+    memory = after - before if before is not None and after is not None else None
+    return summarize(sessions, latencies, errors, wall, memory)
+
+
+def run_level(mode, sessions, games, moves, think=0.0, options=None, pool=None,
+              address=None, server_pid=None):
+    """Report row for one session count in mode"""
+    options = options or {}
+    if mode == "inprocess":
+        # A fresh process per count, so its memory growth is this count's alone
+        with multiprocessing.get_context("spawn").Pool(1) as runner:
+            return runner.apply(run_inprocess, ((sessions, games, moves, think, options),))
+    before = None
+    if mode == "pool":
+        worker_memory = {}
+        clients = [PoolClient(pool, worker_memory) for _ in range(sessions)]
+    else:
+        before = rss_bytes(server_pid) if server_pid else None
+        clients = [ServerClient(address, options) for _ in range(sessions)]
+    try:
+        latencies, errors, wall = run_sessions(clients, games, moves, think)
+    finally:
+        for client in clients:
+            client.close()
+    memory = None
+    if mode == "pool":
+        if None not in worker_memory.values():
+            memory = sum(worker_memory.values())
+    elif before is not None:
+        after = rss_bytes(server_pid)
+        memory = after - before if after is not None else None
+    return summarize(sessions, latencies, errors, wall, memory)
+
+
+def within_slo(row, p95=None, p99=None):
+    if row["errors"] or row["p99_ms"] is None:
+        return False
+    return (p95 is None or row["p95_ms"] <= p95) and (p99 is None or row["p99_ms"] <= p99)
+
+
+def capacity(rows, p95=None, p99=None):
+    """Largest session count within the latency objectives, 0 if none"""
+    counts = [row["sessions"] for row in rows if within_slo(row, p95, p99)]
+    return max(counts, default=0)
+
+
+def format_rows(rows):
+    def ms(value):
+        return "-" if value is None else f"{value:.1f}"
+
+    lines = [f"{'sessions':>8}{'moves':>8}{'moves/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+             f"{'p99 ms':>9}{'max ms':>9}{'MB/sess':>9}{'errors':>8}"]
+    for row in rows:
+        lines.append(f"{row['sessions']:>8}{row['moves']:>8}{row['moves_per_s']:>10.1f}"
+                     f"{ms(row['p50_ms']):>9}{ms(row['p95_ms']):>9}{ms(row['p99_ms']):>9}"
+                     f"{ms(row['max_ms']):>9}{ms(row['mb_per_session']):>9}{row['errors']:>8}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test concurrent engine sessions")
+    parser.add_argument("--mode", choices=MODES, default="inprocess")
+    parser.add_argument("--sessions", default=DEFAULT_SESSIONS,
+                        help="comma separated session counts, one run each")
+    parser.add_argument("--moves", type=int, default=20, help="moves asked per session")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--config", default="default",
+                        help="engine options, one of: " + ", ".join(CONFIGS))
+    parser.add_argument("--games", help="recorded games, JSON lines (default: random games)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--think-ms", type=float, default=0,
+                        help="pause of every session between its moves")
+    parser.add_argument("--workers", type=int, default=None, help="pool mode worker processes")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="server mode address")
+    parser.add_argument("--server-pid", type=int, help="server process, for its memory")
+    parser.add_argument("--slo-p95", type=float, metavar="MS")
+    parser.add_argument("--slo-p99", type=float, metavar="MS")
+    parser.add_argument("--min-capacity", type=int, default=0,
+                        help="exit 1 when fewer sessions meet the objectives")
+    parser.add_argument("--json", action="store_true", help="print the rows as JSON lines")
+    args = parser.parse_args(argv)
+
+    if args.config not in CONFIGS:
+        parser.error(f"unknown config {args.config}")
+    if args.mode == "server" and not args.connect:
+        parser.error("--mode server needs --connect")
+    if args.min_capacity and args.slo_p95 is None and args.slo_p99 is None:
+        parser.error("--min-capacity needs --slo-p95 or --slo-p99")
+    counts = [int(count) for count in args.sessions.split(",")]
+    options = dict(CONFIGS[args.config], depth=args.depth)
+    games = session_games(args.games, max(counts), args.seed)
+
+    pool = None
+    if args.mode == "pool":
+        pool = multiprocessing.get_context("spawn").Pool(args.workers, _init_worker, (options,))
+    rows = []
+    try:
+        for count in counts:
+            row = run_level(args.mode, count, games[:count], args.moves, args.think_ms / 1000,
+                            options, pool, args.connect, args.server_pid)
+            rows.append(row)
+            if args.json:
+                print(json.dumps(row), flush=True)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    if not args.json:
+        print(format_rows(rows))
+    if args.slo_p95 is not None or args.slo_p99 is not None:
+        limit = capacity(rows, args.slo_p95, args.slo_p99)
+        print(f"capacity: {limit} sessions within the latency objectives")
+        if limit < args.min_capacity:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
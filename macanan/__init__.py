@@ -0,0 +1,13 @@
+"""Macanan engine package
+
+Importing the package only loads the engine; the tkinter GUI lives in
+macanan.gui and is imported by ``python -m macanan``.
+"""
+from .engine import (DEFAULT_WEIGHTS, EMPTY, MACAN, MAX_MACAN, MAX_UWONG, MOVE_CAPTURE,
+                     MOVE_PLACE, PIECE_NAMES, QUIET_PLY_DRAW, REPETITION_DRAW, UWONG,
+                     WEIGHT_NAMES, BoardGraph, GameState, MacananAI, encode_move, game_result,
+                     iter_bits, move_dst, move_src, square_board, vector_to_weights,
+                     weights_to_vector)
+from .evalcache import EvalCache
+from .timeman import GameClock, TimeManager
+from .tt import TranspositionTable
@@ -0,0 +1,1296 @@
+"""Macanan rules, game state and the MacananAI search, without any GUI"""
+import time
+
+from .evalcache import EVAL_CACHE_ENTRIES, EvalCache
+from .tt import EXACT, LOWER, UPPER, TranspositionTable
+
+# Evaluation weights used by evaluate_placement and evaluate_board. The order
+# of this dict is the order of the parameter vector used by the tuners.
+DEFAULT_WEIGHTS = {
+    # Placement phase, Macan
+    "place_center": 1,            # per step closer to the centre
+    "place_restricted": -3,       # Macan placed on a 4-direction position
+    # Placement phase, Uwong
+    "place_vulnerable": -3000,    # adjacent Uwong pair lined up with Macan
+    "place_encircle": 1000,       # per safely blocked Macan direction
+    "place_safe_block": 800,      # Uwong next to Macan without neighbours
+    "place_spread": 400,          # Uwong not adjacent to other Uwongs
+    "place_left_edge": 300,       # Uwong on the left edge without row neighbour
+    # Terminal positions
+    "win": 1000,
+    # Movement phase, Macan
+    "macan_free_square": 800,     # Macan on an 8-direction position
+    "macan_restricted": -400,     # Macan on a 4-direction position
+    "macan_edge": -1500,
+    "macan_corner": -500,         # on top of the edge penalty
+    "macan_capture": 1000,        # capture available, landing off the edge
+    "macan_edge_capture": 500,    # capture available, landing on the edge
+    "macan_capture_setup": 600,   # adjacent Uwong pair lined up with Macan
+    "macan_center": 50,           # per step closer to the centre
+    "macan_line": 70,             # per Uwong on one of Macan's lines
+    # Movement phase, Uwong
+    "uwong_material": 100,        # per Uwong on the board
+    "uwong_block": 1000,          # per blocked Macan direction
+    "uwong_near_trap": 2000,      # six or more Macan directions blocked
+    "uwong_danger": -400,         # Uwong that can be captured next move
+    "uwong_adjacent": 800,        # safe Uwong next to Macan
+    "uwong_escape_block": 400,    # safe Uwong covering a Macan escape square
+    "uwong_left_edge": 100,
+    "uwong_edge": 50,
+}
+WEIGHT_NAMES = tuple(DEFAULT_WEIGHTS)
+
+
+def weights_to_vector(weights):
+    """Flatten a weights dict into a list ordered like WEIGHT_NAMES"""
+    return [weights[name] for name in WEIGHT_NAMES]
+
+
+def vector_to_weights(vector):
+    """Build a weights dict from a vector ordered like WEIGHT_NAMES"""
+    return dict(zip(WEIGHT_NAMES, vector))
+
+
+# Square contents and side to move
+EMPTY, MACAN, UWONG = 0, 1, 2
+PIECE_NAMES = {MACAN: "macan", UWONG: "uwong"}
+MAX_MACAN, MAX_UWONG = 2, 8
+# Game controllers call a game drawn when a position occurs for the
+# REPETITION_DRAW-th time, or after QUIET_PLY_DRAW plies without a capture
+# or placement
+REPETITION_DRAW = 3
+QUIET_PLY_DRAW = 100
+
+
+def game_result(state, macan_can_move, quiet_plies=0, repetition_draw=REPETITION_DRAW,
+                quiet_ply_draw=QUIET_PLY_DRAW):
+    """(winner, reason) once the game is over after a move, else None
+
+    winner is "macan", "uwong" or "draw" and reason "captures", "macan
+    trapped", "repetition" or "no captures". Macan is trapped when both
+    Macans are on the board and none can move, in either phase: while Uwong
+    is placing it only adds pieces, so the Macans never get free again.
+    quiet_plies counts the plies since the last capture or placement;
+    repetition_draw or quiet_ply_draw 0 turns that rule off. Every game
+    controller (GUI, turbo matches, selfplay) ends its games with this.
+    """
+    if state.eaten_uwong >= state.board.capture_win:
+        return "macan", "captures"
+    if state.macan_count == state.board.max_macan and not macan_can_move:
+        return "uwong", "macan trapped"
+    if repetition_draw and state.repetitions() + 1 >= repetition_draw:
+        return "draw", "repetition"
+    if quiet_ply_draw and quiet_plies >= quiet_ply_draw:
+        return "draw", "no captures"
+    return None
+
+
+# Moves are packed into a single int: destination square in bits 0-7, source
+# square in bits 8-15 and the flags above them. Placements have no source.
+MOVE_CAPTURE = 1 << 16
+MOVE_PLACE = 1 << 17
+
+
+def encode_move(src, dst, flags=0):
+    """Pack a move into an int"""
+    return dst | src << 8 | flags
+
+
+def move_src(move):
+    return (move >> 8) & 0xFF
+
+
+def move_dst(move):
+    return move & 0xFF
+
+
+# Directions as (row, col) signs, in the order regular moves and captures
+# are generated
+STEP_ORDER = [(0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1)]
+CAPTURE_ORDER = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+
+
+def _sign(x):
+    return (x > 0) - (x < 0)
+
+
+def iter_bits(bits):
+    """Yield the square indices set in a bitset, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+MASK64 = (1 << 64) - 1
+ZOBRIST_SEED = 0x4D4143414E414E
+
+
+def zobrist_keys(seed=ZOBRIST_SEED):
+    """Endless 64-bit splitmix64 keys, the same sequence in every process"""
+    while True:
+        seed = (seed + 0x9E3779B97F4A7C15) & MASK64
+        z = ((seed ^ (seed >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        yield z ^ (z >> 31)
+
+
+class BoardGraph:
+    """Squares, adjacency and capture lines of a Macanan board
+
+    A board is given by the (row, col) coordinates of its squares, the edges
+    pieces step along and the edges captures run along (the step edges by
+    default). A capture jumps two squares and lands on a third, all
+    following capture edges in the same direction. Every table the engine
+    uses is generated from that, per square and as bitsets (Python ints, bit
+    i for square i), so boards of any size and shape share one move
+    generator. Squares must number at most 256 to fit the packed moves.
+
+    size is the side of the square grid whose squares come first, numbered
+    row-major, as on the GUI board and in the square names of the server.
+    It is found from coords when they are exactly such a grid, and None on
+    boards of any other shape.
+    """
+
+    def __init__(self, coords, edges, capture_edges=None, centre=(2, 2),
+                 max_macan=MAX_MACAN, max_uwong=MAX_UWONG, capture_win=6, size=None):
+        self.coords = list(coords)
+        self.num_squares = len(self.coords)
+        if size is None:
+            side = int(round(self.num_squares ** 0.5))
+            if self.coords == [divmod(sq, side) for sq in range(side * side)]:
+                size = side
+        self.size = size
+        self.full = (1 << self.num_squares) - 1
+        self.bits = [1 << sq for sq in range(self.num_squares)]
+        self.max_macan = max_macan
+        self.max_uwong = max_uwong
+        # Uwong eaten for Macan to win
+        self.capture_win = capture_win
+
+        def direction(a, b):
+            (ra, ca), (rb, cb) = self.coords[a], self.coords[b]
+            return _sign(rb - ra), _sign(cb - ca)
+
+        def adjacency(pairs):
+            linked = [{} for _ in self.coords]
+            for a, b in pairs:
+                linked[a][direction(a, b)] = b
+                linked[b][direction(b, a)] = a
+            return linked
+
+        steps = adjacency(edges)
+        lines = adjacency(edges if capture_edges is None else capture_edges)
+
+        # Regular moves in STEP_ORDER, all neighbours in row-major order
+        self.step_targets = [tuple(step[d] for d in STEP_ORDER if d in step) for step in steps]
+        self.neighbours = [tuple(line[d] for d in sorted(line)) for line in lines]
+        self.step_masks = [sum(self.bits[t] for t in targets) for targets in self.step_targets]
+        self.neighbour_masks = [sum(self.bits[t] for t in targets) for targets in self.neighbours]
+
+        # Captures as (over1, over2, landing) in CAPTURE_ORDER, and the
+        # jumped squares of every capture by its packed src/dst
+        self.capture_lines = []
+        self.capture_over = {}
+        for src in range(self.num_squares):
+            captures = []
+            for d in CAPTURE_ORDER:
+                over1 = lines[src].get(d)
+                over2 = None if over1 is None else lines[over1].get(d)
+                land = None if over2 is None else lines[over2].get(d)
+                if land is not None:
+                    captures.append((over1, over2, land))
+                    self.capture_over[land | src << 8] = (over1, over2)
+            self.capture_lines.append(tuple(captures))
+
+        # Evaluation terms: restricted squares cannot step to every
+        # neighbour, edges have fewer than 8 neighbours, corners 3 or less
+        self.restricted = [len(self.step_targets[sq]) < len(self.neighbours[sq])
+                           for sq in range(self.num_squares)]
+        self.edge = [len(targets) < 8 for targets in self.neighbours]
+        self.corner = [len(targets) <= 3 for targets in self.neighbours]
+        min_col = min(col for _, col in self.coords)
+        self.left_edge = [col == min_col for _, col in self.coords]
+        # Steps from the furthest grid corner minus steps from the centre
+        cr, cc = centre
+        self.centrality = [cr + cc - abs(row - cr) - abs(col - cc) for row, col in self.coords]
+
+        # Placement evaluation terms, which go by coordinates rather than by
+        # edges: the squares one step up, down, left or right, the ones left
+        # or right only, and per lead Macan square the masks of
+        # placement_masks, built when first asked for
+        index = {pos: sq for sq, pos in enumerate(self.coords)}
+
+        def mask(squares):
+            return sum(self.bits[index[pos]] for pos in squares if pos in index)
+
+        self.row_masks = [mask([(row, col - 1), (row, col + 1)]) for row, col in self.coords]
+        self.grid_masks = [self.row_masks[sq] | mask([(row - 1, col), (row + 1, col)])
+                           for sq, (row, col) in enumerate(self.coords)]
+        self._placement_masks = {}
+
+        # Zobrist keys of GameState.hash: per piece and square (indexed by
+        # MACAN/UWONG), per square of the first Macan in GameState.macans
+        # (the Uwong evaluation follows it), Uwong to move, the placed and
+        # eaten counters, and per search context as
+        # [is_macan_ai][placement evaluation]
+        keys = zobrist_keys()
+        self.zobrist = [None] + [[next(keys) for _ in self.coords] for _ in (MACAN, UWONG)]
+        self.zobrist_lead = [next(keys) for _ in self.coords]
+        self.zobrist_turn = next(keys)
+        self.zobrist_macan_count = [next(keys) for _ in range(max_macan + 1)]
+        self.zobrist_uwong_count = [next(keys) for _ in range(max_uwong + 1)]
+        self.zobrist_eaten = [next(keys) for _ in range(max_uwong + 1)]
+        self.zobrist_context = [[next(keys), next(keys)], [next(keys), next(keys)]]
+
+    def placement_masks(self, lead):
+        """(vulnerable, unsafe) masks of the Uwong placement terms for lead
+
+        vulnerable[sq] holds the squares next to sq that make an Uwong pair
+        with it lined up with a Macan on lead, unsafe[sq] those that make
+        an Uwong on sq, next to that Macan, capturable along its row or
+        column (see MacananAI.evaluate_placement).
+        """
+        masks = self._placement_masks.get(lead)
+        if masks is not None:
+            return masks
+        lr, lc = self.coords[lead]
+        vulnerable = []
+        unsafe = []
+        for sq, (r, c) in enumerate(self.coords):
+            on_diagonal = abs(r - lr) == abs(c - lc)
+            lined_up = 0
+            capturable = 0
+            for other in iter_bits(self.grid_masks[sq]):
+                orow, ocol = self.coords[other]
+                if ((r == orow == lr) or (c == ocol == lc)
+                        or (on_diagonal and abs(orow - lr) == abs(ocol - lc))):
+                    lined_up |= self.bits[other]
+                if (r == lr and orow == lr) or (c == lc and ocol == lc):
+                    capturable |= self.bits[other]
+            vulnerable.append(lined_up)
+            unsafe.append(capturable)
+        masks = self._placement_masks[lead] = (vulnerable, unsafe)
+        return masks
+
+    def __reduce__(self):
+        # Boards from square_board pickle as their arguments, so states sent
+        # to worker processes do not carry every table along
+        if hasattr(self, "spec"):
+            return _square_board_from_spec, self.spec
+        return object.__reduce__(self)
+
+
+# Triangular extension squares as (steps outwards, offset along the side)
+TRIANGLE_POINTS = [(1, -1), (1, 0), (1, 1), (2, -2), (2, 0), (2, 2)]
+TRIANGLE_EDGES = [((0, 0), (1, -1)), ((0, 0), (1, 0)), ((0, 0), (1, 1)),
+                  ((1, -1), (2, -2)), ((1, 0), (2, 0)), ((1, 1), (2, 2)),
+                  ((1, -1), (1, 0)), ((1, 0), (1, 1)), ((2, -2), (2, 0)), ((2, 0), (2, 2))]
+
+# Boards built in this process. Every process builds its own: a 5x5 board
+# takes under a millisecond (15x15 about 7 ms), less than importing the
+# engine, so loading the tables from a file would not start workers faster.
+_BOARDS = {}
+
+
+def square_board(size=5, triangles=(), **pieces):
+    """Alquerque-style size x size board, optionally with triangles attached
+
+    Pieces step orthogonally everywhere and diagonally from squares whose
+    row + col is even; captures run along any row, column or diagonal.
+    triangles names the sides ("top", "bottom", "left", "right") that get
+    a triangular extension with its apex on the middle of that side. Boards
+    are cached, so engines and states on the same board share the tables.
+    """
+    key = (size, tuple(triangles), tuple(sorted(pieces.items())))
+    if key in _BOARDS:
+        return _BOARDS[key]
+
+    coords = [divmod(sq, size) for sq in range(size * size)]
+    index = {pos: sq for sq, pos in enumerate(coords)}
+    edges = []
+    capture_edges = []
+    for (row, col), sq in index.items():
+        for dr, dc in ((0, 1), (1, 1), (1, 0), (1, -1)):
+            other = index.get((row + dr, col + dc))
+            if other is None:
+                continue
+            capture_edges.append((sq, other))
+            if dr == 0 or dc == 0 or (row + col) % 2 == 0:
+                edges.append((sq, other))
+
+    mid, last = size // 2, size - 1
+    sides = {
+        "top": lambda out, along: (-out, mid + along),
+        "bottom": lambda out, along: (last + out, mid + along),
+        "left": lambda out, along: (mid + along, -out),
+        "right": lambda out, along: (mid + along, last + out),
+    }
+    for side in triangles:
+        place = sides[side]
+        for point in TRIANGLE_POINTS:
+            index[place(*point)] = len(coords)
+            coords.append(place(*point))
+        for a, b in TRIANGLE_EDGES:
+            edge = (index[place(*a)], index[place(*b)])
+            edges.append(edge)
+            capture_edges.append(edge)
+
+    board = BoardGraph(coords, edges, capture_edges, (mid, mid), size=size, **pieces)
+    board.spec = (size, tuple(triangles), pieces)
+    _BOARDS[key] = board
+    return board
+
+
+def _square_board_from_spec(size, triangles, pieces):
+    return square_board(size, triangles, **pieces)
+
+
+class GameState:
+    """Compact game state shared by the GUI and the engine
+
+    squares holds EMPTY/MACAN/UWONG per square (row-major on square boards),
+    uwongs the same Uwong squares as a bitset, macans the Macan squares in
+    the order the GUI has always kept them (placement order, a moved Macan
+    goes last), and the counters the pieces placed so far. hash is the
+    Zobrist hash of the pieces, counters and side to move, kept up to date
+    by the moves; call rehash() after setting any of them directly. history
+    holds the hashes of the positions before every move played with
+    make_move, for repetition checks.
+    """
+    __slots__ = ("board", "size", "squares", "uwongs", "macans", "macan_count",
+                 "uwong_count", "eaten_uwong", "turn", "hash", "history")
+
+    def __init__(self, size=5, board=None):
+        self.board = board or square_board(size)
+        self.size = self.board.size
+        self.squares = bytearray(self.board.num_squares)
+        self.uwongs = 0
+        self.macans = []
+        self.macan_count = 0
+        self.uwong_count = 0
+        self.eaten_uwong = 0
+        self.turn = MACAN
+        self.history = []
+        self.rehash()
+
+    @classmethod
+    def from_board(cls, board, macan_positions=None, turn="macan", macan_count=None,
+                   uwong_count=None, eaten_uwong=0):
+        """Build a state from a GUI-style board of "macan"/"uwong"/None"""
+        state = cls(len(board))
+        codes = {None: EMPTY, "macan": MACAN, "uwong": UWONG}
+        squares = [codes[cell] for row in board for cell in row]
+        macans = None
+        if macan_positions:
+            macans = [row * state.size + col for row, col in macan_positions]
+        state.set_squares(squares, macans)
+        on_board_uwong = state.squares.count(UWONG)
+        state.macan_count = len(state.macans) if macan_count is None else macan_count
+        state.uwong_count = on_board_uwong + eaten_uwong if uwong_count is None else uwong_count
+        state.eaten_uwong = eaten_uwong
+        state.turn = MACAN if turn in ("macan", MACAN) else UWONG
+        state.rehash()
+        return state
+
+    def set_squares(self, squares, macans=None):
+        """Replace the board contents, macans defaults to the scan order"""
+        self.squares = bytearray(squares)
+        if macans is None:
+            macans = [sq for sq, piece in enumerate(self.squares) if piece == MACAN]
+        self.macans = list(macans)
+        self.uwongs = sum(self.board.bits[sq]
+                          for sq, piece in enumerate(self.squares) if piece == UWONG)
+        self.history = []
+        self.rehash()
+
+    def rehash(self):
+        """Recompute hash from scratch"""
+        board = self.board
+        h = (board.zobrist_macan_count[self.macan_count]
+             ^ board.zobrist_uwong_count[self.uwong_count] ^ board.zobrist_eaten[self.eaten_uwong])
+        if self.turn == UWONG:
+            h ^= board.zobrist_turn
+        if self.macans:
+            h ^= board.zobrist_lead[self.macans[0]]
+        for sq, piece in enumerate(self.squares):
+            if piece:
+                h ^= board.zobrist[piece][sq]
+        self.hash = h
+
+    def to_board(self):
+        """GUI-style board of "macan"/"uwong"/None for the square grid"""
+        n = self.size
+        return [[PIECE_NAMES.get(self.squares[i * n + j]) for j in range(n)] for i in range(n)]
+
+    def copy(self):
+        state = GameState.__new__(GameState)
+        state.board = self.board
+        state.size = self.size
+        state.squares = bytearray(self.squares)
+        state.uwongs = self.uwongs
+        state.macans = self.macans[:]
+        state.macan_count = self.macan_count
+        state.uwong_count = self.uwong_count
+        state.eaten_uwong = self.eaten_uwong
+        state.turn = self.turn
+        state.hash = self.hash
+        state.history = self.history[:]
+        return state
+
+    def repetitions(self):
+        """How many times the current position occurred before
+
+        Positions compare by hash, so the lead Macan (macans[0]) must match too.
+        """
+        return self.history.count(self.hash)
+
+    def occupied(self):
+        """Bitset of all occupied squares"""
+        bits = self.board.bits
+        occupied = self.uwongs
+        for sq in self.macans:
+            occupied |= bits[sq]
+        return occupied
+
+    @property
+    def phase(self):
+        """"placement" until every piece is on the board, then "movement\""""
+        if self.macan_count < self.board.max_macan or self.uwong_count < self.board.max_uwong:
+            return "placement"
+        return "movement"
+
+    def is_placing(self):
+        """Whether the side to move still has pieces to place"""
+        if self.turn == MACAN:
+            return self.macan_count < self.board.max_macan
+        return self.uwong_count < self.board.max_uwong
+
+    def pass_turn(self):
+        """Hand the turn to the other side without moving (null move)"""
+        self.turn = UWONG if self.turn == MACAN else MACAN
+        self.hash ^= self.board.zobrist_turn
+
+    def make_move(self, move):
+        """Play a move for the side to move and return the undo information"""
+        board = self.board
+        squares = self.squares
+        bits = board.bits
+        keys = board.zobrist[self.turn]
+        dst = move & 0xFF
+        undo = None
+        self.history.append(self.hash)
+        h = self.hash ^ board.zobrist_turn ^ keys[dst]
+        if move & MOVE_PLACE:
+            squares[dst] = self.turn
+            if self.turn == MACAN:
+                if not self.macans:
+                    h ^= board.zobrist_lead[dst]
+                self.macans.append(dst)
+                counts = board.zobrist_macan_count
+                h ^= counts[self.macan_count] ^ counts[self.macan_count + 1]
+                self.macan_count += 1
+            else:
+                self.uwongs |= bits[dst]
+                counts = board.zobrist_uwong_count
+                h ^= counts[self.uwong_count] ^ counts[self.uwong_count + 1]
+                self.uwong_count += 1
+        else:
+            src = (move >> 8) & 0xFF
+            squares[src] = EMPTY
+            squares[dst] = self.turn
+            h ^= keys[src]
+            if self.turn == MACAN:
+                lead = self.macans[0]
+                undo = self.macans.index(src)
+                del self.macans[undo]
+                self.macans.append(dst)
+                h ^= board.zobrist_lead[lead] ^ board.zobrist_lead[self.macans[0]]
+                if move & MOVE_CAPTURE:
+                    over1, over2 = board.capture_over[move & 0xFFFF]
+                    squares[over1] = EMPTY
+                    squares[over2] = EMPTY
+                    self.uwongs ^= bits[over1] | bits[over2]
+                    uwong_keys = board.zobrist[UWONG]
+                    eaten = board.zobrist_eaten
+                    h ^= (uwong_keys[over1] ^ uwong_keys[over2]
+                          ^ eaten[self.eaten_uwong] ^ eaten[self.eaten_uwong + 2])
+                    self.eaten_uwong += 2
+            else:
+                self.uwongs ^= bits[src] | bits[dst]
+        self.turn = UWONG if self.turn == MACAN else MACAN
+        self.hash = h
+        return undo
+
+    def unmake_move(self, move, undo):
+        """Take back a move played with make_move"""
+        self.turn = UWONG if self.turn == MACAN else MACAN
+        self.hash = self.history.pop()
+        squares = self.squares
+        bits = self.board.bits
+        dst = move & 0xFF
+        if move & MOVE_PLACE:
+            squares[dst] = EMPTY
+            if self.turn == MACAN:
+                self.macans.pop()
+                self.macan_count -= 1
+            else:
+                self.uwongs ^= bits[dst]
+                self.uwong_count -= 1
+        else:
+            src = (move >> 8) & 0xFF
+            squares[dst] = EMPTY
+            squares[src] = self.turn
+            if self.turn == MACAN:
+                self.macans.pop()
+                self.macans.insert(undo, src)
+                if move & MOVE_CAPTURE:
+                    over1, over2 = self.board.capture_over[move & 0xFFFF]
+                    squares[over1] = UWONG
+                    squares[over2] = UWONG
+                    self.uwongs |= bits[over1] | bits[over2]
+                    self.eaten_uwong -= 2
+            else:
+                self.uwongs ^= bits[src] | bits[dst]
+
+
+# Late-move reductions: moves searched at full depth first, minimum depth
+LMR_MOVES = 8
+LMR_MIN_DEPTH = 3
+LMR_REDUCTION = 1
+# Null move depth reduction
+NULL_MOVE_R = 2
+# Macan move count at or below which a position counts as a macan-trap
+# ending, searched without reductions or null moves
+TRAP_MOBILITY = 3
+# Deepest iteration of iter_search, and how many nodes pass between checks
+# of its stop condition: at 30-60k nodes/s about 1-2 ms, which bounds how
+# far a search overruns its time limit. A check costs well under a
+# microsecond, far less than a node
+MAX_SEARCH_DEPTH = 64
+STOP_CHECK_NODES = 64
+# Tree nodes the proof-number solver (macanan.solver) may create per move
+SOLVER_NODES = 5000
+# Score of a position repeating an earlier one, in the game or the search
+DRAW_SCORE = 0
+# Size (MB) of the table an engine without a transposition table keeps for
+# its placement searches, whose many move orders reach the same positions
+PLACEMENT_MEMO_MB = 1
+# Extra plies of the placement searches over the engine depth, which the
+# memo and the bitset placement evaluation pay for
+PLACEMENT_EXTRA_DEPTH = 1
+
+
+class SearchStopped(Exception):
+    """Raised inside the search when iter_search's stop condition is met"""
+
+
+class MacananAI:
+    def __init__(self, board_size=5, weights=None, board=None, depth=3, ordering=True,
+                 lmr=False, null_move=False, tt=None, solver_nodes=SOLVER_NODES,
+                 placement_depth=None, eval_cache_entries=EVAL_CACHE_ENTRIES):
+        self.board = board or square_board(board_size)
+        self.board_size = self.board.size
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights is not None:
+            self.weights.update(weights)
+        # Search depths of get_best_move and get_best_placement, and the
+        # selective search switches, see _search
+        self.depth = depth
+        self.placement_depth = placement_depth or depth + PLACEMENT_EXTRA_DEPTH
+        self.ordering = ordering
+        self.lmr = lmr
+        self.null_move = null_move
+        # Transposition table (see macanan.tt) kept across searches, or None
+        self.tt = tt
+        # Own table of the placement searches when tt is None, made on first use
+        self._placement_memo = None
+        # Scores of the movement leaves by position (see macanan.evalcache), made
+        # on the first movement search since many engines never search; None
+        # until then and with eval_cache_entries 0
+        self.eval_cache_entries = eval_cache_entries
+        self.eval_cache = None
+        # Node budget of the endgame solver, 0 to never use it
+        self.solver_nodes = solver_nodes
+        # Principal variation per ply, filled in by the searches
+        self._pv = {}
+        # Stop condition polled by the search, set by iter_search
+        self._should_stop = None
+        self._new_search()
+        self._build_tables()
+
+    def _build_tables(self):
+        """Bind the board's per-square tables used in the hot loops"""
+        board = self.board
+        self.coords = board.coords
+        self.restricted = board.restricted
+        # Regular moves: 4 directions on restricted positions, 8 elsewhere
+        self.step_targets = board.step_targets
+        self.step_masks = board.step_masks
+        # All neighbours regardless of the movement rules
+        self.neighbours = board.neighbours
+        self.neighbour_masks = board.neighbour_masks
+        # Captures as (over1, over2, landing) per direction
+        self.capture_lines = board.capture_lines
+        self.edge = board.edge
+        self.corner = board.corner
+        self.left_edge = board.left_edge
+        self.centrality = board.centrality
+        # Squares one grid step away, all and within the row (placement terms)
+        self.grid_masks = board.grid_masks
+        self.row_masks = board.row_masks
+
+    def has_valid_moves(self, state):
+        """Check if Macan has any valid moves available"""
+        squares = state.squares
+        empty = ~state.occupied()
+        for src in state.macans:
+            if self.step_masks[src] & empty:
+                return True
+            for over1, over2, land in self.capture_lines[src]:
+                if squares[land] == EMPTY and squares[over1] == UWONG and squares[over2] == UWONG:
+                    return True
+        return False
+
+    def evaluate_placement(self, state, is_macan_ai):
+        """Evaluate board state during placement phase"""
+        w = self.weights
+        score = 0
+
+        if is_macan_ai:
+            # Prefer central positions for Macan
+            for sq in state.macans:
+                # Center positions are worth more
+                score += self.centrality[sq] * w["place_center"]
+                # Avoid restricted positions during placement
+                if self.restricted[sq]:
+                    score += w["place_restricted"]
+        else:  # Uwong placement strategy
+            # Every term is a bitset test per Uwong, with the masks of the
+            # main Macan position from BoardGraph.placement_masks
+            uwongs = state.uwongs
+            macan_sq = state.macans[0]  # Main Macan position
+            vulnerable, unsafe = self.board.placement_masks(macan_sq)
+            grid_masks = self.grid_masks
+            next_to_macan = grid_masks[macan_sq]
+            pairs = safe_blocks = spread = left_edge = 0
+            for sq in iter_bits(uwongs):
+                # CRITICAL: adjacent Uwong pairs lined up with the Macan,
+                # counted from both ends
+                pairs += bin(uwongs & vulnerable[sq]).count("1")
+                # Uwongs without Uwong neighbours: spread out, and safely
+                # blocking when next to the Macan
+                if not uwongs & grid_masks[sq]:
+                    spread += 1
+                    if next_to_macan >> sq & 1:
+                        safe_blocks += 1
+                # Strategic left edge positions without a row neighbour
+                if self.left_edge[sq] and not uwongs & self.row_masks[sq]:
+                    left_edge += 1
+
+            # Encirclement: Macan directions blocked by Uwongs that cannot
+            # be captured along the Macan's row or column
+            blocked_directions = 0
+            for sq in iter_bits(self.neighbour_masks[macan_sq] & uwongs):
+                if not uwongs & unsafe[sq]:
+                    blocked_directions += 1
+
+            score += (pairs * w["place_vulnerable"]
+                      + blocked_directions * w["place_encircle"]
+                      + safe_blocks * w["place_safe_block"]
+                      + spread * w["place_spread"]
+                      + left_edge * w["place_left_edge"])
+
+        return score
+    
+    def _board_evaluation(self):
+        """evaluate_board for the searches, through the evaluation cache if any"""
+        if not self.eval_cache_entries:
+            return self.evaluate_board
+        if self.eval_cache is None:
+            self.eval_cache = EvalCache(self.eval_cache_entries)
+        return self._cached_evaluate_board
+
+    def _cached_evaluate_board(self, state, is_macan_ai):
+        key = state.hash ^ self.board.zobrist_context[is_macan_ai][0]
+        score = self.eval_cache.probe(key)
+        if score is None:
+            score = self.evaluate_board(state, is_macan_ai)
+            self.eval_cache.store(key, score)
+        return score
+
+    def evaluate_board(self, state, is_macan_ai):
+        """
+        Evaluate the current board state with improved Uwong strategy
+        """
+        w = self.weights
+        squares = state.squares
+        board = self.board
+
+        # Get all Uwong positions
+        uwong_positions = [self.coords[sq] for sq in iter_bits(state.uwongs)]
+        uwong_count = len(uwong_positions)
+        
+        # Win/Loss conditions
+        if uwong_count <= board.max_uwong - board.capture_win:
+            return w["win"]  # Macan wins
+        if not self.has_valid_moves(state):
+            return -w["win"]  # Uwong wins
+        
+        if is_macan_ai:
+            # Base score
+            score = 0
+
+            # MACAN EVALUATION SECTION
+            for macan_sq in state.macans:
+                row, col = self.coords[macan_sq]
+
+                # Highest priority - Check if position has 8-direction movement
+                if not self.restricted[macan_sq]:
+                    score += w["macan_free_square"]  # Very high bonus for 8-direction movement position
+                else:
+                    score += w["macan_restricted"]  # Heavy penalty for 4-direction movement position
+                
+                # Much heavier penalty for edge positions
+                if self.edge[macan_sq]:
+                    score += w["macan_edge"]  # Significantly increased penalty for being on edge
+                    # Extra penalty for corners which are even worse
+                    if self.corner[macan_sq]:
+                        score += w["macan_corner"]  # Additional penalty for corners
+
+                # Check for immediate capture opportunities
+                for over1, over2, land in self.capture_lines[macan_sq]:
+                    if squares[land] == EMPTY and squares[over1] == UWONG and squares[over2] == UWONG:
+                        # Reduce capture bonus if it requires moving to edge
+                        if self.edge[land]:
+                            score += w["macan_edge_capture"]  # Reduced reward for edge captures
+                        else:
+                            score += w["macan_capture"]  # Normal capture reward for non-edge positions
+
+                # Check for potential capture setups (two adjacent Uwongs)
+                for uwong1 in uwong_positions:
+                    for uwong2 in uwong_positions:
+                        if uwong1 != uwong2:
+                            if abs(uwong1[0] - uwong2[0]) + abs(uwong1[1] - uwong2[1]) == 1:  # Adjacent Uwongs
+                                if ((uwong1[0] == row and uwong2[0] == row) or  # Same row
+                                    (uwong1[1] == col and uwong2[1] == col) or  # Same column
+                                    (abs(uwong1[0] - row) == abs(uwong1[1] - col) and  # Diagonal
+                                    abs(uwong2[0] - row) == abs(uwong2[1] - col))):
+                                    score += w["macan_capture_setup"]  # Good potential for capture
+
+                # Prefer central positions but not as important as 8-direction movement
+                score += self.centrality[macan_sq] * w["macan_center"]  # Reduced center control bonus
+
+                # Bonus for controlling multiple lines
+                controlled_lines = 0
+                for uwong_pos in uwong_positions:
+                    if (uwong_pos[0] == row or uwong_pos[1] == col or 
+                        abs(uwong_pos[0] - row) == abs(uwong_pos[1] - col)):
+                        controlled_lines += 1
+                score += controlled_lines * w["macan_line"]
+        else :
+            score = 0
+            macan_sq = state.macans[0]
+            macan_pos = self.coords[macan_sq]
+            
+            # Basic survival score
+            score += uwong_count * w["uwong_material"]  # Reduced from 200
+            
+            # MAJOR PRIORITY: Encirclement evaluation
+            directions_blocked = 0
+            potential_moves = []
+            for sq in self.neighbours[macan_sq]:
+                if squares[sq] == UWONG:
+                    directions_blocked += 1
+                else:
+                    potential_moves.append(self.coords[sq])
+            
+            # Massive bonus for successful encirclement
+            score += directions_blocked * w["uwong_block"]  # Increased from 400
+            
+            # Additional bonus for nearly complete encirclement
+            if directions_blocked >= 6:  # If most directions are blocked
+                score += w["uwong_near_trap"]  # Extra bonus to strongly encourage completing the encirclement
+            
+            # Evaluate each Uwong's position
+            for uwong_sq in iter_bits(state.uwongs):
+                uwong_pos = self.coords[uwong_sq]
+                # Check only for immediate capture threats
+                in_immediate_danger = False
+                for other_pos in uwong_positions:
+                    if other_pos != uwong_pos:
+                        if ((uwong_pos[0] == macan_pos[0] == other_pos[0] and 
+                            abs(uwong_pos[1] - other_pos[1]) == 1) or
+                            (uwong_pos[1] == macan_pos[1] == other_pos[1] and 
+                            abs(uwong_pos[0] - other_pos[0]) == 1)):
+                            in_immediate_danger = True
+                            break
+                
+                if in_immediate_danger:
+                    score += w["uwong_danger"]  # Only moderate penalty for dangerous positions
+                else:
+                    # Major bonus for blocking Macan's movement
+                    if abs(uwong_pos[0] - macan_pos[0]) + abs(uwong_pos[1] - macan_pos[1]) == 1:
+                        score += w["uwong_adjacent"]  # Increased from 300
+                    
+                    # Bonus for positions that could block Macan's escape routes
+                    for potential_move in potential_moves:
+                        if abs(uwong_pos[0] - potential_move[0]) + abs(uwong_pos[1] - potential_move[1]) == 1:
+                            score += w["uwong_escape_block"]  # Increased from 150
+                
+                # Reduced edge position bonuses
+                if self.left_edge[uwong_sq]:  # Left edge
+                    score += w["uwong_left_edge"]  # Reduced from 250
+                elif self.edge[uwong_sq]:
+                    score += w["uwong_edge"]  # Reduced from 150
+        
+        return score
+
+    def get_placement_moves(self, state):
+        """Get all possible placement positions"""
+        return [sq | MOVE_PLACE for sq in iter_bits(self.board.full & ~state.occupied())]
+
+    def get_macan_moves(self, state):
+        """All Macan moves, captures first for each Macan"""
+        squares = state.squares
+        moves = []
+        for src in state.macans:
+            for over1, over2, land in self.capture_lines[src]:
+                if squares[land] == EMPTY and squares[over1] == UWONG and squares[over2] == UWONG:
+                    moves.append(land | src << 8 | MOVE_CAPTURE)
+            for dst in self.step_targets[src]:
+                if squares[dst] == EMPTY:
+                    moves.append(dst | src << 8)
+        return moves
+
+    def get_uwong_moves(self, state):
+        """All one-step Uwong moves"""
+        squares = state.squares
+        empty = ~state.occupied()
+        moves = []
+        for src in iter_bits(state.uwongs):
+            if self.step_masks[src] & empty:
+                for dst in self.step_targets[src]:
+                    if squares[dst] == EMPTY:
+                        moves.append(dst | src << 8)
+        return moves
+
+    def generate_moves(self, state):
+        """All legal moves for the side to move, placements included"""
+        if state.is_placing():
+            return self.get_placement_moves(state)
+        if state.turn == MACAN:
+            return self.get_macan_moves(state)
+        return self.get_uwong_moves(state)
+
+    def _new_search(self, placement=False):
+        """Reset the per-search node count and move ordering tables
+
+        The search uses the transposition table, or without one, for a
+        placement search, the engine's placement memo.
+        """
+        self.nodes = 0
+        # Up to two quiet moves per ply that caused a cutoff
+        self._killers = {}
+        # Cutoff counts per move, weighted by remaining depth
+        self._history = {}
+        # Scores (or bounds) of the root moves in the last root search
+        self._root_scores = {}
+        self._table = self.tt
+        if self._table is None and placement:
+            if self._placement_memo is None:
+                self._placement_memo = TranspositionTable(PLACEMENT_MEMO_MB)
+            self._table = self._placement_memo
+        if self._table is not None:
+            self._table.new_search()
+
+    def order_moves(self, moves, ply):
+        """Captures first, then this ply's killer moves, then by history score
+
+        Root moves already scored by an earlier search of the same root (see
+        analyse_multipv) are ordered by that score instead.
+        """
+        if ply == 0 and self._root_scores:
+            scores = self._root_scores
+            return sorted(moves, key=lambda move: -scores.get(move, float('inf')))
+        killers = self._killers.get(ply, ())
+        history = self._history
+        return sorted(moves, key=lambda move: (not move & MOVE_CAPTURE, move not in killers,
+                                               -history.get(move, 0)))
+
+    def _store_cutoff(self, move, ply, depth):
+        killers = self._killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        self._history[move] = self._history.get(move, 0) + depth * depth
+
+    def _in_trap_ending(self, state, moves):
+        """Whether Macan is short of moves, so being forced to move decides the game"""
+        if state.macan_count < self.board.max_macan:
+            return False
+        macan_moves = moves if state.turn == MACAN else self.get_macan_moves(state)
+        return len(macan_moves) <= TRAP_MOBILITY
+
+    def _search(self, state, depth, alpha, beta, is_maximizing, is_macan_ai, evaluate,
+                ply=0, allow_null=True, exclude=None):
+        """Alpha-beta over the legal moves of state, scoring leaves with evaluate
+
+        With lmr, quiet moves after the first LMR_MOVES are searched
+        LMR_REDUCTION plies shallower and re-searched at full depth when they
+        beat the bound. With null_move, Macan first tries passing with a
+        search NULL_MOVE_R plies shallower, and the node is cut off if even
+        that reaches the bound. Root moves in exclude are skipped. With a
+        transposition table, a stored result at least as deep as depth
+        answers the node below the root, and the stored move goes first;
+        the PV of an exact answer continues with the table's moves (see
+        _table_line). A position below the root that repeats an earlier
+        one is a draw, so cycles are not searched again.
+        """
+        self.nodes += 1
+        if self._should_stop and not self.nodes % STOP_CHECK_NODES and self._should_stop():
+            raise SearchStopped
+        self._pv[ply] = []
+        if ply and state.hash in state.history:
+            return DRAW_SCORE, None
+        if depth <= 0:
+            return evaluate(state, is_macan_ai), None
+
+        key = tt_move = None
+        if self._table is not None and not exclude:
+            # Scores depend on the root side and the evaluation used
+            context = self.board.zobrist_context[is_macan_ai][
+                evaluate.__name__ == "evaluate_placement"]
+            key = state.hash ^ context
+            entry = self._table.probe(key)
+            if entry is not None:
+                tt_move, tt_depth, flag, tt_score = entry
+                if not ply or tt_depth < depth:
+                    pass
+                elif flag == EXACT:
+                    # An exact score can end up on the PV, so it is only
+                    # taken with its whole line still in the table
+                    line = self._table_line(state, context, depth)
+                    if line is not None:
+                        self._pv[ply] = line
+                        return tt_score, tt_move or None
+                elif (flag == LOWER and tt_score >= beta) or (flag == UPPER and tt_score <= alpha):
+                    if tt_move:
+                        self._pv[ply] = [tt_move]
+                    return tt_score, tt_move or None
+        alpha_start, beta_start = alpha, beta
+
+        moves = self.generate_moves(state)
+        if exclude:
+            moves = [move for move in moves if move not in exclude]
+        # No reductions or null moves in macan-trap endings, where every
+        # tempo counts. Only Macan passes: every Uwong move loosens the
+        # encirclement, so Uwong positions are too often zugzwang.
+        selective = (self.lmr or self.null_move) and depth >= 2 and ply
+        if selective and self._in_trap_ending(state, moves):
+            selective = False
+        bound = beta if is_maximizing else alpha
+        if (selective and self.null_move and allow_null and depth > NULL_MOVE_R
+                and state.turn == MACAN and state.phase == "movement"
+                and bound not in (float('inf'), float('-inf'))):
+            state.pass_turn()
+            if is_maximizing:
+                score, _ = self._search(state, depth - 1 - NULL_MOVE_R, beta - 1, beta, False,
+                                        is_macan_ai, evaluate, ply + 1, False)
+            else:
+                score, _ = self._search(state, depth - 1 - NULL_MOVE_R, alpha, alpha + 1, True,
+                                        is_macan_ai, evaluate, ply + 1, False)
+            state.pass_turn()
+            if (score >= beta) if is_maximizing else (score <= alpha):
+                self._pv[ply] = []
+                return score, None
+
+        if self.ordering:
+            moves = self.order_moves(moves, ply)
+        if tt_move and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+        best_score = float('-inf') if is_maximizing else float('inf')
+        best_move = None
+        for i, move in enumerate(moves):
+            undo = state.make_move(move)
+            if (selective and self.lmr and i >= LMR_MOVES and depth >= LMR_MIN_DEPTH
+                    and not move & MOVE_CAPTURE):
+                score, _ = self._search(state, depth - 1 - LMR_REDUCTION, alpha, beta,
+                                        not is_maximizing, is_macan_ai, evaluate, ply + 1)
+                if (score > alpha) if is_maximizing else (score < beta):
+                    score, _ = self._search(state, depth - 1, alpha, beta, not is_maximizing,
+                                            is_macan_ai, evaluate, ply + 1)
+            else:
+                score, _ = self._search(state, depth - 1, alpha, beta, not is_maximizing,
+                                        is_macan_ai, evaluate, ply + 1)
+            state.unmake_move(move, undo)
+            if not ply:
+                self._root_scores[move] = score
+
+            if is_maximizing:
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                alpha = max(alpha, best_score)
+            else:
+                if score < best_score:
+                    best_score = score
+                    best_move = move
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                beta = min(beta, best_score)
+            if beta <= alpha:
+                if self.ordering and not move & MOVE_CAPTURE:
+                    self._store_cutoff(move, ply, depth)
+                break
+
+        if key is not None:
+            if best_score <= alpha_start:
+                flag = UPPER
+            elif best_score >= beta_start:
+                flag = LOWER
+            else:
+                flag = EXACT
+            self._table.store(key, best_move, depth, flag, best_score)
+        return best_score, best_move
+
+    def _table_line(self, state, context, depth):
+        """The table's best moves from state on, as the PV of a search to depth
+
+        Stands in for the PV below a node answered from the table, which
+        searched no further. The line ends after depth moves, at a stored
+        node without a move or at a repeated position, as the PV would.
+        Returns None when an entry on the way is missing (replaced) or
+        holds a move that is not legal (another position's entry).
+        """
+        line = []
+        played = []
+        while len(line) < depth:
+            entry = self._table.probe(state.hash ^ context)
+            if entry is None or entry[0] and entry[0] not in self.generate_moves(state):
+                line = None
+                break
+            move = entry[0]
+            if not move:
+                break
+            played.append((move, state.make_move(move)))
+            line.append(move)
+            if state.hash in state.history:
+                break
+        for move, undo in reversed(played):
+            state.unmake_move(move, undo)
+        return line
+
+    def minimax_placement(self, state, depth, alpha, beta, is_maximizing, is_macan_ai):
+        """Minimax algorithm for placement phase"""
+        self._new_search(placement=True)
+        return self._search(state, depth, alpha, beta, is_maximizing, is_macan_ai,
+                            self.evaluate_placement)
+
+    def minimax(self, state, depth, alpha, beta, is_maximizing, is_macan_ai):
+        self._new_search()
+        return self._search(state, depth, alpha, beta, is_maximizing, is_macan_ai,
+                            self._board_evaluation())
+
+    def get_best_placement(self, state):
+        """Get the best placement move"""
+        _, best_move = self.minimax_placement(state, depth=self.placement_depth,
+                                            alpha=float('-inf'), beta=float('inf'),
+                                            is_maximizing=True,
+                                            is_macan_ai=state.turn == MACAN)
+        return best_move
+
+    def analyse_placement(self, state, depth=None):
+        """Search a placement position and return (score, best_move, pv)"""
+        score, best_move = self.minimax_placement(state, depth or self.placement_depth,
+                                                  float('-inf'), float('inf'),
+                                                  True, state.turn == MACAN)
+        return score, best_move, self._pv[0]
+
+    def find_capture(self, state):
+        """Return the first available capture move, or None"""
+        for move in self.get_macan_moves(state):
+            if move & MOVE_CAPTURE:
+                return move
+        return None
+
+    def is_sharp_endgame(self, state):
+        """Whether Macan is short of moves or one capture away from winning"""
+        if state.phase != "movement":
+            return False
+        if self.board.capture_win - state.eaten_uwong <= 2:
+            return True
+        return len(self.get_macan_moves(state)) <= TRAP_MOBILITY
+
+    def solve(self, state, stop=None):
+        """Winning move of a sharp endgame proven by the solver, or None
+
+        stop, polled by the solver, ends the attempt early when it returns true.
+        """
+        if not self.solver_nodes or not self.is_sharp_endgame(state):
+            return None
+        from .solver import prove
+        proven, move, _ = prove(self, state, self.solver_nodes, stop)
+        return move if proven else None
+
+    def get_best_move(self, state):
+        """Get the best move using minimax with capture priority"""
+        # First check for any possible captures
+        if state.turn == MACAN:
+            capture = self.find_capture(state)
+            if capture:
+                return capture
+
+        # Then for a forced win beyond the search depth
+        winning = self.solve(state)
+        if winning:
+            return winning
+
+        _, best_move = self.minimax(state, depth=self.depth, 
+                                alpha=float('-inf'), beta=float('inf'), 
+                                is_maximizing=True, is_macan_ai=state.turn == MACAN)
+        return best_move
+
+    def analyse_move(self, state, depth=None):
+        """Search a movement position and return (score, best_move, pv)
+
+        Mirrors get_best_move: an available capture is always played, and
+        only the reply to it is searched to obtain its score. A win proven
+        by the solver scores inf.
+        """
+        depth = depth or self.depth
+        is_macan_ai = state.turn == MACAN
+        capture = self.find_capture(state) if is_macan_ai else None
+        winning = self.solve(state) if capture is None else None
+        if winning:
+            return float('inf'), winning, [winning]
+        if capture is None:
+            score, best_move = self.minimax(state, depth, float('-inf'), float('inf'),
+                                            True, is_macan_ai)
+            return score, best_move, self._pv[0]
+
+        undo = state.make_move(capture)
+        score, _ = self.minimax(state, depth - 1, float('-inf'), float('inf'),
+                                False, is_macan_ai)
+        state.unmake_move(capture, undo)
+        return score, capture, [capture] + self._pv[0]
+
+    def analyse_multipv(self, state, k=3, depth=None):
+        """Search the k best moves and return [(score, move, pv), ...], best first
+
+        Each line searches the root again with the moves already found
+        excluded and the previous line's score as upper bound, so later lines
+        cost far less than separate searches of every candidate. Unlike
+        get_best_move, captures are not forced.
+        """
+        depth = depth or self.depth
+        evaluate = self.evaluate_placement if state.is_placing() else self._board_evaluation()
+        self._new_search(state.is_placing())
+        lines = []
+        found = set()
+        beta = float('inf')
+        for _ in range(k):
+            score, move = self._search(state, depth, float('-inf'), beta, True,
+                                       state.turn == MACAN, evaluate, exclude=found)
+            if move is None:
+                break
+            lines.append((score, move, self._pv[0]))
+            found.add(move)
+            beta = score
+        return lines
+
+    def iter_search(self, state, max_depth=MAX_SEARCH_DEPTH, time_limit=None, stop=None):
+        """Iterative deepening search yielding progress records
+
+        A record {"depth", "move", "score", "pv", "nodes", "time", "complete"}
+        is yielded whenever an iteration completes ("complete" True) and
+        whenever the best move changes during an iteration (False). The
+        search ends after max_depth, once time_limit seconds have passed, as
+        soon as stop() returns true, or when the caller stops iterating.
+        Each iteration searches the previous best move first. As in
+        get_best_move, an available capture is always played. The search
+        runs on a copy of state, which the caller may change meanwhile.
+        """
+        start = time.monotonic()
+        state = state.copy()
+        is_macan_ai = state.turn == MACAN
+        evaluate = self.evaluate_placement if state.is_placing() else self._board_evaluation()
+        capture = self.find_capture(state) if is_macan_ai and not state.is_placing() else None
+        root_moves = [capture] if capture else self.generate_moves(state)
+        if not root_moves:
+            return
+
+        def should_stop():
+            if stop is not None and stop():
+                return True
+            return time_limit is not None and time.monotonic() - start >= time_limit
+
+        def record(depth, move, score, pv, complete):
+            return {"depth": depth, "move": move, "score": score, "pv": pv,
+                    "nodes": self.nodes, "time": time.monotonic() - start,
+                    "complete": complete}
+
+        self._new_search(state.is_placing())
+        self._should_stop = should_stop
+        try:
+            for depth in range(1, max_depth + 1):
+                scores = self._root_scores
+                root_moves.sort(key=lambda move: -scores.get(move, float('inf')))
+                best_score, best_move, best_pv = float('-inf'), None, []
+                for i, move in enumerate(root_moves):
+                    undo = state.make_move(move)
+                    score, _ = self._search(state, depth - 1, best_score, float('inf'),
+                                            False, is_macan_ai, evaluate, ply=1)
+                    state.unmake_move(move, undo)
+                    scores[move] = score
+                    if score > best_score or best_move is None:
+                        best_score, best_move = score, move
+                        best_pv = [move] + self._pv[1]
+                        if depth > 1 and i:
+                            yield record(depth, best_move, best_score, best_pv, False)
+                yield record(depth, best_move, best_score, best_pv, True)
+                if should_stop():
+                    return
+        except SearchStopped:
+            return
+        finally:
+            self._should_stop = None
+
+    async def aiter_search(self, state, max_depth=MAX_SEARCH_DEPTH, time_limit=None):
+        """Async iterator over the iter_search records, searched in a worker thread
+
+        Leaving the loop early, or cancelling the consumer, stops the search.
+        """
+        import asyncio
+        import threading
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stopped = threading.Event()
+        done = object()
+
+        def run():
+            try:
+                for item in self.iter_search(state, max_depth, time_limit, stopped.is_set):
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        worker = loop.run_in_executor(None, run)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            stopped.set()
+            await worker
+
+    def analyse(self, state, depth=None):
+        """Search any position for the side to move and return (score, best_move, pv)"""
+        if state.is_placing():
+            return self.analyse_placement(state, depth)
+        return self.analyse_move(state, depth)
@@ -0,0 +1,78 @@
+"""Fixed-size cache of leaf evaluations by position key
+
+Alpha-beta reaches the same leaf through different move orders and again
+in every iteration of a deepening search, and evaluate_board costs far
+more than a lookup. The cache keeps one score per slot in arrays
+allocated up front, so it never grows:
+
+    cache = EvalCache(1 << 16)
+    score = cache.probe(key)        # None on a miss
+    cache.store(key, score)
+
+Unlike the transposition table it holds no depth or bounds, only exact
+static scores, and it belongs to one engine: the scores are only valid for
+that engine's weights.
+"""
+# Default number of slots
+EVAL_CACHE_ENTRIES = 1 << 16
+
+
+class EvalCache:
+    """Direct-mapped (key, score) slots, a new score replacing the old one
+
+    Keys are 64-bit, the slot is picked by their low bits. The counters
+    (probes, hits, stores, overwrites) say how well the cache works.
+    """
+
+    def __init__(self, entries=EVAL_CACHE_ENTRIES):
+        # Rounded down to a power of two, for the slot mask
+        self.entries = 1 << max(0, entries.bit_length() - 1)
+        self.mask = self.entries - 1
+        self.keys = memoryview(bytearray(8 * self.entries)).cast("Q")
+        # Scores as the evaluation returned them, None for an empty slot
+        self.scores = [None] * self.entries
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        # Stores replacing another position's score
+        self.overwrites = 0
+
+    def probe(self, key):
+        """Score stored for key, or None"""
+        self.probes += 1
+        i = key & self.mask
+        if self.keys[i] == key:
+            score = self.scores[i]
+            if score is not None:
+                self.hits += 1
+            return score
+        return None
+
+    def store(self, key, score):
+        self.stores += 1
+        i = key & self.mask
+        if self.scores[i] is not None and self.keys[i] != key:
+            self.overwrites += 1
+        self.keys[i] = key
+        self.scores[i] = score
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def stats(self):
+        """Size and counters as a dict"""
+        return {"entries": self.entries, "probes": self.probes, "hits": self.hits,
+                "hit_rate": self.hit_rate(), "stores": self.stores,
+                "overwrites": self.overwrites}
+
+    def report(self):
+        """The stats as one line of text"""
+        return ("{entries} entries, {probes} probes, {hits} hits ({hit_rate:.1%}), "
+                "{stores} stores, {overwrites} overwrites").format(**self.stats())
+
+    def clear(self):
+        self.keys = memoryview(bytearray(8 * self.entries)).cast("Q")
+        self.scores = [None] * self.entries
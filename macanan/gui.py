@@ -0,0 +1,555 @@
+"""Tkinter front end: main menu and the game board"""
+import random
+import threading
+import time
+import tkinter as tk
+from tkinter import messagebox
+
+from .engine import (EMPTY, MACAN, MOVE_CAPTURE, MOVE_PLACE, PIECE_NAMES, QUIET_PLY_DRAW,
+                     REPETITION_DRAW, UWONG, GameState, MacananAI, game_result, move_dst,
+                     move_src)
+from .timeman import GameClock, TimeManager
+
+# Menu choices as (base seconds, increment seconds), None for no clock
+TIME_CONTROLS = {
+    "No clock": None,
+    "1 min + 1 s": (60, 1),
+    "3 min + 2 s": (180, 2),
+    "5 min + 3 s": (300, 3),
+}
+# Pause before an AI move (ms), shorter under a clock as it counts against the AI
+AI_DELAY = 500
+CLOCK_AI_DELAY = 50
+# Clock display refresh (ms)
+CLOCK_TICK = 100
+# Turbo AI vs AI: random opening placements that make the games differ,
+# and the board refresh rate cap
+TURBO_OPENING_PLIES = 3
+TURBO_FPS = 20
+
+
+# Game over messages by game_result's reason
+RESULT_MESSAGES = {
+    "captures": "Macan wins!",
+    "macan trapped": "Uwong wins! Macan has no valid moves left!",
+    "repetition": "Draw! The same position came up {repetition_draw} times.",
+    "no captures": "Draw! No captures in the last {quiet_ply_draw} moves.",
+    "uwong stuck": "Draw! Uwong cannot move.",
+}
+
+
+def result_message(reason, repetition_draw=REPETITION_DRAW, quiet_ply_draw=QUIET_PLY_DRAW):
+    return RESULT_MESSAGES[reason].format(repetition_draw=repetition_draw,
+                                          quiet_ply_draw=quiet_ply_draw)
+
+
+class TurboMatch:
+    """AI vs AI games played back to back in a background thread
+
+    The thread publishes the latest position and the running score, which
+    the GUI reads with snapshot() at its own pace.
+    """
+
+    def __init__(self, ai, repetition_draw=REPETITION_DRAW, quiet_ply_draw=QUIET_PLY_DRAW,
+                 opening_plies=TURBO_OPENING_PLIES, seed=None):
+        self.ai = ai
+        self.repetition_draw = repetition_draw
+        self.quiet_ply_draw = quiet_ply_draw
+        self.opening_plies = opening_plies
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.scores = {"macan": 0, "uwong": 0, "draw": 0}
+        self.plies = 0
+        self.squares = None
+        self.last_result = ""
+
+    def start(self):
+        self.started = time.monotonic()
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def run(self):
+        while not self.stopped.is_set():
+            result = self.play_game()
+            if result is None:
+                return
+            with self.lock:
+                self.scores[result[0]] += 1
+                self.last_result = result[1]
+
+    def play_game(self):
+        """Play one game, returns (winner, message) or None when stopped"""
+        ai = self.ai
+        state = GameState(board=ai.board)
+        opening = self.rng.sample(range(state.board.num_squares), self.opening_plies)
+        quiet_plies = 0
+        while not self.stopped.is_set():
+            if opening:
+                move = opening.pop() | MOVE_PLACE
+            elif state.is_placing():
+                move = ai.get_best_placement(state)
+            else:
+                move = ai.get_best_move(state)
+            if move is None:
+                # Only a stuck Uwong gets here, a trapped Macan has lost already
+                return "draw", result_message("uwong stuck")
+            state.make_move(move)
+            quiet_plies = 0 if move & (MOVE_CAPTURE | MOVE_PLACE) else quiet_plies + 1
+            with self.lock:
+                self.squares = list(state.squares)
+                self.plies += 1
+            result = game_result(state, ai.has_valid_moves(state), quiet_plies,
+                                 self.repetition_draw, self.quiet_ply_draw)
+            if result is not None:
+                return result[0], result_message(result[1], self.repetition_draw,
+                                                 self.quiet_ply_draw)
+        return None
+
+    def snapshot(self):
+        """(squares, scores, plies per second, last result) as of now"""
+        with self.lock:
+            rate = self.plies / max(time.monotonic() - self.started, 1e-9)
+            return self.squares, dict(self.scores), rate, self.last_result
+
+class MainMenu:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Macanan Game")
+        
+        # Create main menu frame
+        self.menu_frame = tk.Frame(root)
+        self.menu_frame.pack(expand=True, pady=20)
+        
+        # Title
+        title_label = tk.Label(self.menu_frame, text="Macanan Game", font=('Arial', 24, 'bold'))
+        title_label.pack(pady=20)
+        
+        # Menu buttons
+        play_as_macan = tk.Button(self.menu_frame, text="Play as Macan", 
+                                 command=lambda: self.start_game(1),
+                                 width=20, height=2, font=('Arial', 12))
+        play_as_macan.pack(pady=10)
+        
+        play_as_uwong = tk.Button(self.menu_frame, text="Play as Uwong",
+                                 command=lambda: self.start_game(2),
+                                 width=20, height=2, font=('Arial', 12))
+        play_as_uwong.pack(pady=10)
+        
+        play_1v1 = tk.Button(self.menu_frame, text="1 vs 1",
+                            command=lambda: self.start_game(3),
+                            width=20, height=2, font=('Arial', 12))
+        play_1v1.pack(pady=10)
+        
+        play_ai_vs_ai = tk.Button(self.menu_frame, text="AI vs AI", 
+                                command=lambda: self.start_game(4),
+                                width=20, height=2, font=('Arial', 12))
+        play_ai_vs_ai.pack(pady=10)
+
+        play_turbo = tk.Button(self.menu_frame, text="Turbo AI vs AI",
+                               command=lambda: self.start_game(5),
+                               width=20, height=2, font=('Arial', 12))
+        play_turbo.pack(pady=10)
+
+        # Time control of the next game
+        self.time_control = tk.StringVar(value="No clock")
+        clock_menu = tk.OptionMenu(self.menu_frame, self.time_control, *TIME_CONTROLS)
+        clock_menu.config(width=17, font=('Arial', 12))
+        clock_menu.pack(pady=10)
+        
+        self.game_frame = None
+        self.game = None
+
+    def start_game(self, mode):
+        # Hide menu frame
+        self.menu_frame.pack_forget()
+        
+        # Create and show game frame
+        self.game_frame = tk.Frame(self.root)
+        self.game_frame.pack(expand=True)
+        
+        # Create game instance
+        self.game = MacananGame(self.game_frame, mode, self.return_to_menu,
+                                time_control=TIME_CONTROLS[self.time_control.get()])
+
+    def return_to_menu(self):
+        # Destroy game frame
+        if self.game_frame:
+            self.game_frame.destroy()
+        
+        # Show menu frame
+        self.menu_frame.pack(expand=True)
+
+class MacananGame:
+    def __init__(self, parent, mode, return_callback, repetition_draw=REPETITION_DRAW,
+                 quiet_ply_draw=QUIET_PLY_DRAW, time_control=None):
+        self.parent = parent
+        self.mode = mode  # 1: Play as Macan, 2: Play as Uwong, 3: 1v1, 4: AI vs AI, 5: turbo
+        self.ai = MacananAI()
+        self.is_ai_turn = False
+        self.return_callback = return_callback  
+        # Draw on the repetition_draw-th occurrence of a position, or after
+        # quiet_ply_draw plies without a capture or placement (0: never)
+        self.repetition_draw = repetition_draw
+        self.quiet_ply_draw = quiet_ply_draw
+        # Clocks for time_control = (base, increment) in seconds; the AI
+        # then moves within its time instead of searching to a fixed depth.
+        # Turbo games are not played on the board, so they have no clock
+        self.clock = GameClock(*time_control) if time_control and mode != 5 else None
+        self.time_manager = TimeManager(self.ai)
+        self.ai_delay = AI_DELAY if self.clock is None else CLOCK_AI_DELAY
+        # Turbo mode's games in the background
+        self.turbo = None
+        
+        self.board_size = 5
+        self.cell_size = 80
+
+        # Add movement rules explanation
+        self.game_frame = tk.Frame(parent)
+        self.game_frame.pack(pady=10)
+        
+        # Add legend for movement rules
+        # gray_square = tk.Canvas(rules_frame, width=20, height=20)
+        # gray_square.grid(row=0, column=0, padx=5)
+        # gray_square.create_rectangle(0, 0, 20, 20, fill="lightgray", outline="black")
+        
+        # gray_label = tk.Label(rules_frame, text="= 4 directions movement (↑→↓←)", font=('Arial', 10))
+        # gray_label.grid(row=0, column=1, padx=5, sticky="w")
+        
+        # white_square = tk.Canvas(rules_frame, width=20, height=20)
+        # white_square.grid(row=1, column=0, padx=5)
+        # white_square.create_rectangle(0, 0, 20, 20, fill="white", outline="black")
+        
+        # white_label = tk.Label(rules_frame, text="= 8 directions movement (↑↗→↘↓↙←↖)", font=('Arial', 10))
+        # white_label.grid(row=1, column=1, padx=5, sticky="w")
+        
+        self.canvas = tk.Canvas(self.game_frame, 
+                              width=self.board_size * self.cell_size,
+                              height=self.board_size * self.cell_size)
+        self.canvas.pack(pady=10)
+        
+        # Add status label
+        self.status_label = tk.Label(self.parent.winfo_toplevel(), text="Start game - Macan's turn", font=('Arial', 12))
+        self.status_label.pack(pady=5)
+        self.clock_label = tk.Label(self.parent.winfo_toplevel(), font=('Arial', 12))
+        if self.clock is not None:
+            self.clock_label.pack(pady=5)
+        
+        # Button frame
+        button_frame = tk.Frame(self.game_frame)
+        button_frame.pack(pady=5)
+        
+        # Add restart and quit buttons
+        self.restart_button = tk.Button(button_frame, text="Restart Game", 
+                                      command=self.restart_game)
+        self.restart_button.pack(side=tk.LEFT, padx=5)
+        
+        self.quit_button = tk.Button(button_frame, text="Back to Menu", 
+                                   command=self.return_to_menu)
+        self.quit_button.pack(side=tk.LEFT, padx=5)
+        
+        self.reset_game()
+        self.draw_board()
+
+        if self.mode == 2:
+            self.parent.after(self.ai_delay, self.make_ai_move)
+        elif self.mode == 4:
+            self.parent.after(self.ai_delay, self.make_ai_vs_ai_move)
+        elif self.mode == 5:
+            self.start_turbo()
+        
+        self.canvas.bind("<Button-1>", self.handle_click)
+        self.selected_piece = None
+        self.tick_id = self.parent.after(CLOCK_TICK, self.tick) if self.clock else None
+
+    def start_turbo(self):
+        """Start the background games and the refresh of the board and scoreboard"""
+        if self.turbo is not None:
+            self.turbo.stop()
+        # An engine of its own, the thread must not share one with the GUI,
+        # playing as the game's AI does
+        ai = self.ai
+        engine = MacananAI(board=ai.board, weights=ai.weights, depth=ai.depth,
+                           ordering=ai.ordering, lmr=ai.lmr, null_move=ai.null_move,
+                           solver_nodes=ai.solver_nodes, placement_depth=ai.placement_depth,
+                           eval_cache_entries=ai.eval_cache_entries)
+        self.turbo = TurboMatch(engine, self.repetition_draw, self.quiet_ply_draw)
+        self.turbo.start()
+        self.drawn_squares = None
+        self.turbo_id = self.parent.after(1000 // TURBO_FPS, self.refresh_turbo)
+
+    def refresh_turbo(self):
+        """Show the latest position and score, at most TURBO_FPS times a second"""
+        squares, scores, rate, last_result = self.turbo.snapshot()
+        if squares is not None and squares != self.drawn_squares:
+            self.redraw_board(squares)
+            self.drawn_squares = squares
+        games = sum(scores.values())
+        self.status_label.config(
+            text=f"Games {games}: Macan {scores['macan']}, Uwong {scores['uwong']}, "
+                 f"draws {scores['draw']} - {rate:.0f} plies/s\n{last_result}")
+        self.turbo_id = self.parent.after(1000 // TURBO_FPS, self.refresh_turbo)
+
+    def choose_ai_move(self):
+        """The AI's move for the side to move, within its time under a clock"""
+        if self.clock is not None:
+            side = self.state.turn
+            return self.time_manager.best_move(self.state, self.clock.time_left(side),
+                                               self.clock.increment)
+        if self.state.is_placing():
+            return self.ai.get_best_placement(self.state)
+        return self.ai.get_best_move(self.state)  # Movement phase, captures included
+
+    def tick(self):
+        """Refresh the clocks and end the game when a side runs out of time"""
+        self.update_clock()
+        if self.clock.running is not None:
+            self.check_game_over()
+        self.tick_id = self.parent.after(CLOCK_TICK, self.tick)
+
+    def update_clock(self):
+        if self.clock is None:
+            return
+        times = []
+        for side in (MACAN, UWONG):
+            minutes, seconds = divmod(max(0.0, self.clock.time_left(side)), 60)
+            times.append(f"{PIECE_NAMES[side].capitalize()} {int(minutes)}:{seconds:04.1f}")
+        self.clock_label.config(text="    ".join(times))
+
+    def make_ai_move(self):
+        """Make AI move based on current game state"""
+        best_move = self.choose_ai_move()
+        if best_move is not None:
+            self.play_move(best_move)
+            self.update_status()
+
+        self.redraw_board()
+        self.check_game_over()
+
+    def make_ai_vs_ai_move(self):
+        # The side to move places while it has pieces left, then moves;
+        # make_move switches the turn
+        best_move = self.choose_ai_move()
+        if best_move is not None:
+            self.play_move(best_move)
+
+        self.redraw_board()
+        if self.check_game_over():
+            return
+
+        self.parent.after(self.ai_delay, self.make_ai_vs_ai_move)
+
+    def return_to_menu(self):
+        if self.tick_id is not None:
+            self.parent.after_cancel(self.tick_id)
+        if self.turbo is not None:
+            self.parent.after_cancel(self.turbo_id)
+            self.turbo.stop()
+        if hasattr(self, 'status_label'):  # Ensure it exists
+            self.status_label.destroy() 
+        self.clock_label.destroy()
+        self.game_frame.destroy()
+        self.return_callback()
+
+    def piece_at(self, row, col):
+        """"macan", "uwong" or None for the given square"""
+        return PIECE_NAMES.get(self.state.squares[row * self.board_size + col])
+
+    def draw_board(self):
+        # Draw the basic grid
+        for i in range(self.board_size):
+            for j in range(self.board_size):
+                x1 = j * self.cell_size
+                y1 = i * self.cell_size
+                x2 = x1 + self.cell_size
+                y2 = y1 + self.cell_size
+                
+                # # Determine cell color based on restricted positions
+                # fill_color = "lightgray" if self.ai.restricted[i * self.board_size + j] else "white"
+                # self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill_color, outline="black")
+                
+                # Determine movement pattern
+                if not self.ai.restricted[i * self.board_size + j]:  # 8-directional movement
+                    # Draw diagonal lines (8 directions)
+                    cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+                    self.canvas.create_line(cx, cy, x1, y1, fill="black")  # Top-left
+                    self.canvas.create_line(cx, cy, x2, y1, fill="black")  # Top-right
+                    self.canvas.create_line(cx, cy, x1, y2, fill="black")  # Bottom-left
+                    self.canvas.create_line(cx, cy, x2, y2, fill="black")  # Bottom-right
+                cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+                self.canvas.create_line(cx, cy, cx, y1, fill="black")  # Up
+                self.canvas.create_line(cx, cy, cx, y2, fill="black")  # Down
+                self.canvas.create_line(cx, cy, x1, cy, fill="black")  # Left
+                self.canvas.create_line(cx, cy, x2, cy, fill="black")  # Right
+
+    # Rest of the code remains the same as before
+    def reset_game(self):
+        self.state = GameState(self.board_size)
+        self.quiet_plies = 0
+        self.selected_piece = None
+        self.update_legal_moves()
+        self.status_label.config(text="Start game - Macan's turn")
+        if self.clock is not None:
+            self.clock.reset()
+            self.clock.start(MACAN)
+            self.update_clock()
+
+    def restart_game(self):
+        self.reset_game()
+        self.redraw_board()
+        
+        # Add automatic AI move for play as Uwong mode after restart
+        if self.mode == 2:  # Playing as Uwong
+            self.parent.after(self.ai_delay, self.make_ai_move)
+        elif self.mode == 5:  # A new match with a fresh scoreboard
+            self.parent.after_cancel(self.turbo_id)
+            self.start_turbo()
+
+    def is_human_turn(self):
+        turn = self.state.turn
+        return (self.mode == 1 and turn == MACAN) or \
+            (self.mode == 2 and turn == UWONG) or \
+            self.mode == 3  # 1v1 mode
+
+    def handle_click(self, event):
+        row = event.y // self.cell_size
+        col = event.x // self.cell_size
+
+        if row < 0 or row >= self.board_size or col < 0 or col >= self.board_size:
+            return
+        if not self.is_human_turn():
+            return
+
+        sq = row * self.board_size + col
+        game_over = False
+        if self.state.is_placing():  # Placement phase
+            game_over = self.handle_placement(sq)
+        elif self.selected_piece is None or self.state.squares[sq] == self.state.turn:
+            if self.selected_piece == (row, col):
+                self.selected_piece = None
+                self.redraw_board()
+            elif self.state.squares[sq] == self.state.turn:
+                self.selected_piece = (row, col)
+                self.highlight_piece(row, col)
+        else:
+            game_over = self.handle_movement(sq)
+
+        # Let the AI answer once the human has moved; after a game over the
+        # restart has already scheduled the AI's first move if it has one
+        if not game_over and self.mode in (1, 2) and not self.is_human_turn():
+            self.parent.after(self.ai_delay, self.make_ai_move)
+
+    def update_legal_moves(self):
+        """Cache the side to move's legal moves as {src: {dst: move}}, src None for placements"""
+        self.legal_moves = {}
+        for move in self.ai.generate_moves(self.state):
+            src = None if move & MOVE_PLACE else move_src(move)
+            self.legal_moves.setdefault(src, {})[move_dst(move)] = move
+
+    def play_move(self, move):
+        """Apply a move for the side to move and refresh the legal move cache"""
+        self.state.make_move(move)
+        if self.clock is not None:
+            self.clock.switch(self.state.turn)
+            self.update_clock()
+        self.quiet_plies = 0 if move & (MOVE_CAPTURE | MOVE_PLACE) else self.quiet_plies + 1
+        self.selected_piece = None
+        self.update_legal_moves()
+
+    def update_status(self):
+        turn = PIECE_NAMES[self.state.turn].capitalize()
+        if self.state.is_placing():
+            self.status_label.config(text=f"{turn}'s turn to place")
+        else:
+            self.status_label.config(text=f"{turn}'s turn")
+
+    def check_game_over(self):
+        """Show the result and restart if the game is over, returns True when it was"""
+        flagged = self.clock.flagged() if self.clock is not None else None
+        if flagged is not None:
+            winner = MACAN if flagged == UWONG else UWONG
+            message = (f"{PIECE_NAMES[flagged].capitalize()} ran out of time! "
+                       f"{PIECE_NAMES[winner].capitalize()} wins!")
+        else:
+            result = game_result(self.state, self.check_macan_has_moves(), self.quiet_plies,
+                                 self.repetition_draw, self.quiet_ply_draw)
+            if result is None:
+                return False
+            message = result_message(result[1], self.repetition_draw, self.quiet_ply_draw)
+        if self.clock is not None:
+            # Stopped, so the clock tick does not end the game again meanwhile
+            self.clock.stop()
+        messagebox.showinfo("Game Over", message)
+        self.restart_game()
+        return True
+
+    def handle_placement(self, sq):
+        """Place on sq if legal, returns True when that ended the game"""
+        move = self.legal_moves.get(None, {}).get(sq)
+        if move is None:
+            return False
+
+        self.play_move(move)
+        self.redraw_board()
+        self.update_status()
+        return self.check_game_over()
+
+    def check_macan_has_moves(self):
+        """Check if any Macan piece has valid moves available"""
+        if self.state.turn == MACAN and not self.state.is_placing():
+            return bool(self.legal_moves)  # Already generated for this turn
+        return self.ai.has_valid_moves(self.state)
+
+    def handle_movement(self, sq):
+        """Move the selected piece to sq if legal, returns True when that ended the game"""
+        row, col = self.selected_piece
+        move = self.legal_moves.get(row * self.board_size + col, {}).get(sq)
+        if move is None:
+            return False
+
+        self.play_move(move)
+        self.redraw_board()
+        self.update_status()
+        return self.check_game_over()
+
+    def count_uwong(self):
+        return self.state.squares.count(UWONG)
+
+    def highlight_piece(self, row, col):
+        self.redraw_board()
+        x = col * self.cell_size + self.cell_size // 2
+        y = row * self.cell_size + self.cell_size // 2
+        self.canvas.create_oval(x - 22, y - 22, x + 22, y + 22, outline="yellow", width=3)
+
+        # Mark the squares the selected piece can reach, captures in orange
+        for dst, move in self.legal_moves.get(row * self.board_size + col, {}).items():
+            dst_row, dst_col = divmod(dst, self.board_size)
+            x = dst_col * self.cell_size + self.cell_size // 2
+            y = dst_row * self.cell_size + self.cell_size // 2
+            color = "orange" if move & MOVE_CAPTURE else "green"
+            self.canvas.create_oval(x - 8, y - 8, x + 8, y + 8, fill=color, outline="")
+
+    def draw_piece(self, row, col, piece_type):
+        x = col * self.cell_size + self.cell_size // 2
+        y = row * self.cell_size + self.cell_size // 2
+        color = "red" if piece_type == "macan" else "blue"
+        self.canvas.create_oval(x - 20, y - 20, x + 20, y + 20, fill=color)
+
+    def redraw_board(self, squares=None):
+        """Draw the game's position, or the given squares"""
+        self.canvas.delete("all")
+        self.draw_board()
+        for sq, piece in enumerate(self.state.squares if squares is None else squares):
+            if piece != EMPTY:
+                row, col = divmod(sq, self.board_size)
+                self.draw_piece(row, col, PIECE_NAMES[piece])
+
+def main():
+    root = tk.Tk()
+    MainMenu(root)
+    root.mainloop()
\ No newline at end of file
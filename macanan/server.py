@@ -0,0 +1,435 @@
+"""Engine server speaking a UCI-style line protocol
+
+Sessions are served over stdin/stdout, a TCP port or a Unix socket, each
+connection being one session with its own position and options. Searches
+run on a shared pool of worker processes, so many sessions can be hosted
+at once while the event loop only handles the text protocol.
+
+    python -m macanan.server                       # stdin/stdout
+    python -m macanan.server --tcp 127.0.0.1:7474 --unix /tmp/macanan.sock
+    python -m macanan.server --hash 64             # shared transposition table
+
+Commands, one per line:
+    uci                 -> id name ..., option lines, uciok
+    isready             -> readyok
+    setoption name <Depth|LMR|NullMove> value <v>
+    ucinewgame
+    position startpos [moves <m> ...]
+    position board <cells> <macan|uwong> [<eaten>] [moves <m> ...]
+    go [depth <n>] [movetime <ms>] [infinite]
+                        (depth caps the search, movetime sets its deadline)
+                        -> info depth <d> score <s> nodes <n> time <ms> pv <m> ...
+                           bestmove <m>
+    stop
+    quit
+
+Squares are named by column letter and row number, "a1" being row 0,
+column 0. A placement is written as its square ("c3"), a move or capture
+as source and destination ("c3c4"). <cells> is the board string used by
+batch_analysis ("M.U../.U.../..M../...../....."). Scores are from the side
+to move's point of view, "win" and "loss" when the search proves the game.
+With --hash, completed depths also report "hashfull <permille>" of the
+shared transposition table.
+"""
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .engine import (EMPTY, MACAN, MOVE_PLACE, PIECE_NAMES, UWONG, GameState, MacananAI,
+                     move_dst, move_src)
+from .tt import TranspositionTable
+
+ENGINE_NAME = "MacananAI"
+DEFAULT_MAX_SEARCHES = 1024
+
+CELLS = {".": EMPTY, "M": MACAN, "U": UWONG}
+CELL_CHARS = {piece: ch for ch, piece in CELLS.items()}
+
+
+def square_name(sq, size):
+    row, col = divmod(sq, size)
+    return f"{chr(ord('a') + col)}{row + 1}"
+
+
+def parse_square(text, size):
+    if len(text) < 2 or not text[0].isalpha() or not text[1:].isdigit():
+        raise ValueError(f"bad square: {text}")
+    col = ord(text[0]) - ord("a")
+    row = int(text[1:]) - 1
+    if not (0 <= row < size and 0 <= col < size):
+        raise ValueError(f"square off the board: {text}")
+    return row * size + col
+
+
+def move_to_text(move, size):
+    if move & MOVE_PLACE:
+        return square_name(move_dst(move), size)
+    return square_name(move_src(move), size) + square_name(move_dst(move), size)
+
+
+def parse_move(engine, state, text):
+    """The legal move of state written as text"""
+    size = state.size
+    # Split "c3c4" after the digits of the first square
+    split = next((i for i in range(2, len(text)) if text[i].isalpha()), len(text))
+    dst = parse_square(text[split:] or text, size)
+    src = parse_square(text[:split], size) if split < len(text) else None
+    for move in engine.generate_moves(state):
+        if move_dst(move) != dst:
+            continue
+        if src is None and move & MOVE_PLACE:
+            return move
+        if src is not None and not move & MOVE_PLACE and move_src(move) == src:
+            return move
+    raise ValueError(f"illegal move: {text}")
+
+
+def parse_board(cells, turn, eaten=0):
+    """GameState for a board string, side to move and Uwong eaten so far"""
+    squares = [CELLS[ch] for ch in cells if ch != "/"]
+    size = int(len(squares) ** 0.5)
+    if size * size != len(squares):
+        raise ValueError("board must be square")
+    state = GameState(size)
+    state.set_squares(squares)
+    state.macan_count = len(state.macans)
+    state.uwong_count = state.squares.count(UWONG) + eaten
+    state.eaten_uwong = eaten
+    state.turn = MACAN if turn == "macan" else UWONG
+    state.rehash()
+    return state
+
+
+def board_to_string(state):
+    """Format a state's board as the compact "M.U../..." string"""
+    cells = "".join(CELL_CHARS[piece] for piece in state.squares)
+    n = state.size
+    return "/".join(cells[i:i + n] for i in range(0, len(cells), n))
+
+
+def state_to_json(state):
+    """JSON position for a GameState, as read by batch_analysis.position_from_json"""
+    return {
+        "board": board_to_string(state),
+        "turn": PIECE_NAMES[state.turn],
+        "eaten": state.eaten_uwong,
+        "macans": [list(divmod(sq, state.size)) for sq in state.macans],
+        "macan_count": state.macan_count,
+        "uwong_count": state.uwong_count,
+    }
+
+
+def format_score(score):
+    if score == float("inf"):
+        return "win"
+    if score == float("-inf"):
+        return "loss"
+    return str(score)
+
+
+# Worker process globals, set by the pool initializer
+_info_queue = None
+_stop_flags = None
+_tt = None
+_engines = {}
+
+
+def _init_worker(info_queue, stop_flags, tt=None):
+    global _info_queue, _stop_flags, _tt
+    _info_queue = info_queue
+    _stop_flags = stop_flags
+    _tt = tt
+
+
+def _run_search(search_id, slot, state, options, max_depth, time_limit):
+    """Search in a worker, streaming records and a final (id, None) to the queue"""
+    key = (id(state.board),) + tuple(sorted(options.items()))
+    engine = _engines.get(key)
+    if engine is None:
+        engine = _engines[key] = MacananAI(board=state.board, tt=_tt, **options)
+    try:
+        for record in engine.iter_search(state, max_depth, time_limit,
+                                          lambda: _stop_flags[slot]):
+            if _tt is not None and record["complete"]:
+                record["hashfull"] = _tt.hashfull()
+            _info_queue.put((search_id, record))
+    finally:
+        _info_queue.put((search_id, None))
+
+
+class Session:
+    """One client: its position, options and running search"""
+
+    def __init__(self, server, write):
+        self.server = server
+        self.write = write
+        self.engine = MacananAI()
+        self.state = GameState()
+        self.options = {"depth": 3, "lmr": False, "null_move": False}
+        self.search = None  # (search_id, slot) while searching
+        self.best = None
+        self.closed = False
+
+    def handle(self, line):
+        """Run one command line, returns False on quit"""
+        words = line.split()
+        if not words:
+            return True
+        command, args = words[0], words[1:]
+        try:
+            if command == "quit":
+                return False
+            elif command == "uci":
+                self.write(f"id name {ENGINE_NAME}")
+                self.write("option name Depth type spin default 3 min 1 max 64")
+                self.write("option name LMR type check default false")
+                self.write("option name NullMove type check default false")
+                self.write("uciok")
+            elif command == "isready":
+                self.write("readyok")
+            elif command == "setoption":
+                self.set_option(args)
+            elif command == "ucinewgame":
+                self.state = GameState()
+            elif command == "position":
+                self.set_position(args)
+            elif command == "go":
+                self.go(args)
+            elif command == "stop":
+                self.stop()
+            else:
+                self.write(f"info string unknown command {command}")
+        except (ValueError, IndexError, KeyError) as exc:
+            self.write(f"info string error {exc}")
+        return True
+
+    def set_option(self, args):
+        name = args[args.index("name") + 1].lower()
+        value = args[args.index("value") + 1] if "value" in args else "true"
+        if name == "depth":
+            self.options["depth"] = int(value)
+        elif name == "lmr":
+            self.options["lmr"] = value.lower() == "true"
+        elif name == "nullmove":
+            self.options["null_move"] = value.lower() == "true"
+        else:
+            raise ValueError(f"unknown option {name}")
+
+    def set_position(self, args):
+        moves = args[args.index("moves") + 1:] if "moves" in args else []
+        if args[0] == "startpos":
+            state = GameState()
+        elif args[0] == "board":
+            eaten = int(args[3]) if len(args) > 3 and args[3] != "moves" else 0
+            state = parse_board(args[1], args[2], eaten)
+        else:
+            raise ValueError(f"unknown position type {args[0]}")
+        engine = MacananAI(board=state.board)
+        for text in moves:
+            state.make_move(parse_move(engine, state, text))
+        self.engine = engine
+        self.state = state
+
+    def go(self, args):
+        if self.search is not None:
+            self.write("info string search already running")
+            return
+        depth = time_limit = None
+        infinite = False
+        for name, value in zip(args, args[1:] + [None]):
+            if name == "depth":
+                depth = int(value)
+            elif name == "movetime":
+                time_limit = int(value) / 1000
+            elif name == "infinite":
+                infinite = True
+        # depth caps the search in any order of the arguments, movetime
+        # only sets the deadline
+        if depth is not None:
+            max_depth = depth
+        elif time_limit is not None or infinite:
+            max_depth = 64
+        else:
+            max_depth = self.options["depth"]
+        self.best = None
+        self.server.start_search(self, self.state.copy(), max_depth, time_limit)
+
+    def stop(self):
+        if self.search is not None:
+            self.server.stop_search(self.search)
+
+    def on_record(self, record):
+        """Called on the event loop for every record of the running search"""
+        if record is None:
+            self.search = None
+            move = self.best["move"] if self.best else None
+            self.write("bestmove " + (move_to_text(move, self.state.size) if move else "none"))
+            return
+        self.best = record
+        size = self.state.size
+        pv = " ".join(move_to_text(move, size) for move in record["pv"])
+        hashfull = f" hashfull {record['hashfull']}" if "hashfull" in record else ""
+        self.write(f"info depth {record['depth']} score {format_score(record['score'])} "
+                   f"nodes {record['nodes']} time {int(record['time'] * 1000)}{hashfull} "
+                   f"pv {pv}")
+
+
+class EngineServer:
+    """Dispatches the sessions' searches to a process pool
+
+    Worker processes report over one multiprocessing queue, which a pump
+    thread forwards to the owning session on the event loop. Every running
+    search has a slot in a shared array of stop flags. With hash_mb, all
+    workers share one transposition table of that many megabytes.
+    """
+
+    def __init__(self, workers=None, max_searches=DEFAULT_MAX_SEARCHES, hash_mb=0):
+        context = multiprocessing.get_context("spawn")
+        self.info_queue = context.Queue()
+        self.stop_flags = context.RawArray("b", max_searches)
+        self.tt = TranspositionTable.shared(hash_mb) if hash_mb else None
+        self.pool = ProcessPoolExecutor(workers, context, initializer=_init_worker,
+                                        initargs=(self.info_queue, self.stop_flags, self.tt))
+        self.free_slots = list(range(max_searches))
+        self.searches = {}
+        self.search_ids = itertools.count()
+        self.loop = None
+        self.pump = None
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.pump = threading.Thread(target=self._pump, daemon=True)
+        self.pump.start()
+
+    def close(self):
+        for slot in range(len(self.stop_flags)):
+            self.stop_flags[slot] = 1
+        try:
+            self.pool.shutdown(cancel_futures=True)
+        finally:
+            self.info_queue.put(None)
+            if self.tt is not None:
+                self.tt.close()
+                self.tt.unlink()
+
+    def _pump(self):
+        while True:
+            item = self.info_queue.get()
+            if item is None:
+                return
+            self.loop.call_soon_threadsafe(self._dispatch, *item)
+
+    def _dispatch(self, search_id, record):
+        entry = self.searches.get(search_id)
+        if entry is None:
+            return
+        session, slot = entry
+        if record is None:
+            del self.searches[search_id]
+            self.free_slots.append(slot)
+        if not session.closed:
+            session.on_record(record)
+
+    def start_search(self, session, state, max_depth, time_limit):
+        if not self.free_slots:
+            session.write("info string too many searches")
+            session.write("bestmove none")
+            return
+        slot = self.free_slots.pop()
+        search_id = next(self.search_ids)
+        self.stop_flags[slot] = 0
+        self.searches[search_id] = (session, slot)
+        session.search = (search_id, slot)
+        options = {"lmr": session.options["lmr"], "null_move": session.options["null_move"]}
+        future = self.pool.submit(_run_search, search_id, slot, state, options,
+                                  max_depth, time_limit)
+        future.add_done_callback(
+            lambda f: self.loop.call_soon_threadsafe(self._check_failed, session, search_id, f))
+
+    def _check_failed(self, session, search_id, future):
+        if future.cancelled() or future.exception() is None:
+            return
+        if not session.closed:
+            session.write(f"info string search failed: {future.exception()!r}")
+        # A worker that died never sent its final record
+        self._dispatch(search_id, None)
+
+    def stop_search(self, search):
+        search_id, slot = search
+        if search_id in self.searches:
+            self.stop_flags[slot] = 1
+
+    async def serve(self, reader, write):
+        """Run one session until quit or end of input"""
+        session = Session(self, write)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line or not session.handle(line.decode()):
+                    break
+        finally:
+            session.closed = True
+            session.stop()
+
+    async def serve_stream(self, reader, writer):
+        def write(text):
+            writer.write(text.encode() + b"\n")
+
+        try:
+            await self.serve(reader, write)
+        finally:
+            writer.close()
+
+
+async def _stdio_streams():
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    return reader
+
+
+async def run(tcp=None, unix=None, stdio=True, workers=None, hash_mb=0):
+    server = EngineServer(workers, hash_mb=hash_mb)
+    server.start()
+    listeners = []
+    try:
+        if tcp:
+            host, port = tcp.rsplit(":", 1)
+            listeners.append(await asyncio.start_server(server.serve_stream, host, int(port)))
+        if unix:
+            listeners.append(await asyncio.start_unix_server(server.serve_stream, unix))
+        if stdio:
+            def write(text):
+                sys.stdout.write(text + "\n")
+                sys.stdout.flush()
+
+            await server.serve(await _stdio_streams(), write)
+        else:
+            await asyncio.gather(*(listener.serve_forever() for listener in listeners))
+    finally:
+        for listener in listeners:
+            listener.close()
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Macanan engine server")
+    parser.add_argument("--tcp", metavar="HOST:PORT", help="also listen on a TCP port")
+    parser.add_argument("--unix", metavar="PATH", help="also listen on a Unix socket")
+    parser.add_argument("--no-stdio", action="store_true",
+                        help="serve only the sockets, not stdin/stdout")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--hash", type=int, default=0, metavar="MB",
+                        help="transposition table shared by the workers (default: none)")
+    args = parser.parse_args(argv)
+    if args.no_stdio and not (args.tcp or args.unix):
+        parser.error("--no-stdio needs --tcp or --unix")
+    asyncio.run(run(args.tcp, args.unix, not args.no_stdio, args.workers, args.hash))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Proof-number search for forced wins in the movement phase
+
+The solver proves (or disproves) that the side to move can force a win:
+trapping both Macans for Uwong, eating enough Uwong for Macan. It grows an
+AND/OR tree best first, always expanding the node that most cheaply
+settles the root, so narrow forced lines far beyond the alpha-beta depth
+are found after a few thousand nodes. Outcomes follow the GUI and selfplay
+rules: Macan wins once capture_win Uwong are eaten, Uwong wins as soon as
+the Macans cannot move, and a stuck Uwong or a position repeating one of
+the game (GameState.history) or the tree path is no win for either side.
+"""
+from .engine import MACAN, SOLVER_NODES, UWONG
+
+INF = float("inf")
+
+
+class _Node:
+    __slots__ = ("move", "parent", "children", "pn", "dn")
+
+    def __init__(self, move, parent, pn, dn):
+        self.move = move
+        self.parent = parent
+        self.children = None
+        self.pn = pn
+        self.dn = dn
+
+
+def outcome(engine, state):
+    """MACAN or UWONG once the game is decided, 0 for a draw, None while open"""
+    if state.eaten_uwong >= state.board.capture_win:
+        return MACAN
+    if not engine.has_valid_moves(state):
+        return UWONG
+    return None
+
+
+def prove(engine, state, max_nodes=SOLVER_NODES, stop=None):
+    """Solve state for the side to move and return (result, move, nodes)
+
+    result is True with a winning move when the win is proven, False when
+    no forced win exists (the opponent may still win or the game be
+    drawn), and None when max_nodes ran out first or stop(), polled after
+    every expansion, returned true. state must be in the movement phase;
+    it is left unchanged.
+    """
+    attacker = state.turn
+    root = _Node(None, None, 1, 1)
+    nodes = 1
+    while root.pn and root.dn and nodes < max_nodes and not (stop and stop()):
+        # Walk down to the most proving node
+        node = root
+        played = []
+        while node.children:
+            if state.turn == attacker:
+                node = min(node.children, key=_pn)
+            else:
+                node = min(node.children, key=_dn)
+            played.append((node.move, state.make_move(node.move)))
+
+        # Expand it, scoring the children that end the game or repeat
+        node.children = []
+        for move in engine.generate_moves(state):
+            undo = state.make_move(move)
+            result = outcome(engine, state)
+            if result is None and state.hash in state.history:
+                result = 0
+            if result is None:
+                # Mobility as the initial estimate: a side with few moves
+                # is quicker to prove or disprove
+                mobility = len(engine.generate_moves(state)) or 1
+                if state.turn == attacker:
+                    child = _Node(move, node, 1, mobility)
+                else:
+                    child = _Node(move, node, mobility, 1)
+            elif result == attacker:
+                child = _Node(move, node, 0, INF)
+            else:
+                child = _Node(move, node, INF, 0)
+            state.unmake_move(move, undo)
+            node.children.append(child)
+        nodes += len(node.children)
+        if not node.children:
+            # A stuck Uwong draws (a stuck Macan was already scored a loss)
+            node.pn, node.dn = INF, 0
+
+        # Back up the proof numbers to the root
+        while node is not None:
+            if node.children:
+                if state.turn == attacker:
+                    node.pn = min(child.pn for child in node.children)
+                    node.dn = sum(child.dn for child in node.children)
+                else:
+                    node.pn = sum(child.pn for child in node.children)
+                    node.dn = min(child.dn for child in node.children)
+            node = node.parent
+            if played:
+                move, undo = played.pop()
+                state.unmake_move(move, undo)
+
+    if not root.pn:
+        return True, min(root.children, key=_pn).move, nodes
+    if not root.dn:
+        return False, None, nodes
+    return None, None, nodes
+
+
+def _pn(node):
+    return node.pn
+
+
+def _dn(node):
+    return node.dn
@@ -0,0 +1,175 @@
+"""Game clocks and the engine's use of them
+
+GameClock keeps both sides' time under a base + increment control, and
+TimeManager turns the time left on it into a search for every move:
+
+    clock = GameClock(180, 2)               # 3 minutes, 2 seconds a move
+    manager = TimeManager(MacananAI())
+    clock.start(state.turn)
+    move = manager.best_move(state, clock.time_left(state.turn), clock.increment)
+    state.make_move(move)
+    clock.switch(state.turn)
+
+A move gets a soft budget, after which no new iteration is started, and a
+hard one, at which the search is stopped. Forced moves (a single legal
+move, a capture Macan must take) are played at once, placements get a
+small share of the time and sharp movement endgames a large one, and the
+soft budget is extended while the best move keeps changing between
+iterations. The hard budget never exceeds a fraction of the time left, so
+a side only flags when its clock is close to zero already. The search
+stops a little after its deadline, once it next polls it and has unwound,
+so the deadline it gets is the hard budget less the longest such delay
+seen lately; the solver stops at the soft budget.
+"""
+import time
+
+from .engine import MACAN, UWONG
+
+# Moves the remaining time is expected to last in the movement phase; a
+# placement counts as PLACEMENT_SHARE of a move
+MOVES_TO_GO = 30
+PLACEMENT_SHARE = 0.4
+# Time share of a sharp endgame (see MacananAI.is_sharp_endgame)
+SHARP_FACTOR = 2.5
+# Part of the increment spent on every move
+INCREMENT_SHARE = 0.8
+# Soft budget extension per best-move change, up to the hard budget
+INSTABILITY_EXTENSION = 0.5
+# The hard budget: at most this many soft budgets and this share of the clock
+HARD_FACTOR = 4
+MAX_CLOCK_SHARE = 0.3
+# A new iteration takes longer than all before it, so none is started after
+# this share of the soft budget
+NEXT_ITERATION_SHARE = 0.6
+# Kept back for the move being made and shown (seconds)
+MOVE_OVERHEAD = 0.05
+# Smallest soft budget the endgame solver is worth trying in (seconds)
+SOLVER_MIN_TIME = 0.1
+# Least time kept back for a search running past its deadline (seconds),
+# and how fast a longer delay seen is forgotten, per search stopped by it
+STOP_LATENCY = 0.005
+STOP_LATENCY_DECAY = 0.9
+
+
+class GameClock:
+    """Time left for each side: base seconds plus increment per move made"""
+
+    def __init__(self, base, increment=0, timer=time.monotonic):
+        self.base = base
+        self.increment = increment
+        self.timer = timer
+        self.reset()
+
+    def reset(self):
+        self.remaining = {MACAN: self.base, UWONG: self.base}
+        self.running = None
+        self.started = None
+
+    def start(self, side):
+        """Start the clock of side (MACAN or UWONG)"""
+        self.running = side
+        self.started = self.timer()
+
+    def stop(self):
+        """Charge the running side for its move, adding the increment unless it flagged"""
+        side = self.running
+        if side is None:
+            return
+        self.remaining[side] -= self.timer() - self.started
+        if self.remaining[side] > 0:
+            self.remaining[side] += self.increment
+        self.running = None
+
+    def switch(self, side):
+        """The mover is done: stop its clock and start side's"""
+        self.stop()
+        self.start(side)
+
+    def time_left(self, side):
+        """Seconds left for side, counting the move in progress"""
+        left = self.remaining[side]
+        if side == self.running:
+            left -= self.timer() - self.started
+        return left
+
+    def flagged(self):
+        """The side out of time, or None"""
+        for side in (MACAN, UWONG):
+            if self.time_left(side) <= 0:
+                return side
+        return None
+
+
+class TimeManager:
+    """Plays moves for an engine within the time left on a GameClock"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        # Progress of the last best_move: depth reached, best move changes
+        # and seconds spent
+        self.depth = 0
+        self.changes = 0
+        self.elapsed = 0.0
+        # Recent longest time a search ran past its deadline
+        self.stop_latency = STOP_LATENCY
+
+    def budget(self, state, time_left, increment=0):
+        """(soft, hard) search time in seconds for the side to move in state"""
+        usable = max(0.0, time_left - MOVE_OVERHEAD)
+        if state.is_placing():
+            placed = state.macan_count if state.turn == MACAN else state.uwong_count
+            board = state.board
+            placements = (board.max_macan if state.turn == MACAN else board.max_uwong) - placed
+            soft = PLACEMENT_SHARE * usable / (MOVES_TO_GO + PLACEMENT_SHARE * placements)
+        else:
+            soft = usable / MOVES_TO_GO
+            if self.engine.is_sharp_endgame(state):
+                soft *= SHARP_FACTOR
+        soft += INCREMENT_SHARE * min(increment, usable)
+        hard = min(HARD_FACTOR * soft, MAX_CLOCK_SHARE * usable + INCREMENT_SHARE * increment,
+                   usable)
+        return min(soft, hard), hard
+
+    def best_move(self, state, time_left, increment=0):
+        """Search the side to move's best move within its share of time_left
+
+        Returns None when the side to move has no legal move.
+        """
+        start = time.monotonic()
+        engine = self.engine
+        self.depth = self.changes = 0
+        moves = engine.generate_moves(state)
+        capture = None
+        if state.turn == MACAN and not state.is_placing():
+            capture = engine.find_capture(state)
+        if capture or len(moves) <= 1:
+            self.elapsed = time.monotonic() - start
+            return capture or (moves[0] if moves else None)
+
+        soft, hard = self.budget(state, time_left, increment)
+        if not state.is_placing() and soft >= SOLVER_MIN_TIME:
+            winning = engine.solve(state, lambda: time.monotonic() - start >= soft)
+            if winning:
+                self.elapsed = time.monotonic() - start
+                return winning
+
+        searching = time.monotonic()
+        deadline = max(0.0, hard - (searching - start) - self.stop_latency)
+        best = None
+        for record in engine.iter_search(state, time_limit=deadline):
+            if best is not None and record["move"] != best:
+                self.changes += 1
+            best = record["move"]
+            if record["complete"]:
+                self.depth = record["depth"]
+                limit = min(hard, soft * (1 + INSTABILITY_EXTENSION * self.changes))
+                if time.monotonic() - start >= NEXT_ITERATION_SHARE * limit:
+                    break
+        overrun = time.monotonic() - searching - deadline
+        if overrun >= 0:
+            # Stopped by the deadline rather than after an iteration
+            self.stop_latency = max(STOP_LATENCY, overrun,
+                                    STOP_LATENCY_DECAY * self.stop_latency)
+        self.elapsed = time.monotonic() - start
+        # Out of time before the first iteration completed
+        return best if best is not None else moves[0]
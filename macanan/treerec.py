@@ -0,0 +1,234 @@
+"""Opt-in recording of the alpha-beta search tree
+
+The engine keeps no tree, only the node count and the PV. A SearchRecorder
+attached to an engine records one row per searched node (or a sample of
+them, up to a node budget) into columns of fixed-size numbers, which are
+saved as one compact file and read back for analysis:
+
+    recorder = SearchRecorder(max_nodes=200000)
+    with recorder.attach(engine, state):
+        engine.analyse(state, depth=5)
+    recorder.tree.save("search.tree")
+    tree = SearchTree.load("search.tree")
+
+Attaching shadows the engine's _search with a recording wrapper on the
+instance and detaching removes it again, so an engine without a recorder
+runs exactly the code it always did. Recording is slow, every recorded
+node diffs the board against its parent's to find the move leading to it.
+
+Columns, one entry per node:
+
+    hash        GameState.hash of the node
+    parent      row of the parent node, -1 for a search root
+    move        packed move from the parent, 0 for a null move, -1 unknown
+    ply         distance from the root of the search
+    depth       remaining depth the node was searched to
+    alpha, beta the window the node was searched with
+    score       the score it returned, NaN when the search was stopped
+    cutoff      1 when the children searched reached the window bound (a
+                fail high at a maximizing node, a fail low at a minimizing
+                one), so the remaining moves were pruned
+    maximizing  1 at a maximizing node
+    nodes       nodes searched in the subtree, the node included, counted
+                whether or not they were recorded
+    children    child searches made (null move and re-searches included)
+
+With sample below 1, nodes deeper than full_plies are kept with that
+probability and the subtree of a node left out is not recorded at all, so
+a sample of deep searches keeps whole paths from the root.
+"""
+import json
+import random
+import sys
+from array import array
+from contextlib import contextmanager
+
+from .engine import MACAN, MOVE_CAPTURE, MOVE_PLACE, UWONG
+
+MAGIC = b"MACTREE1"
+VERSION = 1
+# (name, array typecode) of every column, in file order
+COLUMNS = (
+    ("hash", "Q"),
+    ("parent", "i"),
+    ("move", "i"),
+    ("ply", "h"),
+    ("depth", "h"),
+    ("alpha", "d"),
+    ("beta", "d"),
+    ("score", "d"),
+    ("cutoff", "b"),
+    ("maximizing", "b"),
+    ("nodes", "q"),
+    ("children", "i"),
+)
+# Default node budget and plies below which every node is recorded
+MAX_NODES = 1000000
+FULL_PLIES = 2
+
+
+def move_between(parent, child, mover):
+    """The packed move that turns the squares parent into child, 0 for a pass"""
+    src = dst = None
+    capture = False
+    for sq, (before, after) in enumerate(zip(parent, child)):
+        if before == after:
+            continue
+        if before == mover:
+            src = sq
+        elif after == mover:
+            dst = sq
+        elif before == UWONG and mover == MACAN:
+            capture = True
+    if dst is None:
+        return 0
+    if src is None:
+        return dst | MOVE_PLACE
+    return dst | src << 8 | (MOVE_CAPTURE if capture else 0)
+
+
+class SearchTree:
+    """Recorded nodes as one array per column, rows in the order searched
+
+    A parent's row always comes before its children's.
+    """
+
+    def __init__(self, meta=None):
+        self.meta = dict(meta or {})
+        self.columns = {name: array(code) for name, code in COLUMNS}
+
+    def __len__(self):
+        return len(self.columns["hash"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def row(self, i):
+        """All columns of one node as a dict"""
+        return {name: column[i] for name, column in self.columns.items()}
+
+    def children(self):
+        """Rows of the recorded children of every row, a list per row"""
+        children = [[] for _ in range(len(self))]
+        for i, parent in enumerate(self.columns["parent"]):
+            if parent >= 0:
+                children[parent].append(i)
+        return children
+
+    def path(self, i):
+        """Moves from the search root to row i"""
+        parents, moves = self.columns["parent"], self.columns["move"]
+        path = []
+        while i >= 0:
+            path.append(moves[i])
+            i = parents[i]
+        path.reverse()
+        return path
+
+    def save(self, path):
+        """Write the tree: magic, header length, JSON header, raw columns"""
+        header = json.dumps({"version": VERSION, "rows": len(self), "byteorder": sys.byteorder,
+                             "columns": [list(column) for column in COLUMNS],
+                             "meta": self.meta}).encode()
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(4, "little"))
+            f.write(header)
+            for name, _ in COLUMNS:
+                self.columns[name].tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        """Read a tree written by save"""
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a search tree file")
+            header = json.loads(f.read(int.from_bytes(f.read(4), "little")))
+            if header["version"] != VERSION:
+                raise ValueError(f"{path} is version {header['version']}, not {VERSION}")
+            tree = cls(header["meta"])
+            rows = header["rows"]
+            for name, code in header["columns"]:
+                column = array(code)
+                column.fromfile(f, rows)
+                if header["byteorder"] != sys.byteorder:
+                    column.byteswap()
+                tree.columns[name] = column
+        return tree
+
+
+class SearchRecorder:
+    """Records the searches of the engines it is attached to into tree"""
+
+    def __init__(self, max_nodes=MAX_NODES, sample=1.0, full_plies=FULL_PLIES, seed=0):
+        self.max_nodes = max_nodes
+        self.sample = sample
+        self.full_plies = full_plies
+        self.rng = random.Random(seed)
+        self.tree = SearchTree({"max_nodes": max_nodes, "sample": sample,
+                                "full_plies": full_plies})
+
+    @contextmanager
+    def attach(self, engine, root=None):
+        """Record engine's searches while in the with block
+
+        root is the position the searches start from, so the moves into
+        search roots below ply 0 (the root moves of iter_search) are known.
+        """
+        original = engine._search
+        columns = self.tree.columns
+        append = [columns[name].append for name, _ in COLUMNS]
+        parents, scores, cutoffs = columns["parent"], columns["score"], columns["cutoff"]
+        subtree, children = columns["nodes"], columns["children"]
+        # Open nodes: (row, squares, side to move)
+        stack = []
+        self.tree.meta.setdefault("size", engine.board_size)
+        top = None if root is None else (-1, bytes(root.squares), root.turn)
+
+        def unrecorded(*args):
+            # The subtree runs without the wrapper, at full speed
+            del engine._search
+            try:
+                return original(*args)
+            finally:
+                engine._search = search
+
+        def search(state, depth, alpha, beta, is_maximizing, is_macan_ai, evaluate, ply=0,
+                   allow_null=True, exclude=None):
+            args = (state, depth, alpha, beta, is_maximizing, is_macan_ai, evaluate, ply,
+                    allow_null, exclude)
+            if stack:
+                children[stack[-1][0]] += 1
+            if len(parents) >= self.max_nodes or (
+                    ply > self.full_plies and self.rng.random() >= self.sample):
+                return unrecorded(*args)
+            squares = bytes(state.squares)
+            if stack:
+                row_parent, parent_squares, mover = stack[-1]
+                move = move_between(parent_squares, squares, mover)
+            elif top is not None and ply:
+                row_parent = -1
+                move = move_between(top[1], squares, top[2])
+            else:
+                row_parent, move = -1, -1
+            row = len(parents)
+            for add, value in zip(append, (state.hash, row_parent, move, ply, depth, alpha,
+                                           beta, float("nan"), 0, is_maximizing, 0, 0)):
+                add(value)
+            stack.append((row, squares, state.turn))
+            start = engine.nodes
+            try:
+                score, best = original(*args)
+            finally:
+                stack.pop()
+                subtree[row] = engine.nodes - start
+            scores[row] = score
+            if children[row]:
+                cutoffs[row] = score >= beta if is_maximizing else score <= alpha
+            return score, best
+
+        engine._search = search
+        try:
+            yield self
+        finally:
+            del engine._search
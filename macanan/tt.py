@@ -0,0 +1,217 @@
+"""Transposition table of search results in a flat buffer of 64-bit words
+
+The table is a fixed number of buckets in one buffer allocated up front,
+so its memory use is exactly the size asked for and never grows. The
+buffer is either private to the process or a multiprocessing.shared_memory
+block that worker processes attach to, so engines in several processes
+share what their searches found:
+
+    table = TranspositionTable.shared(64)   # owner, 64 MB
+    MacananAI(tt=table)
+    # in the workers: TranspositionTable.attach(table.name), or pass the
+    # table itself, which pickles as its shared memory name
+    table.close()
+    table.unlink()                          # owner, once every worker is done
+
+Engines sharing a table must use the same weights, the stored scores are
+only valid for the evaluation that produced them.
+"""
+# Score bounds stored with an entry
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Words per entry: check, meta, score. A bucket is a depth-preferred entry
+# followed by an always-replace one.
+ENTRY_WORDS = 3
+BUCKET_WORDS = 2 * ENTRY_WORDS
+BUCKET_BYTES = BUCKET_WORDS * 8
+# Words before the first bucket: bucket count, current generation
+HEADER_WORDS = 2
+
+# meta layout: move in bits 0-17, then depth, bound and generation
+DEPTH_SHIFT = 18
+FLAG_SHIFT = 26
+GENERATION_SHIFT = 28
+GENERATIONS = 64
+# Buckets sampled by hashfull
+HASHFULL_SAMPLE = 1000
+
+
+def table_bytes(size_mb):
+    """Buffer size of the largest table fitting in size_mb megabytes"""
+    buckets = max(1, (int(size_mb * 2 ** 20) - HEADER_WORDS * 8) // BUCKET_BYTES)
+    return (HEADER_WORDS + buckets * BUCKET_WORDS) * 8
+
+
+class TranspositionTable:
+    """Fixed-size table of (move, depth, flag, score) by 64-bit position key
+
+    An entry is three words: meta (move, depth, flag and generation
+    packed), the score as a double, and check = key ^ meta ^ score bits.
+    Stores take no lock; a probe that reads an entry half way through a
+    concurrent store finds a check that no longer matches its key and
+    counts it as a miss, so any number of processes can share one buffer.
+
+    A key maps to one bucket of two entries. The first keeps the deepest
+    result of the current generation, the second takes whatever the first
+    turned down. new_search() starts a new generation, after which the
+    first entry of every bucket may be replaced again by any result.
+    The counters (probes, hits, collisions, overwrites, stores) count this
+    process's calls only.
+    """
+
+    def __init__(self, size_mb=16, shared=False, name=None):
+        """Table of size_mb megabytes, in new shared memory with shared=True
+
+        With name, attaches to the shared table created under that name
+        instead, whatever its size.
+        """
+        self.owner = shared and name is None
+        if shared or name is not None:
+            # Imported here, it is slow to import and only needed for sharing
+            from multiprocessing import shared_memory
+        if name is not None:
+            self.shm = shared_memory.SharedMemory(name=name)
+        elif shared:
+            self.shm = shared_memory.SharedMemory(create=True, size=table_bytes(size_mb))
+        else:
+            self.shm = None
+        buffer = bytearray(table_bytes(size_mb)) if self.shm is None else self.shm.buf
+        self.words = memoryview(buffer).cast("Q")
+        if name is None:
+            self.words[0] = (len(self.words) - HEADER_WORDS) // BUCKET_WORDS
+        self.buckets = self.words[0]
+        self.size_mb = len(self.words) * 8 / 2 ** 20
+        # One-word buffer converting scores to and from their bits
+        scratch = bytearray(8)
+        self._bits = memoryview(scratch).cast("Q")
+        self._double = memoryview(scratch).cast("d")
+        self.reset_stats()
+
+    @classmethod
+    def shared(cls, size_mb=16):
+        """New table in shared memory, owned by the calling process"""
+        return cls(size_mb, shared=True)
+
+    @classmethod
+    def attach(cls, name):
+        """The shared table another process created under name"""
+        return cls(name=name)
+
+    @property
+    def name(self):
+        return self.shm.name if self.shm else None
+
+    def __reduce__(self):
+        if self.shm is None:
+            raise TypeError("only shared tables can be sent to other processes")
+        return TranspositionTable.attach, (self.shm.name,)
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        # Probes finding their bucket taken by other positions only
+        self.collisions = 0
+        self.stores = 0
+        # Stores replacing another position's entry
+        self.overwrites = 0
+
+    def new_search(self):
+        """Start a new generation, called before every root search"""
+        self.words[1] = (self.words[1] + 1) % GENERATIONS
+
+    def probe(self, key):
+        """(move, depth, flag, score) stored for key, or None"""
+        self.probes += 1
+        words = self.words
+        i = HEADER_WORDS + key % self.buckets * BUCKET_WORDS
+        for j in (i, i + ENTRY_WORDS):
+            meta = words[j + 1]
+            bits = words[j + 2]
+            if words[j] ^ meta ^ bits == key:
+                self.hits += 1
+                self._bits[0] = bits
+                # Scores are stored as doubles; integral ones come back as
+                # the ints the evaluation returned, so results read the
+                # same with and without a table
+                score = self._double[0]
+                if score.is_integer():
+                    score = int(score)
+                return (meta & 0x3FFFF, (meta >> DEPTH_SHIFT) & 0xFF,
+                        (meta >> FLAG_SHIFT) & 3, score)
+        if words[i] or words[i + ENTRY_WORDS]:
+            self.collisions += 1
+        return None
+
+    def store(self, key, move, depth, flag, score):
+        """Store a search result for key
+
+        The depth-preferred entry is replaced by the same position, by a
+        result at least as deep, or when it is from an older generation;
+        otherwise the result goes to the always-replace entry.
+        """
+        self.stores += 1
+        words = self.words
+        generation = words[1]
+        i = HEADER_WORDS + key % self.buckets * BUCKET_WORDS
+        check = words[i]
+        old_meta = words[i + 1]
+        old_key = check ^ old_meta ^ words[i + 2]
+        if not (old_key == key or not check or depth >= (old_meta >> DEPTH_SHIFT) & 0xFF
+                or old_meta >> GENERATION_SHIFT != generation):
+            i += ENTRY_WORDS
+            check = words[i]
+            old_key = check ^ words[i + 1] ^ words[i + 2]
+        if check and old_key != key:
+            self.overwrites += 1
+        meta = ((move or 0) | depth << DEPTH_SHIFT | flag << FLAG_SHIFT
+                | generation << GENERATION_SHIFT)
+        self._double[0] = score
+        bits = self._bits[0]
+        words[i + 1] = meta
+        words[i + 2] = bits
+        words[i] = key ^ meta ^ bits
+
+    def hashfull(self):
+        """Permille of entries holding a result of the current generation, sampled"""
+        words = self.words
+        generation = words[1]
+        sample = min(self.buckets, HASHFULL_SAMPLE)
+        used = 0
+        for b in range(sample):
+            i = HEADER_WORDS + b * BUCKET_WORDS
+            for j in (i, i + ENTRY_WORDS):
+                if words[j] and words[j + 1] >> GENERATION_SHIFT == generation:
+                    used += 1
+        return used * 1000 // (2 * sample)
+
+    def stats(self):
+        """Size, fill and this process's counters as a dict"""
+        return {"size_mb": round(self.size_mb, 2), "entries": 2 * self.buckets,
+                "hashfull": self.hashfull(), "probes": self.probes, "hits": self.hits,
+                "collisions": self.collisions, "stores": self.stores,
+                "overwrites": self.overwrites}
+
+    def report(self):
+        """The stats as one line of text"""
+        stats = self.stats()
+        hit_rate = stats["hits"] / stats["probes"] if stats["probes"] else 0
+        return ("{size_mb} MB, {entries} entries, {fill:.1%} full, {probes} probes, "
+                "{hits} hits ({rate:.1%}), {collisions} collisions, {stores} stores, "
+                "{overwrites} overwrites").format(fill=stats["hashfull"] / 1000,
+                                                  rate=hit_rate, **stats)
+
+    def clear(self):
+        memoryview(self.words).cast("B")[HEADER_WORDS * 8:] = bytes(self.buckets * BUCKET_BYTES)
+
+    def close(self):
+        """Release the buffer, shared memory stays until the owner unlinks it"""
+        self.words.release()
+        if self.shm is not None:
+            self.shm.close()
+
+    def unlink(self):
+        """Free the shared memory, called once by the owner"""
+        if self.shm is not None and self.owner:
+            self.shm.unlink()
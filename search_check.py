@@ -0,0 +1,132 @@
+"""Check the selective search options against full-width search
+
+Every position of a fixed set is searched with each option switched on, and
+the move it picks is scored by a full-width search of that move. The check
+fails (exit status 1) when an option misses a forced macan-trap result that
+full-width search finds, or when its mean regret (how much worse its moves
+score than the full-width best move) exceeds --max-regret.
+
+    python search_check.py --depth 5
+"""
+import argparse
+import sys
+import time
+
+from batch_analysis import move_to_json, position_from_json, read_jsonl
+from macanan import MACAN, MacananAI
+
+# Middlegame positions from self-play, then macan-trap endings that need
+# more than 3 plies to see: Uwong to move and trapping, Macan to move and lost
+POSITIONS = [
+    {"board": "U..UM/..U.U/..M../U..U./.....", "turn": "macan", "eaten": 2, "macans": [[0, 4], [2, 2]]},
+    {"board": "..U../UM..U/.U.UM/...U./.....", "turn": "macan", "eaten": 2, "macans": [[1, 1], [2, 4]]},
+    {"board": "..U../UM.MU/.UUU./...../.....", "turn": "macan", "eaten": 2, "macans": [[1, 1], [1, 3]]},
+    {"board": "U..../...U./UM.U./...MU/U.U.U", "turn": "uwong", "eaten": 0, "macans": [[2, 1], [3, 3]]},
+    {"board": "U..../...U./UMU.M/....U/U.U.U", "turn": "uwong", "eaten": 0, "macans": [[2, 1], [2, 4]]},
+    {"board": "U.U.U/.U.U./U.M../.U.../UM...", "turn": "macan", "eaten": 0, "macans": [[2, 2], [4, 1]]},
+    {"board": "..U../U..../UU.../.M.UU/U.UM.", "turn": "macan", "eaten": 0, "macans": [[3, 1], [4, 3]]},
+    {"board": "...../U..U./.U.M./UMUUU/U....", "turn": "macan", "eaten": 0, "macans": [[3, 1], [2, 3]]},
+    {"board": "U..U./..U../.UMU./U.U../..MU.", "turn": "uwong", "eaten": 0, "macans": [[4, 2], [2, 2]]},
+    {"board": ".UM../..U.U/UUMU./...U./...U.", "turn": "uwong", "eaten": 0, "macans": [[2, 2], [0, 2]]},
+    {"board": ".U.U./.MU.U/U.U../...../.UM.U", "turn": "macan", "eaten": 0, "macans": [[1, 1], [4, 2]]},
+    {"board": "...U./.U..U/UMUM./.UU../...U.", "turn": "macan", "eaten": 0, "macans": [[2, 1], [2, 3]]},
+    {"board": "...../..UMU/UM.U./..U../..U..", "turn": "macan", "eaten": 2, "macans": [[1, 3], [2, 1]]},
+    {"board": "U..../UMU../.U.UU/U.M../..U..", "turn": "uwong", "eaten": 0, "macans": [[1, 1], [3, 2]]},
+    {"board": "U..../UMU../.U.U./.M.U./.UU..", "turn": "uwong", "eaten": 0, "macans": [[1, 1], [3, 1]]},
+    {"board": "UUMMU/.U.U./U...U/..U../.....", "turn": "uwong", "eaten": 0, "macans": [[0, 3], [0, 2]]},
+    {"board": "M.UMU/U.UUU/...../.UU../.....", "turn": "uwong", "eaten": 0, "macans": [[0, 0], [0, 3]]},
+    {"board": "U..../..UUU/...M./...UM/U.U.U", "turn": "uwong", "eaten": 0, "macans": [[2, 3], [3, 4]]},
+    {"board": "U.MU./.UMU./.U.../...U./U..U.", "turn": "uwong", "eaten": 0, "macans": [[0, 2], [1, 2]]},
+    {"board": ".MUUM/UUU.U/..U../...../.U...", "turn": "uwong", "eaten": 0, "macans": [[0, 4], [0, 1]]},
+    {"board": "UMM.U/UUU../....U/...../.U.U.", "turn": "uwong", "eaten": 0, "macans": [[0, 1], [0, 2]]},
+    {"board": ".UMUM/.UUU./...../....U/U..U.", "turn": "macan", "eaten": 0, "macans": [[0, 4], [0, 2]]},
+    {"board": "UUMMU/.U.U./U...U/..U../.....", "turn": "macan", "eaten": 0, "macans": [[0, 3], [0, 2]]},
+    {"board": "..UMM/.UUU./...../...U./UU..U", "turn": "macan", "eaten": 0, "macans": [[0, 3], [0, 4]]},
+    {"board": "...../...U./...UU/UU.UM/.UU.M", "turn": "macan", "eaten": 0, "macans": [[3, 4], [4, 4]]},
+]
+
+OPTIONS = {
+    "lmr": {"lmr": True},
+    "null_move": {"null_move": True},
+    "lmr+null_move": {"lmr": True, "null_move": True},
+}
+
+INF = float("inf")
+
+
+def search(engine, state, depth):
+    """Root score and best move of a plain minimax search"""
+    return engine.minimax(state, depth, -INF, INF, True, state.turn == MACAN)
+
+
+def move_scores(engine, state, depth):
+    """Full-width score of every root move searched to depth"""
+    scores = {}
+    for move in engine.generate_moves(state):
+        undo = state.make_move(move)
+        scores[move], _ = engine.minimax(state, depth - 1, -INF, INF, False,
+                                         state.turn != MACAN)
+        state.unmake_move(move, undo)
+    return scores
+
+
+def check(positions, depth=4, max_regret=150, out=sys.stdout):
+    """Compare every option with full-width search, return True when all pass"""
+    full = MacananAI()
+    reference = []
+    nodes = 0
+    start = time.perf_counter()
+    for state in positions:
+        score, _ = search(full, state, depth)
+        nodes += full.nodes
+        reference.append((score, move_scores(full, state, depth)))
+    elapsed = time.perf_counter() - start
+    print(f"full width: {nodes / len(positions):.0f} nodes/position, "
+          f"{elapsed / len(positions):.3f}s/position incl. move scores", file=out)
+
+    passed = True
+    for name, options in OPTIONS.items():
+        engine = MacananAI(**options)
+        nodes = regret = 0
+        failures = []
+        start = time.perf_counter()
+        for index, (state, (full_score, scores)) in enumerate(zip(positions, reference)):
+            score, move = search(engine, state, depth)
+            nodes += engine.nodes
+            best = max(scores.values())
+            # A trap found at full width must be found, and not invented
+            if (abs(full_score) == INF or abs(score) == INF) and score != full_score:
+                failures.append(f"position {index}: {score} instead of {full_score}, "
+                                f"played {move_to_json(move, state.size)}")
+            elif move is not None and scores[move] != best:  # None when every move loses
+                regret += best - scores[move]
+        elapsed = time.perf_counter() - start
+        mean_regret = regret / len(positions)
+        status = "ok" if not failures and mean_regret <= max_regret else "FAIL"
+        print(f"{name}: {nodes / len(positions):.0f} nodes/position, "
+              f"{elapsed / len(positions):.3f}s/position, mean regret {mean_regret:.0f} - "
+              f"{status}", file=out)
+        for failure in failures:
+            print("  " + failure, file=out)
+        passed = passed and status == "ok"
+    return passed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the selective search options")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--max-regret", type=float, default=150)
+    parser.add_argument("--positions", help="JSON lines file (default: built-in set)")
+    args = parser.parse_args(argv)
+
+    if args.positions:
+        with open(args.positions) as f:
+            positions = [state for _, state in read_jsonl(f)]
+    else:
+        positions = [position_from_json(obj) for obj in POSITIONS]
+    if not check(positions, args.depth, args.max_regret):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
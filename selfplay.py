@@ -0,0 +1,85 @@
+"""Headless games between two MacananAI instances
+
+The turn order and win checks follow MacananGame's AI vs AI mode, without
+any GUI so games can run inside worker processes.
+"""
+from macanan import (MACAN, MOVE_CAPTURE, MOVE_PLACE, QUIET_PLY_DRAW, REPETITION_DRAW,
+                     GameState, MacananAI, game_result)
+from macanan.server import state_to_json
+
+
+def play_game(macan_ai, uwong_ai, opening=(), max_plies=200, adjudicate_plies=0,
+              macan_win_scores=(5000, -1000), uwong_win_scores=(-2000, 6000),
+              record=False, max_repetitions=REPETITION_DRAW, max_quiet_plies=QUIET_PLY_DRAW,
+              observe=None):
+    """Play one game and return a dict with result, reason and plies
+
+    opening is a sequence of placement moves played before the engines take
+    over. With adjudicate_plies > 0 a game is stopped early once both
+    engines' root scores agree on the winner for that many consecutive plies:
+    macan_win_scores and uwong_win_scores give the (macan engine at least or
+    at most, uwong engine at most or at least) score pair for each verdict.
+    With record=True the positions before every ply and the engines' scores
+    are returned under "positions". The game is drawn when a position
+    occurs for the max_repetitions-th time or after max_quiet_plies plies
+    without a capture or placement (0 turns either rule off). observe, when
+    given, is called as observe(state, move, score) before every ply is
+    played, score None for the opening moves.
+    """
+    state = GameState(board=macan_ai.board)
+    scores = {"macan": None, "uwong": None}
+    agreed = 0
+    quiet = 0
+    positions = []
+    result, reason = "draw", "max plies"
+    for ply in range(max_plies):
+        is_macan_ai = state.turn == MACAN
+        ai = macan_ai if is_macan_ai else uwong_ai
+        if record:
+            positions.append(state_to_json(state))
+
+        if ply < len(opening):
+            score, move = None, opening[ply]
+        else:
+            score, move, _ = ai.analyse(state)
+
+        if move is None:
+            # The side to move is stuck: a trapped Macan loses, a stuck Uwong draws
+            result, reason = ("uwong", "macan trapped") if is_macan_ai else ("draw", "uwong stuck")
+            break
+        if observe is not None:
+            observe(state, move, score)
+        state.make_move(move)
+        scores["macan" if is_macan_ai else "uwong"] = score
+        if record:
+            positions[-1]["score"] = score
+
+        # The same rules as the GUI games
+        quiet = 0 if move & (MOVE_CAPTURE | MOVE_PLACE) else quiet + 1
+        over = game_result(state, macan_ai.has_valid_moves(state), quiet, max_repetitions,
+                           max_quiet_plies)
+        if over is not None:
+            result, reason = over
+            break
+
+        if adjudicate_plies and None not in scores.values():
+            if scores["macan"] >= macan_win_scores[0] and scores["uwong"] <= macan_win_scores[1]:
+                verdict = "macan"
+            elif scores["macan"] <= uwong_win_scores[0] and scores["uwong"] >= uwong_win_scores[1]:
+                verdict = "uwong"
+            else:
+                verdict = None
+            agreed = agreed + 1 if verdict else 0
+            if agreed >= adjudicate_plies:
+                result, reason = verdict, "adjudicated"
+                break
+
+    game_record = {"result": result, "reason": reason, "plies": ply + 1}
+    if record:
+        game_record["positions"] = positions
+    return game_record
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(play_game(MacananAI(), MacananAI())))
@@ -0,0 +1,253 @@
+"""Playing strength against compute for engine configurations
+
+Every configuration plays game pairs (each side of the same random opening)
+against a fixed reference engine, once per move budget, across a worker
+pool. The configurations search with iter_search until the budget is
+spent, the reference always searches to a fixed depth, so the results of
+all budgets are on one scale. The report gives an Elo estimate with a 95%
+confidence interval per configuration and budget, next to the average and
+99th percentile time per move:
+
+    python strength.py --configs default,selective,tt --budgets 25,50,100 --pairs 16
+    python strength.py --unit nodes --budgets 2000,8000,32000
+
+Neither kind of budget is exact. The search checks its stop condition
+every STOP_CHECK_NODES (64) nodes, so it runs over a node budget by up
+to that many nodes and over a time budget by the time they take, 1-2 ms
+on a typical machine, plus the time to unwind the search. The report
+therefore also gives what the moves actually spent on average ("spent",
+in the budget's unit), and marks with "!" the rows that spent more than
+BUDGET_TOLERANCE over their budget: their Elo belongs to more compute
+than the label says. Time budgets are only comparable between runs on
+an otherwise idle machine with no more workers than cores; node budgets
+give the same games anywhere. The endgame solver runs within the budget,
+on at most SOLVER_SHARE of it, and the search gets what the solver left.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import time
+
+from macanan import MacananAI, TranspositionTable
+from macanan.solver import prove
+from selfplay import play_game
+from tuning import random_opening
+
+CONFIGS = {
+    "plain": {"ordering": False, "solver_nodes": 0},
+    "default": {},
+    "lmr": {"lmr": True},
+    "null_move": {"null_move": True},
+    "selective": {"lmr": True, "null_move": True},
+    "tt": {"hash_mb": 16},
+    "all": {"lmr": True, "null_move": True, "hash_mb": 16},
+}
+
+# Largest share of a move's budget the endgame solver may use
+SOLVER_SHARE = 0.5
+# Average spending over the budget above which a report row is marked
+BUDGET_TOLERANCE = 0.1
+
+# Normal quantile of the two-sided 95% interval
+Z95 = 1.96
+
+
+def make_engine(options, engine_class=MacananAI):
+    """MacananAI (or engine_class) for a CONFIGS entry, hash_mb giving it a private table"""
+    options = dict(options)
+    hash_mb = options.pop("hash_mb", 0)
+    return engine_class(tt=TranspositionTable(hash_mb) if hash_mb else None, **options)
+
+
+class BudgetPlayer:
+    """Plays every move within a time (ms) or node budget, timing each move
+
+    Quacks like the MacananAI that play_game expects. A win proven by the
+    endgame solver is played at once, as in get_best_move; the solver's
+    time and nodes count against the budget.
+    """
+
+    def __init__(self, engine, budget, unit="ms"):
+        self.engine = engine
+        self.board = engine.board
+        self.budget = budget
+        self.unit = unit
+        # Seconds and nodes (solver and search) per move
+        self.latencies = []
+        self.nodes = []
+
+    def has_valid_moves(self, state):
+        return self.engine.has_valid_moves(state)
+
+    def analyse(self, state):
+        engine = self.engine
+        start = time.perf_counter()
+        proven, winning, solver_nodes = None, None, 0
+        if engine.solver_nodes and engine.is_sharp_endgame(state):
+            if self.unit == "ms":
+                deadline = start + SOLVER_SHARE * self.budget / 1000
+                proven, winning, solver_nodes = prove(
+                    engine, state, engine.solver_nodes,
+                    lambda: time.perf_counter() >= deadline)
+            else:
+                proven, winning, solver_nodes = prove(
+                    engine, state, min(engine.solver_nodes, int(SOLVER_SHARE * self.budget)))
+        searched = 0
+        if proven:
+            result = (float("inf"), winning, [winning])
+        else:
+            if self.unit == "ms":
+                left = self.budget / 1000 - (time.perf_counter() - start)
+                records = engine.iter_search(state, time_limit=max(0.0, left))
+            else:
+                left = self.budget - solver_nodes
+                records = engine.iter_search(state, stop=lambda: engine.nodes >= left)
+            record = None
+            for record in records:
+                pass
+            searched = engine.nodes
+            if record is None:
+                # Out of budget before depth 1 completed
+                result = engine.analyse(state, 1)
+                searched += engine.nodes
+            else:
+                result = (record["score"], record["move"], record["pv"])
+        self.latencies.append(time.perf_counter() - start)
+        self.nodes.append(solver_nodes + searched)
+        return result
+
+
+def play_match(task):
+    """Play one opening with both colours, returns (name, budget, scores, latencies, nodes)"""
+    name, options, budget, unit, reference_depth, opening, game_options = task
+    results = []
+    latencies = []
+    nodes = []
+    for player_side in ("macan", "uwong"):
+        player = BudgetPlayer(make_engine(options), budget, unit)
+        reference = MacananAI(depth=reference_depth)
+        macan_ai, uwong_ai = (player, reference) if player_side == "macan" else (reference, player)
+        result = play_game(macan_ai, uwong_ai, opening, **game_options)["result"]
+        results.append(1.0 if result == player_side else 0.5 if result == "draw" else 0.0)
+        latencies.extend(player.latencies)
+        nodes.extend(player.nodes)
+    return name, budget, results, latencies, nodes
+
+
+def elo(score):
+    """Elo difference for an expected score, clamped away from 0 and 1"""
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * math.log10(1 / score - 1) + 0.0  # no -0
+
+
+def elo_interval(results):
+    """(elo, low, high) from game scores of 0, 0.5 and 1"""
+    n = len(results)
+    mean = sum(results) / n
+    variance = sum((r - mean) ** 2 for r in results) / n
+    margin = Z95 * math.sqrt(variance / n)
+    return elo(mean), elo(mean - margin), elo(mean + margin)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def benchmark(configs, budgets, unit="ms", pairs=8, reference_depth=3, workers=None,
+              seed=0, max_plies=200, callback=None):
+    """Play every configuration at every budget, returns a list of report rows
+
+    A row is {"config", "budget", "games", "score", "elo", "elo_low",
+    "elo_high", "avg_ms", "p99_ms", "avg_nodes", "spent", "over_budget",
+    "moves"}. spent is avg_ms or avg_nodes, whichever is in the budget's
+    unit, and over_budget is true when it exceeds the budget by more than
+    BUDGET_TOLERANCE. callback(done, total) is called as matches finish.
+    """
+    rng = random.Random(seed)
+    openings = [random_opening(rng) for _ in range(pairs)]
+    game_options = {"max_plies": max_plies}
+    tasks = [(name, CONFIGS[name], budget, unit, reference_depth, opening, game_options)
+             for name in configs for budget in budgets for opening in openings]
+    results = {}
+    latencies = {}
+    nodes = {}
+    with multiprocessing.Pool(workers) as pool:
+        for done, (name, budget, scores, times, counts) in enumerate(
+                pool.imap_unordered(play_match, tasks), 1):
+            results.setdefault((name, budget), []).extend(scores)
+            latencies.setdefault((name, budget), []).extend(times)
+            nodes.setdefault((name, budget), []).extend(counts)
+            if callback:
+                callback(done, len(tasks))
+
+    rows = []
+    for name in configs:
+        for budget in budgets:
+            scores = results[name, budget]
+            times = latencies[name, budget]
+            counts = nodes[name, budget]
+            rating, low, high = elo_interval(scores)
+            avg_ms = 1000 * sum(times) / len(times)
+            avg_nodes = sum(counts) / len(counts)
+            spent = avg_ms if unit == "ms" else avg_nodes
+            rows.append({"config": name, "budget": budget, "games": len(scores),
+                         "score": sum(scores) / len(scores), "elo": rating, "elo_low": low,
+                         "elo_high": high, "avg_ms": avg_ms,
+                         "p99_ms": 1000 * percentile(times, 0.99), "avg_nodes": avg_nodes,
+                         "spent": spent, "over_budget": spent > budget * (1 + BUDGET_TOLERANCE),
+                         "moves": len(times)})
+    return rows
+
+
+def format_rows(rows, unit="ms"):
+    lines = [f"{'config':<12}{'budget':>10}{'spent':>10}{'games':>7}{'score':>8}{'elo':>7}"
+             f"{'95% interval':>16}{'avg ms':>9}{'p99 ms':>9}"]
+    for row in rows:
+        interval = f"[{row['elo_low']:+.0f}, {row['elo_high']:+.0f}]"
+        spent = f"{row['spent']:.1f}{'!' if row['over_budget'] else ' '}"
+        lines.append(f"{row['config']:<12}{str(row['budget']) + ' ' + unit:>10}{spent:>10}"
+                     f"{row['games']:>7}{row['score']:>8.3f}{row['elo']:>+7.0f}"
+                     f"{interval:>16}{row['avg_ms']:>9.1f}{row['p99_ms']:>9.1f}")
+    if any(row["over_budget"] for row in rows):
+        lines.append(f"! spent more than {BUDGET_TOLERANCE:.0%} over the budget per move")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure playing strength against compute")
+    parser.add_argument("--configs", default="default,selective",
+                        help="comma separated names from: " + ", ".join(CONFIGS))
+    parser.add_argument("--budgets", default="25,50,100",
+                        help="comma separated budgets per move")
+    parser.add_argument("--unit", choices=("ms", "nodes"), default="ms")
+    parser.add_argument("--pairs", type=int, default=8, help="game pairs per budget")
+    parser.add_argument("--reference-depth", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-plies", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="also write the rows as JSON")
+    args = parser.parse_args(argv)
+
+    configs = args.configs.split(",")
+    for name in configs:
+        if name not in CONFIGS:
+            parser.error(f"unknown config {name}")
+    budgets = [int(budget) for budget in args.budgets.split(",")]
+
+    def report(done, total):
+        print(f"\r{done}/{total} matches", end="", flush=True)
+
+    rows = benchmark(configs, budgets, args.unit, args.pairs, args.reference_depth,
+                     args.workers, args.seed, args.max_plies, callback=report)
+    print()
+    print(format_rows(rows, args.unit))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
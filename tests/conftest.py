@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def movement_positions():
+    """The movement-phase positions of search_check"""
+    from batch_analysis import position_from_json
+    from search_check import POSITIONS
+
+    states = [position_from_json(obj) for obj in POSITIONS]
+    return [state for state in states if state.phase == "movement"]
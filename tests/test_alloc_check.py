@@ -0,0 +1,19 @@
+"""The memory budgets of alloc_check, run on the search_check positions"""
+import io
+
+from batch_analysis import position_from_json
+from search_check import POSITIONS
+from alloc_check import GarbageAI, check
+
+POSITION_STATES = [position_from_json(obj) for obj in POSITIONS]
+
+
+def test_search_stays_within_the_budgets():
+    out = io.StringIO()
+    assert check(POSITION_STATES, ["default"], out=out), out.getvalue()
+
+
+def test_garbage_per_node_fails_the_check():
+    out = io.StringIO()
+    assert not check(POSITION_STATES, ["default"], out=out, engine_class=GarbageAI)
+    assert "transient_per_node" in out.getvalue()
@@ -0,0 +1,54 @@
+"""Rows and chunk files of datagen.py"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from datagen import COLUMNS, DataWriter, generate, open_dataset, play_rows  # noqa: E402
+from macanan import EMPTY, MACAN, UWONG  # noqa: E402
+
+
+def fake_rows(keys):
+    count = len(keys)
+    arrays = {column: np.zeros((count, *shape), dtype) for column, (dtype, shape)
+              in COLUMNS.items()}
+    arrays["hash"][:] = keys
+    arrays["move"][:] = keys
+    return arrays
+
+
+def test_rows_fill_chunks_and_skip_known_positions(tmp_path):
+    writer = DataWriter(tmp_path, chunk_rows=8)
+    assert writer.append(fake_rows(range(1, 11))) == 10
+    assert writer.append(fake_rows(range(5, 15))) == 4
+    writer.close()
+    assert writer.duplicates == 6
+    # A second writer appends to the dataset, knowing its positions
+    writer = DataWriter(tmp_path, chunk_rows=100)
+    assert writer.append(fake_rows(range(10, 20))) == 5
+    writer.close()
+    assert writer.index["chunks"] == [8, 8, 3] and writer.index["rows"] == 19
+    chunks = open_dataset(tmp_path)
+    assert [len(chunk["hash"]) for chunk in chunks] == [8, 8, 3]
+    assert np.concatenate([chunk["move"] for chunk in chunks]).tolist() == list(range(1, 20))
+
+
+def test_played_rows_describe_searched_positions():
+    arrays = play_rows((1, 1, 40))
+    count = len(arrays["hash"])
+    assert count > 0
+    for column, (dtype, shape) in COLUMNS.items():
+        assert arrays[column].dtype == dtype and arrays[column].shape == (count, *shape)
+    assert set(np.unique(arrays["board"]).tolist()) <= {EMPTY, MACAN, UWONG}
+    assert set(arrays["turn"].tolist()) <= {MACAN, UWONG}
+    assert set(arrays["phase"].tolist()) <= {0, 1}
+    assert len(set(arrays["result"].tolist())) == 1
+    assert (arrays["move"] > 0).all()
+
+
+def test_generate_appends_new_games(tmp_path):
+    first = generate(tmp_path, 2, depth=1, workers=1, max_plies=30, chunk_rows=64)
+    second = generate(tmp_path, 2, depth=1, workers=1, max_plies=30)
+    assert second.index["games"] == 4
+    assert second.index["rows"] > first.index["rows"]
+    keys = np.concatenate([chunk["hash"] for chunk in open_dataset(tmp_path)])
+    assert len(keys) == second.index["rows"] == len(set(keys.tolist()))
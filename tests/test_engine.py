@@ -0,0 +1,121 @@
+"""Rules, boards and searches of macanan.engine"""
+from macanan import MACAN, UWONG, BoardGraph, GameState, MacananAI, game_result, square_board
+
+
+def make_state(macans, uwongs, turn, macan_count=2, uwong_count=None, eaten=0):
+    squares = [0] * 25
+    for sq in macans:
+        squares[sq] = MACAN
+    for sq in uwongs:
+        squares[sq] = UWONG
+    state = GameState()
+    state.set_squares(squares, macans)
+    state.macan_count = macan_count
+    state.uwong_count = len(uwongs) + eaten if uwong_count is None else uwong_count
+    state.eaten_uwong = eaten
+    state.turn = turn
+    state.rehash()
+    return state
+
+
+# Macans in two corners with every exit blocked, Uwong still placing
+TRAPPED_IN_PLACEMENT = dict(macans=[0, 24], uwongs=[1, 5, 6, 18, 19, 23], turn=MACAN)
+
+
+def test_game_result_macan_trapped_while_uwong_places():
+    state = make_state(**TRAPPED_IN_PLACEMENT)
+    assert state.phase == "placement"
+    assert game_result(state, MacananAI().has_valid_moves(state)) == ("uwong", "macan trapped")
+
+
+def test_game_result_not_before_both_macans_are_placed():
+    state = make_state([0], [1, 5, 6], UWONG, macan_count=1)
+    assert game_result(state, False) is None
+
+
+def test_game_result_captures_and_draws():
+    state = make_state([12, 0], [1, 2], MACAN, uwong_count=8, eaten=6)
+    assert game_result(state, True) == ("macan", "captures")
+    state = make_state([12, 0], [1, 2, 3, 4, 5, 6, 7, 8], MACAN)
+    assert game_result(state, True, quiet_plies=10, quiet_ply_draw=10) == ("draw", "no captures")
+    assert game_result(state, True, quiet_plies=10, quiet_ply_draw=0) is None
+    state.history = [state.hash, state.hash]
+    assert game_result(state, True) == ("draw", "repetition")
+    assert game_result(state, True, repetition_draw=0) is None
+
+
+def rectangle_board(rows, cols, **pieces):
+    """Alquerque-style rows x cols board built directly as a BoardGraph"""
+    coords = [(row, col) for row in range(rows) for col in range(cols)]
+    index = {pos: sq for sq, pos in enumerate(coords)}
+    edges = []
+    for (row, col), sq in index.items():
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            other = index.get((row + dr, col + dc))
+            if other is not None and (dr == 0 or dc == 0 or (row + col) % 2 == 0):
+                edges.append((sq, other))
+    return BoardGraph(coords, edges, centre=(rows // 2, cols // 2), **pieces)
+
+
+def test_board_size():
+    assert square_board(7).size == 7
+    assert square_board(5, ("top",)).size == 5
+    assert rectangle_board(5, 5).size == 5
+    assert rectangle_board(4, 6).size is None
+
+
+def test_engine_plays_on_a_non_square_board():
+    board = rectangle_board(4, 6, max_uwong=6, capture_win=4)
+    engine = MacananAI(board=board, depth=2)
+    state = GameState(board=board)
+    for _ in range(30):
+        score, move, pv = engine.analyse(state)
+        assert move in engine.generate_moves(state)
+        state.make_move(move)
+        if game_result(state, engine.has_valid_moves(state)):
+            break
+    else:
+        assert state.phase == "movement"
+        records = list(engine.iter_search(state, max_depth=3))
+        assert records[-1]["depth"] == 3 and records[-1]["move"] in engine.generate_moves(state)
+
+
+def test_iter_search_stops_close_to_its_time_limit(movement_positions):
+    import time
+
+    engine = MacananAI()
+    states = movement_positions
+    # First searches allocate the evaluation cache
+    list(engine.iter_search(states[0], max_depth=2))
+    for limit in (0.005, 0.02):
+        overruns = []
+        for state in states:
+            start = time.perf_counter()
+            records = list(engine.iter_search(state, time_limit=limit))
+            overruns.append(time.perf_counter() - start - limit)
+            assert records[0]["complete"]
+        # Polling every 1024 nodes overran a 5 ms limit by 7 ms on average
+        assert sum(overruns) / len(overruns) < 0.003
+        assert max(overruns) < 0.010
+
+
+def test_multipv_lines_are_the_best_root_moves():
+    from batch_analysis import position_from_json
+    from search_check import POSITIONS
+
+    for obj in POSITIONS:
+        state = position_from_json(obj)
+        engine = MacananAI()
+        lines = engine.analyse_multipv(state, 3, 3)
+        # Every root move searched alone with a full window
+        evaluate = (engine.evaluate_placement if state.is_placing()
+                    else engine._board_evaluation())
+        exact = {}
+        for move in engine.generate_moves(state):
+            engine._new_search(state.is_placing())
+            child = state.copy()
+            child.make_move(move)
+            exact[move] = engine._search(child, 2, float("-inf"), float("inf"), False,
+                                         state.turn == MACAN, evaluate, ply=1)[0]
+        assert [score for score, _, _ in lines] == sorted(exact.values(), reverse=True)[:3]
+        assert all(exact[move] == score and pv[0] == move for score, move, pv in lines)
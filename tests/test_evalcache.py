@@ -0,0 +1,39 @@
+"""The leaf evaluation cache of macanan.evalcache"""
+from macanan import GameState, MacananAI
+from macanan.evalcache import EvalCache
+
+
+def test_probe_store_and_overwrite():
+    cache = EvalCache(1000)
+    assert cache.entries == 512
+    # Empty slots hold key 0, which must not read as a stored score
+    assert cache.probe(0) is None
+    cache.store(5, 1.5)
+    cache.store(7, -3)
+    assert cache.probe(5) == 1.5 and cache.probe(7) == -3
+    cache.store(5 + 512, 2)
+    assert cache.probe(5) is None and cache.probe(5 + 512) == 2
+    assert cache.stats() == {"entries": 512, "probes": 5, "hits": 3, "hit_rate": 0.6,
+                             "stores": 3, "overwrites": 1}
+    cache.clear()
+    assert cache.probe(7) is None
+
+
+def test_cache_is_made_by_the_first_movement_search(movement_positions):
+    engine = MacananAI()
+    assert engine.eval_cache is None
+    engine.analyse(GameState())
+    assert engine.eval_cache is None
+    engine.analyse(movement_positions[0])
+    assert engine.eval_cache.stores > 0
+    uncached = MacananAI(eval_cache_entries=0)
+    uncached.analyse(movement_positions[0])
+    assert uncached.eval_cache is None
+
+
+def test_cached_searches_match_uncached_ones(movement_positions):
+    cached, uncached = MacananAI(), MacananAI(eval_cache_entries=0)
+    for state in movement_positions:
+        for depth in (2, 3, 4):
+            assert cached.analyse(state, depth) == uncached.analyse(state, depth)
+    assert cached.eval_cache.hits > 0
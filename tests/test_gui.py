@@ -0,0 +1,78 @@
+"""MacananGame logic, driven without a window"""
+import pytest
+
+pytest.importorskip("tkinter")
+
+from macanan import MACAN, UWONG, GameState, MacananAI, gui
+
+
+class Recorder:
+    """Stands in for the tk widgets, keeping the callbacks scheduled with after"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback.__name__)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def make_game(mode):
+    game = gui.MacananGame.__new__(gui.MacananGame)
+    game.parent = Recorder()
+    game.canvas = game.status_label = game.clock_label = Recorder()
+    game.mode = mode
+    game.ai = MacananAI(depth=1)
+    game.clock = None
+    game.turbo = None
+    game.ai_delay = 0
+    game.repetition_draw = gui.REPETITION_DRAW
+    game.quiet_ply_draw = gui.QUIET_PLY_DRAW
+    game.board_size = 5
+    game.cell_size = 80
+    game.reset_game()
+    return game
+
+
+def click(game, sq):
+    row, col = divmod(sq, game.board_size)
+    event = type("Event", (), {"x": col * game.cell_size + 1, "y": row * game.cell_size + 1})
+    game.handle_click(event)
+
+
+@pytest.fixture
+def messages(monkeypatch):
+    shown = []
+    monkeypatch.setattr(gui.messagebox, "showinfo", lambda title, message: shown.append(message))
+    return shown
+
+
+def test_ai_answers_a_human_move(messages):
+    game = make_game(1)
+    click(game, 12)
+    assert game.state.turn == UWONG
+    assert game.parent.scheduled == ["make_ai_move"]
+    assert not messages
+
+
+def test_game_over_schedules_the_ai_once(messages):
+    # Macans in two corners, Uwong to place the piece that traps them
+    game = make_game(2)
+    squares = [0] * 25
+    squares[0] = squares[24] = MACAN
+    for sq in (1, 5, 6, 19, 23):
+        squares[sq] = UWONG
+    state = GameState()
+    state.set_squares(squares, [0, 24])
+    state.macan_count, state.uwong_count, state.turn = 2, 5, UWONG
+    state.rehash()
+    game.state = state
+    game.update_legal_moves()
+
+    click(game, 18)
+    assert messages == ["Uwong wins! Macan has no valid moves left!"]
+    # Only the restart's own scheduling of the AI's opening move
+    assert game.parent.scheduled == ["make_ai_move"]
+    assert game.state.macan_count == 0 and game.state.turn == MACAN
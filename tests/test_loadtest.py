@@ -0,0 +1,26 @@
+"""Rows of loadtest.py"""
+import multiprocessing
+
+from loadtest import _init_worker, capacity, rss_bytes, run_level, session_games, summarize
+
+
+def test_pool_memory_is_growth_since_the_workers_started():
+    options = {"depth": 2}
+    games = session_games(None, 2)
+    with multiprocessing.get_context("spawn").Pool(1, _init_worker, (options,)) as pool:
+        row = run_level("pool", 2, games, 4, options=options, pool=pool)
+        total = pool.apply(rss_bytes)
+    assert row["errors"] == 0 and row["moves"] == 8
+    # A whole interpreter with an engine is tens of MB, what the searches
+    # added on top of it is a small part of that
+    assert total > 0
+    assert 0 <= row["mb_per_session"] * 2 * 2 ** 20 < total / 4
+
+
+def test_capacity_is_the_largest_count_within_the_objectives():
+    rows = [summarize(n, [latency / 1000] * 100, [], 1.0, None)
+            for n, latency in ((1, 10), (2, 20), (4, 80))]
+    assert rows[0]["mb_per_session"] is None
+    assert capacity(rows, p99=50) == 2
+    assert capacity(rows, p95=100) == 4
+    assert capacity(rows, p99=5) == 0
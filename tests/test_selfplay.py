@@ -0,0 +1,34 @@
+"""Headless games of selfplay.play_game"""
+from macanan import MOVE_PLACE, MacananAI, encode_move
+from selfplay import play_game
+
+
+def place(sq):
+    return sq | MOVE_PLACE
+
+
+# Uwong traps the Macans on a1 and e5 with its placements while the second
+# Macan steps between e5 and d4
+TRAP_OPENING = [place(0), place(1), place(24), place(5), encode_move(24, 18), place(6),
+                encode_move(18, 24), place(23), encode_move(24, 18), place(19),
+                encode_move(18, 24), place(18)]
+
+
+def test_trap_during_placement_ends_on_the_trapping_move():
+    engine = MacananAI(depth=1)
+    game = play_game(engine, engine, TRAP_OPENING, max_plies=40)
+    # As in the GUI, not only once Macan fails to find a move
+    assert (game["result"], game["reason"]) == ("uwong", "macan trapped")
+    assert game["plies"] == len(TRAP_OPENING)
+
+
+def test_recorded_positions_round_trip():
+    from batch_analysis import position_from_json
+    from macanan.server import state_to_json
+
+    engine = MacananAI(depth=1)
+    game = play_game(engine, engine, TRAP_OPENING, max_plies=40, record=True)
+    assert len(game["positions"]) == game["plies"]
+    for position in game["positions"]:
+        position = {key: value for key, value in position.items() if key != "score"}
+        assert state_to_json(position_from_json(position)) == position
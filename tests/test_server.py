@@ -0,0 +1,107 @@
+"""Notation and line protocol of macanan.server"""
+import asyncio
+
+import pytest
+
+from macanan import MacananAI
+from macanan.server import (EngineServer, Session, board_to_string, move_to_text, parse_board,
+                            parse_move)
+
+
+class FakeServer:
+    """Takes the searches a Session starts instead of running them"""
+
+    def __init__(self):
+        self.searches = []
+
+    def start_search(self, session, state, max_depth, time_limit):
+        self.searches.append((max_depth, time_limit))
+
+
+def make_session():
+    lines = []
+    server = FakeServer()
+    return Session(server, lines.append), server, lines
+
+
+def test_moves_round_trip_through_their_text(movement_positions):
+    engine = MacananAI()
+    for state in [make_session()[0].state] + movement_positions:
+        for move in engine.generate_moves(state):
+            assert parse_move(engine, state, move_to_text(move, state.size)) == move
+
+
+def test_parse_rejects_bad_moves_and_boards():
+    session, _, _ = make_session()
+    engine, state = session.engine, session.state
+    with pytest.raises(ValueError):
+        parse_move(engine, state, "f1")
+    with pytest.raises(ValueError):
+        parse_move(engine, state, "a1b1")
+    with pytest.raises(ValueError):
+        parse_board("M.U../.U...", "macan")
+
+
+def test_board_string_round_trip():
+    cells = "M.U../.U.../..M../...../U...."
+    state = parse_board(cells, "uwong", 2)
+    assert board_to_string(state) == cells
+    assert state.uwong_count == 5 and state.eaten_uwong == 2
+    assert sorted(state.macans) == [0, 12]
+
+
+def test_handshake_and_errors():
+    session, _, lines = make_session()
+    for line in ["uci", "isready", "bogus", "position nowhere", "setoption name Hash value 1"]:
+        assert session.handle(line)
+    assert lines[0].startswith("id name ")
+    assert lines[4:7] == ["uciok", "readyok", "info string unknown command bogus"]
+    assert all(line.startswith("info string error") for line in lines[7:])
+    assert not session.handle("quit")
+
+
+def test_go_arguments_combine_in_any_order():
+    session, server, _ = make_session()
+    for line in ["go depth 4 movetime 250", "go movetime 250 depth 4", "go movetime 250",
+                 "go infinite", "go"]:
+        session.handle(line)
+    session.handle("setoption name Depth value 5")
+    session.handle("go")
+    assert server.searches == [(4, 0.25), (4, 0.25), (64, 0.25), (64, None), (3, None),
+                               (5, None)]
+
+
+def test_position_plays_its_moves():
+    session, _, _ = make_session()
+    session.handle("position startpos moves c3 a1")
+    assert session.state.squares.count(0) == 23
+    session.handle("position board M.U../.U.../..M../...../U.... macan 2 moves c3c4")
+    assert board_to_string(session.state) == "M.U../.U.../...../..M../U...."
+
+
+def test_server_answers_a_search_with_its_best_move():
+    async def play():
+        server = EngineServer(workers=1)
+        server.start()
+        lines = []
+        done = asyncio.Event()
+
+        def write(text):
+            lines.append(text)
+            if text.startswith("bestmove"):
+                done.set()
+
+        try:
+            session = Session(server, write)
+            session.handle("position board M.U../.U.../..M../...../U.... macan 2")
+            session.handle("go depth 2")
+            await asyncio.wait_for(done.wait(), 60)
+        finally:
+            server.close()
+        return session, lines
+
+    session, lines = asyncio.run(play())
+    assert [line.split()[2] for line in lines[:-1]] == ["1", "2"]
+    move = lines[-1].split()[1]
+    parse_move(session.engine, session.state, move)
+    assert lines[-2].split(" pv ")[1].split()[0] == move
@@ -0,0 +1,40 @@
+"""Forced wins proven by macanan.solver"""
+from test_engine import make_state
+
+from macanan import MACAN, MOVE_CAPTURE, UWONG, MacananAI
+from macanan.solver import outcome, prove
+
+# Uwong to move traps both Macans by force, a 72 node proof
+UWONG_WINS = dict(macans=[0, 2], uwongs=[3, 5, 7, 8, 11, 14, 20, 23], turn=UWONG)
+
+
+def test_uwong_trap_is_proven_against_every_reply():
+    engine = MacananAI()
+    state = make_state(**UWONG_WINS)
+    squares, key = list(state.squares), state.hash
+    assert outcome(engine, state) is None
+    proven, move, nodes = prove(engine, state)
+    assert proven and 1 < nodes < 1000
+    assert list(state.squares) == squares and state.hash == key
+    state.make_move(move)
+    assert prove(engine, state)[0] is False
+    for reply in engine.generate_moves(state):
+        undo = state.make_move(reply)
+        assert outcome(engine, state) == UWONG or prove(engine, state)[0]
+        state.unmake_move(reply, undo)
+
+
+def test_last_capture_wins_for_macan():
+    engine = MacananAI()
+    state = make_state([10, 0], [11, 12, 20], MACAN, eaten=engine.board.capture_win - 1)
+    proven, move, _ = prove(engine, state)
+    assert proven and move & MOVE_CAPTURE
+    state.make_move(move)
+    assert outcome(engine, state) == MACAN
+
+
+def test_prove_gives_up_on_its_node_budget_or_stop():
+    engine = MacananAI()
+    state = make_state(**UWONG_WINS)
+    assert prove(engine, state, max_nodes=5)[0] is None
+    assert prove(engine, state, stop=lambda: True)[0] is None
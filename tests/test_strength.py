@@ -0,0 +1,31 @@
+"""Move budgets and the report of strength.py"""
+from macanan import MacananAI
+from macanan.engine import STOP_CHECK_NODES
+from strength import BudgetPlayer, format_rows
+
+
+def test_moves_spend_about_their_time_budget(movement_positions):
+    player = BudgetPlayer(MacananAI(), 20)
+    for state in movement_positions:
+        player.analyse(state)
+    average = sum(player.latencies) / len(player.latencies)
+    assert average < 0.020 * 1.1
+    assert max(player.latencies) < 0.020 + 0.010
+
+
+def test_moves_spend_about_their_node_budget(movement_positions):
+    player = BudgetPlayer(MacananAI(), 2000, "nodes")
+    for state in movement_positions:
+        move = player.analyse(state)[1]
+        assert move is not None
+    assert max(player.nodes) <= 2000 + STOP_CHECK_NODES
+
+
+def test_report_marks_rows_over_budget():
+    row = {"config": "default", "budget": 10, "games": 2, "score": 0.5, "elo": 0.0,
+           "elo_low": -100.0, "elo_high": 100.0, "avg_ms": 10.5, "p99_ms": 12.0,
+           "avg_nodes": 400.0, "spent": 10.5, "over_budget": False, "moves": 40}
+    assert "!" not in format_rows([row])
+    over = dict(row, spent=20.8, avg_ms=20.8, over_budget=True)
+    lines = format_rows([row, over]).splitlines()
+    assert "20.8!" in lines[2] and lines[-1].startswith("!")
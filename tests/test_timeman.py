@@ -0,0 +1,64 @@
+"""Game clocks and time-managed moves of macanan.timeman"""
+from macanan import MACAN, UWONG, GameClock, GameState, MacananAI, TimeManager
+from macanan.timeman import MAX_CLOCK_SHARE, MOVE_OVERHEAD
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_clock_charges_the_mover_and_adds_the_increment():
+    timer = FakeTimer()
+    clock = GameClock(60, 2, timer)
+    clock.start(MACAN)
+    timer.now = 5
+    assert clock.time_left(MACAN) == 55 and clock.time_left(UWONG) == 60
+    clock.switch(UWONG)
+    assert clock.time_left(MACAN) == 57
+    timer.now = 75
+    assert clock.flagged() == UWONG
+    clock.stop()
+    # No increment for a side that ran out of time
+    assert clock.remaining[UWONG] == -10
+
+
+def test_budgets_stay_within_the_clock_share(movement_positions):
+    manager = TimeManager(MacananAI())
+    placing = GameState()
+    for state in movement_positions + [placing]:
+        for time_left, increment in ((1.0, 0), (60, 1), (0.01, 0)):
+            soft, hard = manager.budget(state, time_left, increment)
+            usable = max(0.0, time_left - MOVE_OVERHEAD)
+            assert 0 <= soft <= hard <= usable
+            assert hard <= MAX_CLOCK_SHARE * usable + increment
+    assert manager.budget(placing, 60)[0] < manager.budget(movement_positions[0], 60)[0]
+
+
+def test_moves_never_exceed_the_hard_budget(movement_positions):
+    manager = TimeManager(MacananAI())
+    for _ in range(2):
+        for state in movement_positions:
+            for time_left in (0.1, 0.5, 2.0):
+                soft, hard = manager.budget(state, time_left)
+                move = manager.best_move(state, time_left)
+                assert move in manager.engine.generate_moves(state)
+                assert manager.elapsed <= hard
+
+
+def test_forced_capture_is_played_at_once():
+    state = GameState()
+    squares = [0] * 25
+    squares[0] = squares[10] = MACAN
+    for sq in (11, 12, 4, 20, 21, 22, 23, 24):
+        squares[sq] = UWONG
+    state.set_squares(squares, [10, 0])
+    state.macan_count, state.uwong_count = 2, 8
+    state.rehash()
+    manager = TimeManager(MacananAI())
+    move = manager.best_move(state, 60)
+    assert move == manager.engine.find_capture(state) and move is not None
+    assert manager.depth == 0 and manager.elapsed < 0.01
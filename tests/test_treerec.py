@@ -0,0 +1,73 @@
+"""Search trees recorded by macanan.treerec"""
+from macanan import MACAN, MacananAI
+from macanan.treerec import SearchRecorder, SearchTree
+
+
+def search(engine, state, depth=3):
+    engine._new_search()
+    return engine.minimax(state.copy(), depth, float("-inf"), float("inf"), True,
+                          state.turn == MACAN)
+
+
+def test_recording_leaves_the_search_unchanged(movement_positions):
+    for state in movement_positions[:4]:
+        plain = MacananAI()
+        expected = search(plain, state)
+        engine = MacananAI()
+        recorder = SearchRecorder()
+        with recorder.attach(engine, state):
+            assert search(engine, state) == expected
+        assert "_search" not in vars(engine)
+        assert engine.nodes == plain.nodes
+        tree = recorder.tree
+        roots = [i for i, parent in enumerate(tree["parent"]) if parent < 0]
+        assert roots == [0] and tree["nodes"][0] == engine.nodes == len(tree)
+
+
+def test_paths_replay_to_the_recorded_positions(movement_positions):
+    state = movement_positions[1]
+    engine = MacananAI()
+    recorder = SearchRecorder()
+    with recorder.attach(engine, state):
+        search(engine, state)
+    tree = recorder.tree
+    for i in range(0, len(tree), 7):
+        replay = state.copy()
+        for move in tree.path(i)[1:]:
+            replay.make_move(move)
+        assert replay.hash == tree["hash"][i]
+        assert len(tree.path(i)) == tree["ply"][i] + 1
+
+
+def test_sampled_trees_keep_whole_paths(movement_positions):
+    state = movement_positions[1]
+    engine = MacananAI()
+    recorder = SearchRecorder(sample=0.3, full_plies=1)
+    with recorder.attach(engine, state):
+        search(engine, state, 4)
+    tree = recorder.tree
+    assert 1 < len(tree) < engine.nodes
+    for i, parent in enumerate(tree["parent"]):
+        if parent >= 0:
+            assert parent < i and tree["ply"][parent] == tree["ply"][i] - 1
+    engine = MacananAI()
+    capped = SearchRecorder(max_nodes=50)
+    with capped.attach(engine, state):
+        search(engine, state)
+    assert len(capped.tree) == 50 and capped.tree["nodes"][0] == engine.nodes
+
+
+def test_tree_file_round_trip(movement_positions, tmp_path):
+    state = movement_positions[1]
+    engine = MacananAI()
+    recorder = SearchRecorder(max_nodes=100)
+    with recorder.attach(engine, state):
+        search(engine, state)
+    path = tmp_path / "search.tree"
+    recorder.tree.meta["depth"] = 3
+    recorder.tree.save(path)
+    tree = SearchTree.load(path)
+    assert len(tree) == 100
+    assert tree.meta == recorder.tree.meta
+    for name, column in recorder.tree.columns.items():
+        assert tree[name].tobytes() == column.tobytes()
@@ -0,0 +1,89 @@
+"""Transposition table of macanan.tt"""
+import json
+import multiprocessing
+
+from macanan import MacananAI, TranspositionTable
+from macanan.tt import EXACT, LOWER, UPPER
+
+
+def test_store_and_probe():
+    table = TranspositionTable(1)
+    table.store(12345, 0x1203, 4, LOWER, 250)
+    assert table.probe(12345) == (0x1203, 4, LOWER, 250)
+    assert table.probe(54321) is None
+    assert (table.probes, table.hits, table.stores) == (2, 1, 1)
+
+
+def test_scores_keep_their_type():
+    table = TranspositionTable(1)
+    for key, score in enumerate((3200, -1000, 0, 12.5, float("inf"), float("-inf")), 1):
+        table.store(key, None, 1, EXACT, score)
+        stored = table.probe(key)[3]
+        assert stored == score and type(stored) is type(score)
+
+
+def test_search_output_is_the_same_with_a_table():
+    from batch_analysis import analyse_position, position_from_json
+    from search_check import POSITIONS
+
+    plain = MacananAI()
+    hashed = MacananAI(tt=TranspositionTable(4))
+    for obj in POSITIONS:
+        state = position_from_json(obj)
+        # Twice, the second search answering from the table
+        for _ in range(2):
+            assert (json.dumps(analyse_position(plain, state, 3)["score"])
+                    == json.dumps(analyse_position(hashed, state, 3)["score"]))
+
+
+def _store_in_worker(table):
+    table.store(777, 0x0102, 3, UPPER, -40)
+    table.close()
+
+
+def test_shared_table_is_seen_by_other_processes():
+    table = TranspositionTable.shared(1)
+    try:
+        worker = multiprocessing.get_context("spawn").Process(target=_store_in_worker,
+                                                              args=(table,))
+        worker.start()
+        worker.join()
+        assert worker.exitcode == 0
+        assert table.probe(777) == (0x0102, 3, UPPER, -40)
+    finally:
+        table.close()
+        table.unlink()
+
+
+def test_depth_preferred_and_always_replace_entries():
+    table = TranspositionTable(1)
+    buckets = table.buckets
+    deep, shallow, newer = 5, 5 + buckets, 5 + 2 * buckets  # one bucket
+    table.store(deep, 1, 6, EXACT, 10)
+    table.store(shallow, 2, 2, EXACT, 20)
+    # The shallower result goes to the second entry, the deep one stays
+    assert table.probe(deep)[3] == 10 and table.probe(shallow)[3] == 20
+    table.store(newer, 3, 1, EXACT, 30)
+    assert table.probe(deep)[3] == 10 and table.probe(shallow) is None
+    assert table.overwrites == 1
+    # A new generation frees the depth-preferred entry for any result
+    table.new_search()
+    table.store(shallow, 2, 1, EXACT, 40)
+    assert table.probe(deep) is None and table.probe(shallow)[3] == 40
+
+
+def test_principal_variations_are_not_cut_by_table_hits():
+    from batch_analysis import position_from_json
+    from search_check import POSITIONS
+
+    plain = MacananAI()
+    hashed = MacananAI(tt=TranspositionTable(4))
+    for obj in POSITIONS:
+        state = position_from_json(obj)
+        expected = plain.analyse(state, 4)[2]
+        # The second search is answered from the table near the root
+        for _ in range(2):
+            assert len(hashed.analyse(state, 4)[2]) == len(expected)
+        plain_lines = plain.analyse_multipv(state, 2, 3)
+        hashed_lines = hashed.analyse_multipv(state, 2, 3)
+        assert [len(pv) for _, _, pv in hashed_lines] == [len(pv) for _, _, pv in plain_lines]
@@ -0,0 +1,346 @@
+"""Texel-style fitting of the evaluate_board weights from finished games
+
+Game records are JSON lines as written by selfplay.play_game(record=True):
+    {"result": "macan" | "uwong" | "draw", "positions": [<position>, ...]}
+with positions in the batch_analysis JSON format. Quiet movement-phase
+positions (no capture available, game not over) are kept, every evaluation
+term of evaluate_board is computed for all of them at once with NumPy, and
+the weights are fitted so that a sigmoid of the evaluation predicts the game
+result. The Macan and Uwong evaluations are fitted separately, each against
+the result from its own side's point of view. Requires NumPy.
+
+    python texel.py games.jsonl -o weights.json
+"""
+import argparse
+import json
+
+import numpy as np
+
+from macanan import DEFAULT_WEIGHTS, EMPTY, MACAN, UWONG, square_board
+from macanan.server import board_to_string
+from batch_analysis import position_from_json
+
+BOARD = square_board(5)
+SQUARES = BOARD.num_squares
+# Index of the padding square used by the lookup tables for off-board targets
+OFF = SQUARES
+
+# Square value used for the padding square
+BLOCKED = 3
+
+MACAN_FEATURES = ("macan_free_square", "macan_restricted", "macan_edge", "macan_corner",
+                  "macan_capture", "macan_edge_capture", "macan_capture_setup",
+                  "macan_center", "macan_line")
+UWONG_FEATURES = ("uwong_material", "uwong_block", "uwong_near_trap", "uwong_danger",
+                  "uwong_adjacent", "uwong_escape_block", "uwong_left_edge", "uwong_edge")
+
+# Board string characters to square values, "/" separators dropped
+CELL_CODES = bytes.maketrans(b".MU", bytes([EMPTY, MACAN, UWONG]))
+RESULTS = {"macan": 1.0, "draw": 0.5, "uwong": 0.0}
+
+
+def _padded_table(rows, width):
+    # Ragged per-square lists as a (SQUARES, width) array padded with OFF
+    table = np.full((SQUARES, width), OFF)
+    for sq, row in enumerate(rows):
+        table[sq, :len(row)] = row
+    return table
+
+
+def _build_tables(board=BOARD):
+    """Per-square lookup tables describing every evaluate_board term
+
+    The board's own tables give the rule-based terms (steps, neighbours,
+    captures, edges), its coordinates the row, column and diagonal tests
+    that evaluate_board makes on coordinates.
+    """
+    coords = board.coords
+    index = {pos: sq for sq, pos in enumerate(coords)}
+
+    def at(r, c):
+        return index.get((r, c), OFF)
+
+    t = {}
+    t["restricted"] = np.array(board.restricted)
+    t["edge"] = np.array(board.edge)
+    t["corner"] = np.array(board.corner)
+    t["center"] = np.array(board.centrality)
+    t["left_edge"] = np.array(board.left_edge)
+    t["other_edge"] = t["edge"] & ~t["left_edge"]
+
+    # Captures: the two jumped squares and the landing square per direction
+    width = max(len(lines) for lines in board.capture_lines)
+    t["cap_land"] = _padded_table([[land for _, _, land in lines]
+                                   for lines in board.capture_lines], width)
+    t["cap_over"] = np.full((SQUARES, width, 2), OFF)
+    for sq, lines in enumerate(board.capture_lines):
+        for k, (over1, over2, _) in enumerate(lines):
+            t["cap_over"][sq, k] = (over1, over2)
+    t["cap_land_edge"] = np.append(t["edge"], False)[t["cap_land"]]
+
+    # Regular Macan moves and all neighbours
+    t["steps"] = _padded_table(board.step_targets, max(map(len, board.step_targets)))
+    t["king"] = np.zeros((SQUARES, SQUARES), dtype=bool)
+    for sq, targets in enumerate(board.neighbours):
+        t["king"][sq, list(targets)] = True
+
+    # Orthogonally adjacent (ordered) square pairs and which Macan squares
+    # see each pair lined up on a row, column or diagonal
+    pairs = [(a, b) for a, (ra, ca) in enumerate(coords) for b, (rb, cb) in enumerate(coords)
+             if abs(ra - rb) + abs(ca - cb) == 1]
+    t["pair_a"] = np.array([a for a, _ in pairs])
+    t["pair_b"] = np.array([b for _, b in pairs])
+    t["pair_aligned"] = np.zeros((SQUARES, len(pairs)), dtype=bool)
+    for s, (r, c) in enumerate(coords):
+        for p, (a, b) in enumerate(pairs):
+            (ra, ca), (rb, cb) = coords[a], coords[b]
+            t["pair_aligned"][s, p] = ((ra == r and rb == r) or (ca == c and cb == c) or
+                                       (abs(ra - r) == abs(ca - c) and abs(rb - r) == abs(cb - c)))
+
+    t["line"] = np.array([[r == r2 or c == c2 or abs(r2 - r) == abs(c2 - c)
+                           for r2, c2 in coords] for r, c in coords])
+    t["same_row"] = np.array([[r == r2 for r2, c2 in coords] for r, c in coords])
+    t["same_col"] = np.array([[c == c2 for r2, c2 in coords] for r, c in coords])
+    t["manhattan1"] = np.array([[abs(r - r2) + abs(c - c2) == 1 for r2, c2 in coords]
+                                for r, c in coords])
+    t["left"] = np.array([at(r, c - 1) for r, c in coords])
+    t["right"] = np.array([at(r, c + 1) for r, c in coords])
+    t["up"] = np.array([at(r - 1, c) for r, c in coords])
+    t["down"] = np.array([at(r + 1, c) for r, c in coords])
+    return t
+
+
+TABLES = _build_tables()
+
+
+def _movement_position(obj):
+    """(board string, Macan squares) of a movement-phase position, else None
+
+    Reads the JSON position directly, without building a GameState.
+    """
+    cells = obj["board"]
+    if not isinstance(cells, str):
+        cells = board_to_string(position_from_json(obj))
+    macan_count = obj.get("macan_count")
+    if macan_count is None:
+        macan_count = cells.count("M")
+    uwong_count = obj.get("uwong_count")
+    if uwong_count is None:
+        uwong_count = cells.count("U") + obj.get("eaten", 0)
+    # evaluate_board only scores the movement phase
+    if macan_count < BOARD.max_macan or uwong_count < BOARD.max_uwong:
+        return None
+    size = BOARD.size
+    if obj.get("macans"):
+        macans = [row * size + col for row, col in obj["macans"]]
+    else:
+        macans = [sq for sq, ch in enumerate(cells.replace("/", "")) if ch == "M"]
+    return cells, macans
+
+
+def load_games(paths):
+    """Read the movement-phase positions of game records into (squares, macans, results)
+
+    squares is an (N, 25) int8 array of EMPTY/MACAN/UWONG, macans an (N, 2)
+    array of Macan squares in the GUI's order and results the final result
+    from Macan's point of view (1 win, 0.5 draw, 0 loss). The board strings
+    are converted all at once, so loading costs little more than parsing
+    the JSON.
+    """
+    boards, macans, results = [], [], []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                game = json.loads(line)
+                result = RESULTS[game["result"]]
+                for obj in game["positions"]:
+                    position = _movement_position(obj)
+                    if position is not None:
+                        boards.append(position[0])
+                        macans.append(position[1])
+                        results.append(result)
+    cells = "".join(boards).encode("ascii").translate(CELL_CODES, b"/")
+    squares = np.frombuffer(cells, dtype=np.int8).reshape(-1, SQUARES)
+    return squares, np.array(macans, dtype=np.intp).reshape(-1, 2), np.array(results)
+
+
+def _padded(squares):
+    return np.concatenate([squares, np.full((len(squares), 1), BLOCKED, dtype=squares.dtype)],
+                          axis=1)
+
+
+def _take(values, index):
+    # values[n, index[n, ...]] for every row n
+    return np.take_along_axis(values, index.reshape(len(values), -1), axis=1).reshape(index.shape)
+
+
+def macan_features(squares, macans):
+    """(N, len(MACAN_FEATURES)) matrix of the Macan evaluation terms"""
+    t = TABLES
+    padded = _padded(squares)
+    uwong = squares == UWONG
+    pair_present = uwong[:, t["pair_a"]] & uwong[:, t["pair_b"]]
+    features = np.zeros((len(squares), len(MACAN_FEATURES)))
+    for m in (macans[:, 0], macans[:, 1]):
+        over = _take(padded, t["cap_over"][m])
+        land = _take(padded, t["cap_land"][m])
+        capture = (land == EMPTY) & (over == UWONG).all(axis=2)
+        land_edge = t["cap_land_edge"][m]
+        features += np.stack([
+            ~t["restricted"][m],
+            t["restricted"][m],
+            t["edge"][m],
+            t["corner"][m],
+            (capture & ~land_edge).sum(axis=1),
+            (capture & land_edge).sum(axis=1),
+            (pair_present & t["pair_aligned"][m]).sum(axis=1),
+            t["center"][m],
+            (uwong & t["line"][m]).sum(axis=1),
+        ], axis=1)
+    return features
+
+
+def uwong_features(squares, macans):
+    """(N, len(UWONG_FEATURES)) matrix of the Uwong evaluation terms"""
+    t = TABLES
+    padded = _padded(squares) == UWONG
+    uwong = padded[:, :SQUARES]
+    m = macans[:, 0]
+    king = t["king"][m]
+    blocked = (uwong & king).sum(axis=1)
+    escape_squares = king & ~uwong
+    escape = escape_squares.astype(float) @ t["manhattan1"].astype(float)
+
+    row_pair = padded[:, t["left"]] | padded[:, t["right"]]
+    col_pair = padded[:, t["up"]] | padded[:, t["down"]]
+    danger = uwong & ((t["same_row"][m] & row_pair) | (t["same_col"][m] & col_pair))
+    safe = uwong & ~danger
+    return np.stack([
+        uwong.sum(axis=1),
+        blocked,
+        blocked >= 6,
+        danger.sum(axis=1),
+        (safe & t["manhattan1"][m]).sum(axis=1),
+        (safe * escape).sum(axis=1),
+        (uwong & t["left_edge"]).sum(axis=1),
+        (uwong & t["other_edge"]).sum(axis=1),
+    ], axis=1).astype(float)
+
+
+def quiet_mask(squares, macans):
+    """Positions with no capture available whose game is not already decided"""
+    t = TABLES
+    padded = _padded(squares)
+    has_moves = np.zeros(len(squares), dtype=bool)
+    has_capture = np.zeros(len(squares), dtype=bool)
+    for m in (macans[:, 0], macans[:, 1]):
+        over = _take(padded, t["cap_over"][m])
+        land = _take(padded, t["cap_land"][m])
+        capture = ((land == EMPTY) & (over == UWONG).all(axis=2)).any(axis=1)
+        step = (_take(padded, t["steps"][m]) == EMPTY).any(axis=1)
+        has_capture |= capture
+        has_moves |= capture | step
+    enough_uwong = (squares == UWONG).sum(axis=1) >= 3
+    return enough_uwong & has_moves & ~has_capture
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -60, 60)))
+
+
+def _loss(features, weights, targets, k):
+    return np.mean((_sigmoid(k * (features @ weights)) - targets) ** 2)
+
+
+def fit_scale(features, weights, targets):
+    """Find the sigmoid scale K that best fits the current weights (golden section)"""
+    lo, hi = -10.0, 0.0  # search log10(K)
+    ratio = (5 ** 0.5 - 1) / 2
+    for _ in range(60):
+        a = hi - ratio * (hi - lo)
+        b = lo + ratio * (hi - lo)
+        if _loss(features, weights, targets, 10 ** a) < _loss(features, weights, targets, 10 ** b):
+            hi = b
+        else:
+            lo = a
+    return 10 ** ((lo + hi) / 2)
+
+
+def fit_weights(features, targets, weights, epochs=50, batch_size=65536, lr=0.01, seed=0):
+    """Fit linear evaluation weights with mini-batch Adam on the Texel loss"""
+    k = fit_scale(features, weights, targets)
+    # Optimise in feature-normalised space so every weight moves at a similar rate
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    x = features / scale
+    v = weights * scale
+    m1 = np.zeros_like(v)
+    m2 = np.zeros_like(v)
+    rng = np.random.default_rng(seed)
+    step = 0
+    for _ in range(epochs):
+        order = rng.permutation(len(x))
+        for start in range(0, len(x), batch_size):
+            batch = order[start:start + batch_size]
+            p = _sigmoid(k * (x[batch] @ v))
+            grad = 2 * k * x[batch].T @ ((p - targets[batch]) * p * (1 - p)) / len(batch)
+            step += 1
+            m1 = 0.9 * m1 + 0.1 * grad
+            m2 = 0.999 * m2 + 0.001 * grad ** 2
+            v -= lr * np.abs(v).clip(1) * (m1 / (1 - 0.9 ** step)) / (
+                np.sqrt(m2 / (1 - 0.999 ** step)) + 1e-12)
+    return v / scale, k, _loss(features, v / scale, targets, k)
+
+
+def train(paths, weights=None, **options):
+    """Fit both evaluations on the quiet positions of the given game files
+
+    Returns the complete weights dict and a per-side report of position
+    count, sigmoid scale and final loss.
+    """
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    squares, macans, results = load_games(paths)
+    quiet = quiet_mask(squares, macans)
+    squares, macans, results = squares[quiet], macans[quiet], results[quiet]
+
+    report = {}
+    for side, names, extract, targets in (
+            ("macan", MACAN_FEATURES, macan_features, results),
+            ("uwong", UWONG_FEATURES, uwong_features, 1.0 - results)):
+        start = np.array([weights[name] for name in names], dtype=float)
+        fitted, k, loss = fit_weights(extract(squares, macans), targets, start, **options)
+        weights.update(zip(names, fitted.round(1).tolist()))
+        report[side] = {"positions": len(squares), "k": k, "loss": loss}
+    return weights, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit evaluate_board weights to game results")
+    parser.add_argument("games", nargs="+", help="game record JSONL files")
+    parser.add_argument("--weights", help="JSON file with starting weights")
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=65536)
+    parser.add_argument("--lr", type=float, default=0.01)
+    parser.add_argument("-o", "--output", help="write the fitted weights as JSON")
+    args = parser.parse_args(argv)
+
+    start = None
+    if args.weights:
+        with open(args.weights) as f:
+            start = json.load(f)
+    weights, report = train(args.games, start, epochs=args.epochs,
+                            batch_size=args.batch_size, lr=args.lr)
+    for side, info in report.items():
+        print(f"{side}: {info['positions']} positions, K={info['k']:.3g}, loss={info['loss']:.5f}")
+    text = json.dumps(weights, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
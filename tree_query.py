@@ -0,0 +1,168 @@
+"""Record a search tree and show where it cut off and spent its nodes
+
+    python tree_query.py record search.tree --index 3 --depth 5
+    python tree_query.py record search.tree --position '{"board": ...}' --sample 0.2
+    python tree_query.py show search.tree --top 10 --ply 1
+
+record searches one position (a JSON line as read by batch_analysis, or
+one of the search_check positions by index) with a SearchRecorder attached
+and saves the tree (see macanan.treerec). show prints, per ply, how many
+interior nodes were cut off and how many of those cut off on the first
+move searched, then the largest subtrees at one ply and the cutoffs that
+came latest, with the moves leading to them. A cutoff after many moves is
+an ordering miss; a large subtree under a move that scores badly is where
+pruning failed.
+"""
+import argparse
+import json
+import sys
+
+from batch_analysis import position_from_json
+from macanan import MACAN
+from macanan.server import move_to_text
+from macanan.treerec import FULL_PLIES, MAX_NODES, SearchRecorder, SearchTree
+from search_check import POSITIONS
+from strength import CONFIGS, make_engine
+
+
+def record(state, depth, config="default", iterative=False, max_nodes=MAX_NODES,
+           sample=1.0, full_plies=FULL_PLIES, seed=0):
+    """Search state with a recorder attached, returns the recorder's tree"""
+    engine = make_engine(CONFIGS[config])
+    recorder = SearchRecorder(max_nodes, sample, full_plies, seed)
+    with recorder.attach(engine, state):
+        if iterative:
+            for _ in engine.iter_search(state, max_depth=depth):
+                pass
+        elif state.is_placing():
+            engine.minimax_placement(state.copy(), depth, float("-inf"), float("inf"), True,
+                                     state.turn == MACAN)
+        else:
+            engine.minimax(state.copy(), depth, float("-inf"), float("inf"), True,
+                           state.turn == MACAN)
+    tree = recorder.tree
+    tree.meta.update({"depth": depth, "config": config, "iterative": iterative,
+                      "searched": engine.nodes})
+    return tree
+
+
+def format_path(moves, size):
+    names = []
+    for move in moves:
+        if move > 0:
+            names.append(move_to_text(move, size))
+        elif move == 0:
+            names.append("pass")
+    return " ".join(names) or "(root)"
+
+
+def ply_stats(tree):
+    """{ply: {"nodes", "interior", "cutoffs", "first"}} of the recorded nodes
+
+    interior nodes searched at least one child, first counts the cutoffs
+    made by the first child searched.
+    """
+    stats = {}
+    for ply, children, cutoff in zip(tree["ply"], tree["children"], tree["cutoff"]):
+        row = stats.setdefault(ply, {"nodes": 0, "interior": 0, "cutoffs": 0, "first": 0})
+        row["nodes"] += 1
+        if children:
+            row["interior"] += 1
+        if cutoff:
+            row["cutoffs"] += 1
+            if children == 1:
+                row["first"] += 1
+    return dict(sorted(stats.items()))
+
+
+def largest_subtrees(tree, ply, k=10):
+    """Rows at ply with the most nodes below them, largest first"""
+    rows = [i for i, p in enumerate(tree["ply"]) if p == ply]
+    return sorted(rows, key=lambda i: -tree["nodes"][i])[:k]
+
+
+def latest_cutoffs(tree, k=10):
+    """Cutoff rows that searched the most children first, latest first"""
+    rows = [i for i, cutoff in enumerate(tree["cutoff"]) if cutoff]
+    return sorted(rows, key=lambda i: (-tree["children"][i], -tree["nodes"][i]))[:k]
+
+
+def show(tree, top=10, ply=None, out=sys.stdout):
+    size = tree.meta.get("size", 5)
+    searched = tree.meta.get("searched") or sum(
+        n for n, parent in zip(tree["nodes"], tree["parent"]) if parent < 0)
+    print(f"{len(tree)} nodes recorded of {searched} searched, "
+          + ", ".join(f"{key} {value}" for key, value in tree.meta.items()
+                      if key not in ("searched", "size")), file=out)
+    stats = ply_stats(tree)
+    print(f"{'ply':>4} {'nodes':>8} {'interior':>8} {'cutoffs':>8} {'cut %':>6} {'first %':>7}",
+          file=out)
+    for p, row in stats.items():
+        cut = row["cutoffs"] / row["interior"] if row["interior"] else 0.0
+        first = row["first"] / row["cutoffs"] if row["cutoffs"] else 0.0
+        print(f"{p:>4} {row['nodes']:>8} {row['interior']:>8} {row['cutoffs']:>8} "
+              f"{cut:>6.1%} {first:>7.1%}", file=out)
+    if not stats:
+        return
+    if ply is None:
+        ply = min(stats) + 1 if min(stats) + 1 in stats else min(stats)
+
+    def line(i):
+        share = tree["nodes"][i] / searched if searched else 0.0
+        window = f"[{tree['alpha'][i]:g}, {tree['beta'][i]:g}]"
+        return (f"{tree['nodes'][i]:>8} {share:>6.1%} {tree['depth'][i]:>5} "
+                f"{tree['score'][i]:>9g} {window:>20} {tree['children'][i]:>5} "
+                f"{'cut' if tree['cutoff'][i] else '':>3}  "
+                f"{format_path(tree.path(i), size)}")
+
+    header = (f"{'nodes':>8} {'share':>6} {'depth':>5} {'score':>9} {'window':>20} "
+              f"{'moves':>5} {'':>3}  path")
+    print(f"\nlargest subtrees at ply {ply}", file=out)
+    print(header, file=out)
+    for i in largest_subtrees(tree, ply, top):
+        print(line(i), file=out)
+    print("\nlatest cutoffs", file=out)
+    print(header, file=out)
+    for i in latest_cutoffs(tree, top):
+        print(line(i), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and query search trees")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="search a position and save its tree")
+    rec.add_argument("output", help="tree file to write")
+    where = rec.add_mutually_exclusive_group(required=True)
+    where.add_argument("--position", help="position as a batch_analysis JSON line")
+    where.add_argument("--index", type=int, help="index into the search_check positions")
+    rec.add_argument("--depth", type=int, default=4)
+    rec.add_argument("--config", default="default",
+                     help="engine options, one of: " + ", ".join(CONFIGS))
+    rec.add_argument("--iterative", action="store_true",
+                     help="record every iteration of iter_search up to --depth")
+    rec.add_argument("--max-nodes", type=int, default=MAX_NODES)
+    rec.add_argument("--sample", type=float, default=1.0,
+                     help="share of the nodes below --full-plies recorded")
+    rec.add_argument("--full-plies", type=int, default=FULL_PLIES)
+    rec.add_argument("--seed", type=int, default=0)
+    query = commands.add_parser("show", help="print cutoffs and the largest subtrees")
+    query.add_argument("tree", help="tree file written by record")
+    query.add_argument("--top", type=int, default=10)
+    query.add_argument("--ply", type=int, default=None,
+                       help="ply of the subtrees listed (default: below the root)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        if args.config not in CONFIGS:
+            parser.error(f"unknown config {args.config}")
+        obj = json.loads(args.position) if args.position else POSITIONS[args.index]
+        tree = record(position_from_json(obj), args.depth, args.config, args.iterative,
+                      args.max_nodes, args.sample, args.full_plies, args.seed)
+        tree.save(args.output)
+        print(f"{len(tree)} of {tree.meta['searched']} nodes written to {args.output}")
+    else:
+        show(SearchTree.load(args.tree), args.top, args.ply)
+
+
+if __name__ == "__main__":
+    main()
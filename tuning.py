@@ -0,0 +1,118 @@
+"""SPSA tuning of the evaluation weights through parallel self-play
+
+Every iteration perturbs the tuned weights in a random +/- direction, plays
+pairs of games between the two perturbed engines (each engine takes both
+sides of the same opening) across a worker pool, and moves the weights
+towards the side that scored better.
+
+    python tuning.py --iterations 50 --pairs 16 --params macan_edge,uwong_block
+"""
+import argparse
+import json
+import multiprocessing
+import random
+
+from macanan import (DEFAULT_WEIGHTS, MOVE_PLACE, WEIGHT_NAMES, MacananAI,
+                     vector_to_weights, weights_to_vector)
+from selfplay import play_game
+
+# Standard SPSA gain sequence exponents
+ALPHA = 0.602
+GAMMA = 0.101
+
+
+def random_opening(rng, plies=3):
+    """Random placements on distinct squares, alternating Macan and Uwong"""
+    return [sq | MOVE_PLACE for sq in rng.sample(range(25), plies)]
+
+
+def play_pair(task):
+    """Play both colours of one opening and return the points of engine a (0-2)"""
+    weights_a, weights_b, opening, game_options = task
+    engine_a = MacananAI(weights=weights_a)
+    engine_b = MacananAI(weights=weights_b)
+    points = 0.0
+    for macan_ai, uwong_ai, a_side in ((engine_a, engine_b, "macan"),
+                                       (engine_b, engine_a, "uwong")):
+        result = play_game(macan_ai, uwong_ai, opening, **game_options)["result"]
+        if result == a_side:
+            points += 1
+        elif result == "draw":
+            points += 0.5
+    return points
+
+
+def spsa(weights=None, params=None, iterations=50, pairs=8, workers=None,
+         c=0.1, lr=0.5, stability=5, seed=0, max_plies=80, adjudicate_plies=4,
+         callback=None):
+    """Tune a weights dict with SPSA and return the tuned weights
+
+    params names the weights to tune (all by default). Perturbations and steps
+    are scaled by each weight's starting magnitude, so c is the relative size
+    of a perturbation and lr the relative size of a step on a clean sweep.
+    callback(iteration, weights, match_score) is called after every iteration.
+    """
+    theta = weights_to_vector(dict(DEFAULT_WEIGHTS, **(weights or {})))
+    tuned = [WEIGHT_NAMES.index(name) for name in (params or WEIGHT_NAMES)]
+    scale = [max(abs(value), 1) for value in theta]
+    game_options = {"max_plies": max_plies, "adjudicate_plies": adjudicate_plies}
+    rng = random.Random(seed)
+
+    with multiprocessing.Pool(workers) as pool:
+        for k in range(iterations):
+            c_k = c / (k + 1) ** GAMMA
+            a_k = lr / (k + 1 + stability) ** ALPHA
+            delta = {i: rng.choice((-1, 1)) for i in tuned}
+            plus, minus = theta[:], theta[:]
+            for i in tuned:
+                plus[i] += c_k * scale[i] * delta[i]
+                minus[i] -= c_k * scale[i] * delta[i]
+
+            weights_plus = vector_to_weights(plus)
+            weights_minus = vector_to_weights(minus)
+            tasks = [(weights_plus, weights_minus, random_opening(rng), game_options)
+                     for _ in range(pairs)]
+            points = sum(pool.map(play_pair, tasks))
+            # +1 when theta+ won every game, -1 when theta- did
+            match_score = (points - pairs) / pairs
+            for i in tuned:
+                theta[i] += a_k * scale[i] * match_score * delta[i]
+
+            if callback:
+                callback(k, vector_to_weights(theta), match_score)
+    return vector_to_weights(theta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune evaluation weights with SPSA")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--pairs", type=int, default=8, help="game pairs per iteration")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--params", help="comma separated weight names (default: all)")
+    parser.add_argument("--weights", help="JSON file with starting weights")
+    parser.add_argument("--max-plies", type=int, default=80)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the tuned weights as JSON")
+    args = parser.parse_args(argv)
+
+    weights = None
+    if args.weights:
+        with open(args.weights) as f:
+            weights = json.load(f)
+    params = args.params.split(",") if args.params else None
+
+    def report(k, current, match_score):
+        print(f"iteration {k + 1}: match score {match_score:+.3f}", flush=True)
+
+    tuned = spsa(weights, params, args.iterations, args.pairs, args.workers,
+                 seed=args.seed, max_plies=args.max_plies, callback=report)
+    text = json.dumps({name: round(value, 2) for name, value in tuned.items()}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()